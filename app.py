@@ -9,13 +9,25 @@ Implements a human-in-the-loop flow with 3 checkpoints:
 Run with: uv run streamlit run app.py
 """
 
+import uuid
+from contextlib import closing
+
 import streamlit as st
 from pm_agents import (
+    CancelToken,
     run_stage1_refinement,
     run_stage2_classification,
     run_stage3_soft_guesses,
     run_stage4_specialist,
+    discard_speculation,
 )
+from pm_agents.logs import configure_logging, log_context
+from pm_agents.metrics import configure_metrics
+from pm_agents.streaming import DEFAULT_FPS, FrameThrottle, StreamAccumulator
+
+# Structured logs to stderr; level/format via PM_AGENTS_LOG_* env vars
+configure_logging()
+configure_metrics()
 
 # --------------------
 # PAGE CONFIG
@@ -65,11 +77,34 @@ def render_sidebar():
         st.caption("🚧 Competitive Analysis")
         st.caption("🚧 Go-to-Market Planning")
 
+        st.divider()
+
+        with st.expander("Operator Settings", expanded=False):
+            st.slider(
+                "Streaming frame rate (fps)",
+                min_value=1,
+                max_value=30,
+                key="render_fps",
+                help="How often the streaming answer is re-rendered. Lower values reduce server CPU.",
+            )
+            st.number_input(
+                "Max tokens per frame (0 = no limit)",
+                min_value=0,
+                max_value=500,
+                step=10,
+                key="render_max_tokens",
+                help="Also render once this many tokens are waiting, regardless of frame rate.",
+            )
+
 
 # --------------------
 # SESSION STATE INIT
 # --------------------
 
+# Identifies this browser session in structured logs
+if "session_id" not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex[:12]
+
 # Workflow stage: "input" | "refinement" | "classification" | "soft_guesses" | "streaming" | "complete"
 if "workflow_stage" not in st.session_state:
     st.session_state.workflow_stage = "input"
@@ -90,10 +125,20 @@ if "confirmed_guesses" not in st.session_state:
 if "final_output" not in st.session_state:
     st.session_state.final_output = ""
 
+# Cancels the specialist stream of the current problem (see reset_workflow)
+if "cancel_token" not in st.session_state:
+    st.session_state.cancel_token = None
+
 # Chat history for display
 if "messages" not in st.session_state:
     st.session_state.messages = []
 
+# Streaming render settings (operator-tunable in the sidebar)
+if "render_fps" not in st.session_state:
+    st.session_state.render_fps = DEFAULT_FPS
+if "render_max_tokens" not in st.session_state:
+    st.session_state.render_max_tokens = 0
+
 # View state: "chat" or "doc_<agent_name>" for documentation pages
 if "current_view" not in st.session_state:
     st.session_state.current_view = "chat"
@@ -101,6 +146,15 @@ if "current_view" not in st.session_state:
 
 def reset_workflow():
     """Reset workflow to initial state."""
+    # Stop a specialist still streaming for the abandoned problem
+    if st.session_state.cancel_token is not None:
+        st.session_state.cancel_token.cancel("new problem")
+        st.session_state.cancel_token = None
+
+    # Drop any background classification started for the abandoned problem
+    if st.session_state.refinement_data:
+        discard_speculation(st.session_state.refinement_data["refined_statement"])
+
     st.session_state.workflow_stage = "input"
     st.session_state.original_input = ""
     st.session_state.refinement_data = None
@@ -820,9 +874,9 @@ def handle_input_stage():
         with st.chat_message("user"):
             st.markdown(prompt)
 
-        # Run refinement
+        # Run refinement (speculatively classifies while the user reviews)
         with st.spinner("Refining your problem statement..."):
-            for event_type, data in run_stage1_refinement(prompt):
+            for event_type, data in run_stage1_refinement(prompt, speculative=True):
                 if event_type == "refinement":
                     st.session_state.refinement_data = data
                     st.session_state.refined_input = data["refined_statement"]
@@ -880,6 +934,11 @@ def handle_refinement_stage():
 
         with col1:
             if st.button("Confirm & Continue", type="primary", use_container_width=True):
+                # Speculative results only apply to the unedited statement
+                speculated = st.session_state.refinement_data["refined_statement"]
+                if refined != speculated:
+                    discard_speculation(speculated)
+
                 st.session_state.refined_input = refined
 
                 # Run classification
@@ -1076,25 +1135,39 @@ def handle_streaming_stage():
 
         # Streaming placeholder
         response_placeholder = st.empty()
-        full_response = ""
+        full_response = StreamAccumulator()
+
+        # Batch tokens into frames instead of re-rendering on every token
+        throttle = FrameThrottle(
+            fps=st.session_state.render_fps,
+            max_tokens=st.session_state.render_max_tokens or None,
+        )
 
-        # Run specialist with streaming
-        for event_type, data in run_stage4_specialist(
+        # Run specialist with streaming. If Streamlit stops this run (tab
+        # closed, or a click starts a rerun), closing the generator stops the
+        # upstream generation instead of letting it run on to max_tokens.
+        cancel_token = st.session_state.cancel_token = CancelToken()
+        stage = run_stage4_specialist(
             st.session_state.refined_input,
             classification,
-            st.session_state.confirmed_guesses
-        ):
-            if event_type == "token":
-                full_response += data
-                response_placeholder.markdown(full_response + "▌")
-            elif event_type == "done":
-                response_placeholder.markdown(full_response)
-                st.session_state.final_output = full_response
+            st.session_state.confirmed_guesses,
+            cancel_token=cancel_token,
+        )
+        with closing(stage):
+            for event_type, data in stage:
+                if event_type == "token":
+                    full_response.append(data)
+                    if throttle.should_render(data):
+                        response_placeholder.markdown(full_response.text + "▌")
+                elif event_type == "done":
+                    response_placeholder.markdown(data)
+                    st.session_state.final_output = data
+        st.session_state.cancel_token = None
 
         # Save to chat history
         st.session_state.messages.append({
             "role": "assistant",
-            "content": full_response,
+            "content": full_response.text,
             "coordinator": {
                 "classification": classification,
                 "reasoning": st.session_state.classification_data.get("reasoning", ""),
@@ -1124,35 +1197,37 @@ def handle_complete_stage():
 # --------------------
 
 # Check current_view first - documentation pages bypass the workflow
-view = st.session_state.current_view
-
-if view == "doc_prioritization":
-    show_doc_prioritization()
-elif view == "doc_problem_space":
-    show_doc_problem_space()
-elif view == "doc_context_mapping":
-    show_doc_context_mapping()
-elif view == "doc_constraints":
-    show_doc_constraints()
-elif view == "doc_solution_validation":
-    show_doc_solution_validation()
-else:
-    # Main chat workflow - render sidebar and header only for chat view
-    render_sidebar()
-    st.title("PM Brainstorming Assistant")
-    st.caption("A thinking partner for prioritization decisions and discovery challenges")
-
-    stage = st.session_state.workflow_stage
-
-    if stage == "input":
-        handle_input_stage()
-    elif stage == "refinement":
-        handle_refinement_stage()
-    elif stage == "classification":
-        handle_classification_stage()
-    elif stage == "soft_guesses":
-        handle_soft_guesses_stage()
-    elif stage == "streaming":
-        handle_streaming_stage()
-    elif stage == "complete":
-        handle_complete_stage()
+# All log records from this rerun carry the session id
+with log_context(session_id=st.session_state.session_id):
+    view = st.session_state.current_view
+
+    if view == "doc_prioritization":
+        show_doc_prioritization()
+    elif view == "doc_problem_space":
+        show_doc_problem_space()
+    elif view == "doc_context_mapping":
+        show_doc_context_mapping()
+    elif view == "doc_constraints":
+        show_doc_constraints()
+    elif view == "doc_solution_validation":
+        show_doc_solution_validation()
+    else:
+        # Main chat workflow - render sidebar and header only for chat view
+        render_sidebar()
+        st.title("PM Brainstorming Assistant")
+        st.caption("A thinking partner for prioritization decisions and discovery challenges")
+
+        stage = st.session_state.workflow_stage
+
+        if stage == "input":
+            handle_input_stage()
+        elif stage == "refinement":
+            handle_refinement_stage()
+        elif stage == "classification":
+            handle_classification_stage()
+        elif stage == "soft_guesses":
+            handle_soft_guesses_stage()
+        elif stage == "streaming":
+            handle_streaming_stage()
+        elif stage == "complete":
+            handle_complete_stage()
@@ -0,0 +1,86 @@
+"""
+Compare two benchmark JSON files and flag regressions.
+
+Works with the output of any script in benchmarks/ (--json). Numeric leaves
+are matched by path; latency, time and memory metrics regress when they grow,
+throughput metrics (*_per_sec) regress when they shrink.
+
+Run with: uv run python benchmarks/compare.py baseline.json candidate.json [--threshold 10]
+Exits with status 1 if any metric regressed by more than the threshold.
+"""
+
+import argparse
+import json
+import sys
+
+# Leaves that are configuration or counts, not performance
+IGNORED_KEYS = {"sessions", "concurrency", "runs", "meta", "corpus_size"}
+
+
+def flatten(data, prefix: str = "") -> dict:
+    """Flatten nested dicts into {"a.b.c": number}."""
+    flat = {}
+    for key, value in data.items():
+        if key in IGNORED_KEYS:
+            continue
+        path = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(flatten(value, path))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[path] = value
+    return flat
+
+
+def higher_is_better(path: str) -> bool:
+    return path.endswith(("_per_sec", "hit_rate", "speedup"))
+
+
+def compare(baseline: dict, candidate: dict, threshold_pct: float) -> list:
+    """
+    Return rows of (path, baseline, candidate, change_pct, regressed).
+
+    change_pct is signed so that positive always means "worse".
+    """
+    old, new = flatten(baseline), flatten(candidate)
+    rows = []
+    for path in sorted(old.keys() & new.keys()):
+        before, after = old[path], new[path]
+        if before == 0:
+            change = 0.0 if after == 0 else float("inf")
+        else:
+            change = (after - before) / abs(before) * 100
+        if higher_is_better(path):
+            change = -change
+        rows.append((path, before, after, change, change > threshold_pct))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline", help="Benchmark JSON from the reference commit")
+    parser.add_argument("candidate", help="Benchmark JSON from the commit under test")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Allowed regression in percent")
+    parser.add_argument("--filter", default="", help="Only compare metric paths containing this text")
+    parser.add_argument("--all", action="store_true", help="Show unchanged metrics too")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+
+    rows = [row for row in compare(baseline, candidate, args.threshold) if args.filter in row[0]]
+    regressions = [row for row in rows if row[4]]
+
+    for path, before, after, change, regressed in rows:
+        if not (args.all or regressed or abs(change) > args.threshold):
+            continue
+        marker = "REGRESSION" if regressed else "improved"
+        print(f"{marker:<10} {path:<70} {before:>12.3f} -> {after:>12.3f} ({change:+.1f}%)")
+
+    print(f"\n{len(rows)} metrics compared (positive change = worse); {len(regressions)} regressed beyond {args.threshold:.0f}%")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Import-time benchmark for the pm_agents package.
+
+Each scenario runs in a fresh interpreter (cold start, as in a CLI batch
+worker or a Streamlit rerun) and reports the median wall time over N runs.
+
+Run with: uv run python benchmarks/import_time.py [--runs 15] [--json out.json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+SCENARIOS = {
+    "import pm_agents": "import pm_agents",
+    "parsers only": "from pm_agents.coordinator import parse_response",
+    "staged workflow functions": "from pm_agents import run_stage1_refinement",
+    "first LLM client": "from pm_agents.llm import get_llm; get_llm()",
+    "compiled graph": "from pm_agents import get_graph; get_graph()",
+}
+
+TIMER = """
+import time
+_start = time.perf_counter()
+{code}
+print(time.perf_counter() - _start)
+"""
+
+
+def time_scenario(code: str, runs: int) -> dict:
+    """Run a snippet in fresh interpreters and return timing stats in milliseconds."""
+    env = {**os.environ, "ANTHROPIC_API_KEY": os.environ.get("ANTHROPIC_API_KEY", "benchmark")}
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", TIMER.format(code=code)],
+            capture_output=True, text=True, check=True, env=env,
+        )
+        samples.append(float(out.stdout.strip().splitlines()[-1]) * 1000)
+    return {
+        "median_ms": round(statistics.median(samples), 2),
+        "min_ms": round(min(samples), 2),
+        "max_ms": round(max(samples), 2),
+        "runs": runs,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=15, help="Fresh interpreters per scenario")
+    parser.add_argument("--json", dest="json_path", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    results = {}
+    for name, code in SCENARIOS.items():
+        results[name] = time_scenario(code, args.runs)
+        print(f"{name:<28} {results[name]['median_ms']:>9.1f} ms (median of {args.runs})")
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump({"import_time": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
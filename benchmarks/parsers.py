@@ -0,0 +1,394 @@
+"""
+Microbenchmark and equivalence check for the coordinator response parsers.
+
+The single-pass parsers in pm_agents.coordinator must stay behavior-compatible
+with the original line-by-line implementations, kept below as the reference.
+Every response in the corpus is parsed by both and the results compared;
+any mismatch fails the run before timings are reported.
+
+The corpus is a golden set of hand-written edge cases, plus synthetic
+responses from SyntheticLLM, plus (optionally) real responses recorded with
+PM_AGENTS_LLM_PROVIDER=record. The golden set and a synthetic sample are
+also checked on every test run (tests/test_coordinator.py).
+
+Also times the incremental SectionParser and StreamingValidator per
+streamed token on synthetic specialist output.
+
+Run with:
+    uv run python benchmarks/parsers.py [--responses 5000] [--corpus recordings.jsonl] [--json out.json]
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+
+from pm_agents.coordinator import (
+    COMBINED_PROMPT,
+    PROMPT,
+    REFINEMENT_PROMPT,
+    SOFT_GUESSES_PROMPT,
+    parse_refinement_response,
+    parse_response,
+    parse_soft_guesses_response,
+)
+from pm_agents.providers import SyntheticLLM, split_tokens
+from pm_agents.section_parser import parse_stream
+from pm_agents.validation import StreamingValidator
+
+
+# --------------------
+# REFERENCE IMPLEMENTATIONS
+# --------------------
+# Verbatim copies of the parsers before the single-pass rewrite.
+
+def reference_parse_response(response_text: str) -> tuple[str, str, list]:
+    """
+    Parse the coordinator's response to extract classification, reasoning, and alternatives.
+
+    Args:
+        response_text: Raw text response from the LLM
+
+    Returns:
+        Tuple of (classification, reasoning, alternatives)
+    """
+    # Valid classifications (order matters for matching)
+    valid_classifications = [
+        "solution_validation",  # Check longer names first
+        "context_mapping",
+        "problem_space",
+        "prioritization",
+        "constraints",
+    ]
+
+    classification = "problem_space"  # default fallback for unknown
+    reasoning = ""
+    alternatives = []
+
+    lines = response_text.strip().split("\n")
+    for line in lines:
+        if line.upper().startswith("CLASSIFICATION:"):
+            value = line.split(":", 1)[1].strip().lower()
+            # Find matching classification
+            for valid in valid_classifications:
+                if valid in value:
+                    classification = valid
+                    break
+        elif line.upper().startswith("REASONING:"):
+            reasoning = line.split(":", 1)[1].strip()
+        elif line.upper().startswith("ALTERNATIVES:"):
+            alt_text = line.split(":", 1)[1].strip().lower()
+            if alt_text and alt_text != "none":
+                # Parse comma-separated alternatives
+                for alt in alt_text.split(","):
+                    alt = alt.strip()
+                    for valid in valid_classifications:
+                        if valid in alt:
+                            if valid != classification:  # Don't include primary
+                                alternatives.append(valid)
+                            break
+
+    # Sometimes reasoning spans multiple lines
+    if not reasoning:
+        for i, line in enumerate(lines):
+            if line.upper().startswith("REASONING:"):
+                # Get text until ALTERNATIVES line
+                reasoning_lines = []
+                for j in range(i, len(lines)):
+                    if lines[j].upper().startswith("ALTERNATIVES:"):
+                        break
+                    reasoning_lines.append(lines[j])
+                reasoning = " ".join(reasoning_lines).replace("REASONING:", "").strip()
+                break
+
+    return classification, reasoning, alternatives
+
+
+def reference_parse_refinement_response(response_text: str) -> dict:
+    """
+    Parse the refinement response to extract structured data.
+
+    Returns:
+        Dict with keys: refined_statement, improvements, soft_guesses
+    """
+    result = {
+        "refined_statement": "",
+        "improvements": [],
+        "soft_guesses": []
+    }
+
+    lines = response_text.strip().split("\n")
+    current_section = None
+
+    for line in lines:
+        line_stripped = line.strip()
+
+        if line_stripped.upper().startswith("REFINED_STATEMENT:"):
+            current_section = "refined"
+            result["refined_statement"] = line_stripped.split(":", 1)[1].strip()
+        elif line_stripped.upper().startswith("IMPROVEMENTS_MADE:"):
+            current_section = "improvements"
+        elif line_stripped.upper().startswith("SOFT_GUESSES:"):
+            current_section = "soft_guesses"
+        elif line_stripped.startswith("- "):
+            item = line_stripped[2:].strip()
+            if current_section == "improvements":
+                result["improvements"].append(item)
+            elif current_section == "soft_guesses":
+                result["soft_guesses"].append(item)
+        elif current_section == "refined" and line_stripped:
+            # Multi-line refined statement
+            result["refined_statement"] += " " + line_stripped
+
+    return result
+
+
+def reference_parse_soft_guesses_response(response_text: str) -> list:
+    """
+    Parse soft guesses response into structured list.
+
+    Returns:
+        List of dicts with keys: topic, assumption, confidence, reason
+    """
+    guesses = []
+    lines = response_text.strip().split("\n")
+
+    for line in lines:
+        line_stripped = line.strip()
+        if line_stripped.startswith("- "):
+            # Parse format: "- [Topic]: [Assumption] — Confidence: [Level] — [Reason]"
+            content = line_stripped[2:].strip()
+
+            # Split by — (em-dash) or - (hyphen with spaces)
+            parts = content.replace(" — ", " - ").split(" - ")
+
+            if len(parts) >= 2:
+                # First part: Topic: Assumption
+                first_part = parts[0]
+                if ":" in first_part:
+                    topic, assumption = first_part.split(":", 1)
+                else:
+                    topic = "General"
+                    assumption = first_part
+
+                # Extract confidence if present
+                confidence = "Medium"
+                reason = ""
+                for part in parts[1:]:
+                    if "confidence" in part.lower():
+                        conf_text = part.lower().replace("confidence:", "").replace("confidence", "").strip()
+                        if "high" in conf_text:
+                            confidence = "High"
+                        elif "low" in conf_text:
+                            confidence = "Low"
+                        else:
+                            confidence = "Medium"
+                    else:
+                        reason = part.strip()
+
+                guesses.append({
+                    "topic": topic.strip(),
+                    "assumption": assumption.strip(),
+                    "confidence": confidence,
+                    "reason": reason
+                })
+
+    return guesses
+
+
+PARSERS = {
+    "parse_response": (reference_parse_response, parse_response),
+    "parse_refinement_response": (reference_parse_refinement_response, parse_refinement_response),
+    "parse_soft_guesses_response": (reference_parse_soft_guesses_response, parse_soft_guesses_response),
+}
+
+
+# --------------------
+# CORPUS
+# --------------------
+
+# Hand-written edge cases; every parser is run on every entry
+GOLDEN = [
+    "",
+    "   \n  ",
+    "CLASSIFICATION: prioritization\nREASONING: Choosing between two features.\nALTERNATIVES: solution_validation, constraints",
+    "classification: Constraints\nreasoning: lower-case keys\nalternatives: none",
+    "CLASSIFICATION: something_else\nREASONING: Unknown category falls back.\nALTERNATIVES: None",
+    "CLASSIFICATION: problem_space or constraints\nREASONING: Two names on one line.\nALTERNATIVES: constraints, problem_space, bogus",
+    "CLASSIFICATION: constraints\nREASONING:\nThe reasoning starts on the next line\nand continues here.\nALTERNATIVES: prioritization",
+    "CLASSIFICATION: constraints\nREASONING:\nNo alternatives line follows this reasoning.",
+    "REASONING: first\nCLASSIFICATION: context_mapping\nREASONING:\nALTERNATIVES: context_mapping, problem_space",
+    "ALTERNATIVES: prioritization\nCLASSIFICATION: prioritization\nALTERNATIVES: prioritization, constraints",
+    "  CLASSIFICATION: constraints\n  REASONING: indented keys are not matched by parse_response",
+    "CLASSIFICATION: constraints\r\nREASONING: windows line endings\r\nALTERNATIVES: problem_space\r\n",
+    "CLAſſIFICATION: constraints\nREAſONING: long s upper-cases to S\nALTERNATIVEſ: prioritization",
+    "CLAßIFICATION: constraints\nREASONING: sharp s expands when upper-cased",
+    "ﬁ CLASSIFICATION: constraints",
+    "CLASSIFICATION:solution_validation\nREASONING:no spaces\nALTERNATIVES:context_mapping,problem_space",
+    "REASONING: REASONING: repeated key text\nALTERNATIVES: None",
+    "REFINED_STATEMENT: Enterprise admins struggle\nwith onboarding every week.\n\nIMPROVEMENTS_MADE:\n- Made WHO specific\n- Added frequency\n\nSOFT_GUESSES:\n- Users: admins — Confidence: Medium",
+    "refined_statement:\ncontinues on the next line\n- a bullet inside the refined section\nmore text",
+    "- bullet before any section\nREFINED_STATEMENT: first\nREFINED_STATEMENT: second replaces first\nIMPROVEMENTS_MADE:\n-no space bullet\n- real bullet",
+    "  REFINED_STATEMENT: indented key\n  IMPROVEMENTS_MADE:\n  - indented bullet",
+    "- Target User: Enterprise admins — Confidence: Medium — implied by scale",
+    "- Severity: blocking - Confidence: Low - could be annoying",
+    "- No colon here — Confidence: High",
+    "- Topic: assumption only",
+    "- Topic: a — b — c — Confidence: low — reason one — reason two",
+    "- Topic: hi confidencegh — Confidence: hi confidence gh",
+    "- Topic: x — CONFIDENCE: HIGH — y",
+    "- Topic: x — confidence — y",
+    "- Topic: a - — b",
+    "- Topic: x — Confidence: Medium-High — y",
+    "-Topic: not a bullet — Confidence: High",
+    "* Topic: star bullet — Confidence: High",
+    COMBINED_PROMPT,
+    PROMPT,
+    REFINEMENT_PROMPT,
+    SOFT_GUESSES_PROMPT,
+]
+
+
+def mutate(text: str, rng: random.Random) -> str:
+    """Apply formatting variations models produce (case, spacing, dashes, line endings)."""
+    lines = text.split("\n")
+    for i, line in enumerate(lines):
+        roll = rng.random()
+        if roll < 0.05:
+            lines[i] = line.lower()
+        elif roll < 0.08:
+            lines[i] = "  " + line
+        elif roll < 0.12:
+            lines[i] = line.replace(" — ", " - ")
+        elif roll < 0.15 and line.upper().startswith("REASONING:"):
+            lines[i] = "REASONING:\n" + line.partition(":")[2].strip()
+        elif roll < 0.17:
+            lines[i] = line + "\n"
+    separator = "\r\n" if rng.random() < 0.1 else "\n"
+    return separator.join(lines)
+
+
+def synthetic_corpus(count: int, seed: int = 0) -> list:
+    """Generate coordinator-style responses with SyntheticLLM plus random mutations."""
+    rng = random.Random(seed)
+    llm = SyntheticLLM()
+    prompts = [PROMPT, REFINEMENT_PROMPT, SOFT_GUESSES_PROMPT, COMBINED_PROMPT]
+    corpus = []
+    for i in range(count):
+        system = prompts[i % len(prompts)]
+        user = f"Problem {i}: " + " ".join(rng.choice(["users", "admins", "should", "build", "blocked", "learn"])
+                                          for _ in range(8))
+        text = llm.invoke([{"role": "system", "content": system}, {"role": "user", "content": user}]).content
+        corpus.append(mutate(text, rng) if rng.random() < 0.5 else text)
+    return corpus
+
+
+def recorded_corpus(path: str) -> list:
+    """Load response texts from a RecordingLLM JSON-lines file."""
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line)["content"] for line in f if line.strip()]
+
+
+# --------------------
+# CHECKS AND TIMING
+# --------------------
+
+def check_equivalence(corpus: list) -> list:
+    """Return (parser, text) pairs where the rewrite disagrees with the reference."""
+    mismatches = []
+    for name, (reference, candidate) in PARSERS.items():
+        for text in corpus:
+            if reference(text) != candidate(text):
+                mismatches.append((name, text))
+    return mismatches
+
+
+def time_parser(parse, corpus: list, repeats: int) -> float:
+    """Return the best-of-`repeats` time per response in microseconds."""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for text in corpus:
+            parse(text)
+        best = min(best, time.perf_counter() - start)
+    return best / len(corpus) * 1e6
+
+
+def specialist_tokens(output_tokens: int = 6000) -> list:
+    """Return a synthetic specialist answer split into streamed tokens."""
+    llm = SyntheticLLM(output_tokens=output_tokens)
+    system = "### 1. Summary\n### 2. Soft Guesses\n### 3. Risk Summary Matrix\n### 4. Decision Criteria"
+    text = llm.invoke([{"role": "system", "content": system}, {"role": "user", "content": "benchmark"}]).content
+    return split_tokens(text)
+
+
+def _validate_stream(tokens: list) -> list:
+    validator = StreamingValidator()
+    events = []
+    for token in tokens:
+        events += validator.feed(token)
+    return events + validator.finish()
+
+
+def time_stream_consumer(consume, tokens: list, repeats: int) -> dict:
+    """Time a token-stream consumer (returning its events), per token."""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        events = list(consume(tokens))
+        best = min(best, time.perf_counter() - start)
+    return {"tokens": len(tokens), "events": len(events), "us_per_token": round(best / len(tokens) * 1e6, 3)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--responses", type=int, default=5000, help="Synthetic responses to generate")
+    parser.add_argument("--corpus", action="append", default=[], help="RecordingLLM JSON-lines file (repeatable)")
+    parser.add_argument("--repeats", type=int, default=5, help="Timing repeats (best is reported)")
+    parser.add_argument("--json", dest="json_path", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    corpus = GOLDEN + synthetic_corpus(args.responses)
+    for path in args.corpus:
+        corpus += recorded_corpus(path)
+
+    mismatches = check_equivalence(corpus)
+    if mismatches:
+        for name, text in mismatches[:10]:
+            print(f"MISMATCH {name}: {text[:200]!r}")
+        print(f"{len(mismatches)} mismatches; parsers are not behavior-compatible")
+        sys.exit(1)
+    print(f"Equivalence: {len(corpus)} responses x {len(PARSERS)} parsers match the reference\n")
+
+    results = {}
+    for name, (reference, candidate) in PARSERS.items():
+        before = time_parser(reference, corpus, args.repeats)
+        after = time_parser(candidate, corpus, args.repeats)
+        results[name] = {
+            "reference_us": round(before, 3),
+            "current_us": round(after, 3),
+            "speedup": round(before / after, 2),
+        }
+        print(f"{name:<30} {before:>8.2f} us -> {after:>8.2f} us per response ({before / after:.2f}x)")
+
+    tokens = specialist_tokens()
+    streaming = {
+        "section_parser": time_stream_consumer(parse_stream, tokens, args.repeats),
+        "streaming_validator": time_stream_consumer(_validate_stream, tokens, args.repeats),
+    }
+    for name, stats in streaming.items():
+        print(f"{name + ' (streaming)':<30} {stats['us_per_token']:>8.2f} us per token "
+              f"({stats['tokens']} tokens, {stats['events']} events)")
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump({
+                "parsers": results,
+                "streaming": {name: {"us_per_token": stats["us_per_token"]} for name, stats in streaming.items()},
+                "corpus_size": len(corpus),
+            }, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,374 @@
+"""
+End-to-end benchmark for the staged workflow against a simulated LLM.
+
+Drives run_stage1_refinement -> run_stage4_specialist (sync or async), plus
+the legacy run() and run_streaming(), using the synthetic backend from
+pm_agents.providers with a configurable latency and token rate. Reports:
+
+- per-stage wall time split into model wait vs. overhead (time in our code)
+- p50/p95/p99 latencies per stage and per session
+- throughput (sessions/sec) at N concurrent sessions
+- memory per session (tracemalloc peak)
+
+Model wait is measured by wrapping the LLM clients, so "overhead" is every
+microsecond the workflow spends outside invoke/stream calls: prompt building,
+parsing, validation, queues and generator plumbing.
+
+Run with:
+    uv run python benchmarks/workflow_latency.py --sessions 50 --concurrency 10 --json out.json
+    uv run python benchmarks/compare.py baseline.json out.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import contextvars
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+from pm_agents import (
+    arun_stage1_refinement,
+    arun_stage2_classification,
+    arun_stage3_soft_guesses,
+    arun_stage4_specialist,
+    run,
+    run_stage1_refinement,
+    run_stage2_classification,
+    run_stage3_soft_guesses,
+    run_stage4_specialist,
+    run_streaming,
+)
+from pm_agents.cache import InMemoryCache, set_response_cache
+from pm_agents.llm import set_llms
+from pm_agents.providers import SyntheticLLM
+
+PROBLEMS = [
+    "Should we build SSO or audit logs first for our enterprise tier?",
+    "I think users struggle with onboarding, but I'm not sure it's a real problem.",
+    "I just joined the payments team and need to learn the domain and stakeholders.",
+    "Engineering keeps saying real-time sync won't work but I don't know why.",
+    "We want to build an AI assistant for support agents. Is this a good idea?",
+]
+
+# --------------------
+# MODEL WAIT METERING
+# --------------------
+
+_model_wait = contextvars.ContextVar("model_wait", default=None)
+
+
+def _add_wait(seconds: float):
+    box = _model_wait.get()
+    if box is not None:
+        box[0] += seconds
+
+
+@contextlib.contextmanager
+def measure_wait():
+    """Accumulate model wait time for the calls made inside this block."""
+    box = [0.0]
+    token = _model_wait.set(box)
+    try:
+        yield box
+    finally:
+        _model_wait.reset(token)
+
+
+class MeteredLLM:
+    """Wrap an LLM client and record time spent inside its calls as model wait."""
+
+    def __init__(self, llm):
+        self.llm = llm
+
+    def __getattr__(self, name):
+        return getattr(self.llm, name)
+
+    def invoke(self, messages, **kwargs):
+        start = time.perf_counter()
+        try:
+            return self.llm.invoke(messages, **kwargs)
+        finally:
+            _add_wait(time.perf_counter() - start)
+
+    async def ainvoke(self, messages, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await self.llm.ainvoke(messages, **kwargs)
+        finally:
+            _add_wait(time.perf_counter() - start)
+
+    def stream(self, messages, **kwargs):
+        chunks = iter(self.llm.stream(messages, **kwargs))
+        while True:
+            start = time.perf_counter()
+            try:
+                chunk = next(chunks)
+            except StopIteration:
+                _add_wait(time.perf_counter() - start)
+                return
+            _add_wait(time.perf_counter() - start)
+            yield chunk
+
+    async def astream(self, messages, **kwargs):
+        chunks = self.llm.astream(messages, **kwargs).__aiter__()
+        while True:
+            start = time.perf_counter()
+            try:
+                chunk = await chunks.__anext__()
+            except StopAsyncIteration:
+                _add_wait(time.perf_counter() - start)
+                return
+            _add_wait(time.perf_counter() - start)
+            yield chunk
+
+
+# --------------------
+# SESSIONS
+# --------------------
+
+def _timed(stage: str, events, timings: dict):
+    """Consume a stage generator, recording wall time and model wait."""
+    with measure_wait() as wait:
+        start = time.perf_counter()
+        result = {event_type: data for event_type, data in events if event_type != "token"}
+        wall = time.perf_counter() - start
+    timings[stage] = {"wall_s": wall, "model_wait_s": wait[0]}
+    return result
+
+
+async def _atimed(stage: str, events, timings: dict):
+    with measure_wait() as wait:
+        start = time.perf_counter()
+        result = {}
+        async for event_type, data in events:
+            if event_type != "token":
+                result[event_type] = data
+        wall = time.perf_counter() - start
+    timings[stage] = {"wall_s": wall, "model_wait_s": wait[0]}
+    return result
+
+
+def staged_session(problem: str) -> dict:
+    """Run one user session through Stages 1-4 and return per-stage timings."""
+    timings = {}
+    start = time.perf_counter()
+    refined = _timed("refinement", run_stage1_refinement(problem), timings)["refinement"]["refined_statement"]
+    classification = _timed("classification", run_stage2_classification(refined), timings)
+    classification = classification["classification"]["classification"]
+    guesses = _timed("soft_guesses", run_stage3_soft_guesses(refined, classification), timings)["soft_guesses"]
+    _timed("specialist", run_stage4_specialist(refined, classification, guesses), timings)
+    timings["session"] = {"wall_s": time.perf_counter() - start}
+    return timings
+
+
+async def astaged_session(problem: str) -> dict:
+    """Async version of staged_session using the arun_stage* generators."""
+    timings = {}
+    start = time.perf_counter()
+    refined = (await _atimed("refinement", arun_stage1_refinement(problem), timings))["refinement"]
+    refined = refined["refined_statement"]
+    classification = await _atimed("classification", arun_stage2_classification(refined), timings)
+    classification = classification["classification"]["classification"]
+    guesses = (await _atimed("soft_guesses", arun_stage3_soft_guesses(refined, classification), timings))
+    await _atimed("specialist", arun_stage4_specialist(refined, classification, guesses["soft_guesses"]), timings)
+    timings["session"] = {"wall_s": time.perf_counter() - start}
+    return timings
+
+
+def legacy_run_session(problem: str) -> dict:
+    """Run the LangGraph run() entry point."""
+    timings = {}
+    with measure_wait() as wait:
+        start = time.perf_counter()
+        run(problem)
+        wall = time.perf_counter() - start
+    timings["run"] = {"wall_s": wall, "model_wait_s": wait[0]}
+    timings["session"] = {"wall_s": wall}
+    return timings
+
+
+def streaming_session(problem: str) -> dict:
+    """Run the legacy run_streaming() generator to completion."""
+    timings = {}
+    _timed("run_streaming", run_streaming(problem), timings)
+    timings["session"] = {"wall_s": timings["run_streaming"]["wall_s"]}
+    return timings
+
+
+SCENARIOS = {
+    "staged": staged_session,
+    "staged_async": astaged_session,
+    "run": legacy_run_session,
+    "run_streaming": streaming_session,
+}
+
+
+# --------------------
+# REPORTING
+# --------------------
+
+def percentile(samples: list, pct: float) -> float:
+    """Nearest-rank percentile (samples need not be sorted)."""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def summarize(samples: list) -> dict:
+    """Return p50/p95/p99/mean in milliseconds."""
+    return {
+        "p50_ms": round(percentile(samples, 50) * 1000, 3),
+        "p95_ms": round(percentile(samples, 95) * 1000, 3),
+        "p99_ms": round(percentile(samples, 99) * 1000, 3),
+        "mean_ms": round(statistics.fmean(samples) * 1000, 3),
+    }
+
+
+def aggregate(sessions: list) -> dict:
+    """Aggregate per-session timings into per-stage latency and overhead stats."""
+    stages = {}
+    for name in sessions[0]:
+        walls = [s[name]["wall_s"] for s in sessions]
+        entry = {"wall": summarize(walls)}
+        if "model_wait_s" in sessions[0][name]:
+            waits = [s[name]["model_wait_s"] for s in sessions]
+            overheads = [max(0.0, w - m) for w, m in zip(walls, waits)]
+            entry["model_wait"] = summarize(waits)
+            entry["overhead"] = summarize(overheads)
+            entry["overhead_pct"] = round(100 * sum(overheads) / sum(walls), 2) if sum(walls) else 0.0
+        stages[name] = entry
+    return stages
+
+
+# --------------------
+# DRIVERS
+# --------------------
+
+def run_scenario(name: str, sessions: int, concurrency: int) -> dict:
+    """Run `sessions` sessions with `concurrency` in flight; return aggregated stats."""
+    session_fn = SCENARIOS[name]
+    problems = [f"{PROBLEMS[i % len(PROBLEMS)]} (session {i})" for i in range(sessions)]
+
+    # run() prints its results; stdout redirection is process-wide, so it
+    # wraps the whole batch rather than each (concurrent) session
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        results = _drive(session_fn, problems, concurrency)
+        elapsed = time.perf_counter() - start
+
+    return {
+        "sessions": sessions,
+        "concurrency": concurrency,
+        "elapsed_s": round(elapsed, 4),
+        "throughput_sessions_per_sec": round(sessions / elapsed, 3),
+        "stages": aggregate(results),
+    }
+
+
+def _drive(session_fn, problems: list, concurrency: int) -> list:
+    """Run session_fn over problems with at most `concurrency` in flight."""
+    if asyncio.iscoroutinefunction(session_fn):
+        async def drive():
+            limit = asyncio.Semaphore(concurrency)
+
+            async def one(problem):
+                async with limit:
+                    return await session_fn(problem)
+
+            return await asyncio.gather(*(one(p) for p in problems))
+
+        return asyncio.run(drive())
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(session_fn, problems))
+
+
+def memory_per_session(name: str, sessions: int, concurrency: int) -> dict:
+    """Measure tracemalloc peak for a concurrent batch, reported per session."""
+    session_fn = SCENARIOS[name]
+    problems = [f"{PROBLEMS[i % len(PROBLEMS)]} (memory {i})" for i in range(sessions)]
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            _drive(session_fn, problems, concurrency)
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+    return {
+        "sessions": sessions,
+        "peak_kib": round(peak / 1024, 1),
+        "peak_kib_per_session": round(peak / 1024 / sessions, 1),
+    }
+
+
+def git_commit() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Comma-separated scenarios")
+    parser.add_argument("--sessions", type=int, default=20, help="Sessions per scenario")
+    parser.add_argument("--concurrency", type=int, default=4, help="Sessions in flight at once")
+    parser.add_argument("--latency", type=float, default=0.05, help="Simulated seconds before first token")
+    parser.add_argument("--tokens-per-sec", type=float, default=2000, help="Simulated output rate (0 = unthrottled)")
+    parser.add_argument("--output-tokens", type=int, default=1500, help="Simulated specialist output size")
+    parser.add_argument("--memory-sessions", type=int, default=5, help="Sessions in the memory measurement (0 = skip)")
+    parser.add_argument("--cache", action="store_true", help="Enable the in-memory coordinator response cache")
+    parser.add_argument("--json", dest="json_path", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    llm = MeteredLLM(SyntheticLLM(
+        latency=args.latency,
+        tokens_per_sec=args.tokens_per_sec or None,
+        output_tokens=args.output_tokens,
+    ))
+    set_llms(llm, llm)
+    set_response_cache(InMemoryCache() if args.cache else None)
+
+    results = {}
+    for name in args.scenarios.split(","):
+        result = run_scenario(name, args.sessions, args.concurrency)
+        if args.memory_sessions:
+            result["memory"] = memory_per_session(name, args.memory_sessions, args.concurrency)
+        results[name] = result
+
+        print(f"\n{name}: {result['throughput_sessions_per_sec']:.2f} sessions/s "
+              f"({args.sessions} sessions, concurrency {args.concurrency})")
+        for stage, stats in result["stages"].items():
+            line = f"  {stage:<15} p50 {stats['wall']['p50_ms']:>9.1f} ms  p95 {stats['wall']['p95_ms']:>9.1f} ms" \
+                   f"  p99 {stats['wall']['p99_ms']:>9.1f} ms"
+            if "overhead" in stats:
+                line += f"  overhead p50 {stats['overhead']['p50_ms']:>7.2f} ms ({stats['overhead_pct']:.1f}%)"
+            print(line)
+        if "memory" in result:
+            print(f"  memory          {result['memory']['peak_kib_per_session']:.1f} KiB/session (tracemalloc peak)")
+
+    if args.json_path:
+        payload = {
+            "meta": {
+                "commit": git_commit(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "argv": sys.argv[1:],
+                "config": {k: v for k, v in vars(args).items() if k != "json_path"},
+            },
+            "workflow": results,
+        }
+        with open(args.json_path, "w") as f:
+            json.dump(payload, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
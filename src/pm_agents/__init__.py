@@ -1,25 +1,73 @@
-"""PM Agents - Multi-agent PM brainstorming system."""
-
-from .workflow import (
-    run,
-    run_streaming,
-    build_graph,
-    # Staged workflow functions for human-in-the-loop flow
-    run_stage1_refinement,
-    run_stage2_classification,
-    run_stage3_soft_guesses,
-    run_stage4_specialist,
-)
-from .state import State
-
-__all__ = [
-    "run",
-    "run_streaming",
-    "build_graph",
-    "State",
-    # Staged workflow
-    "run_stage1_refinement",
-    "run_stage2_classification",
-    "run_stage3_soft_guesses",
-    "run_stage4_specialist",
-]
+"""PM Agents - Multi-agent PM brainstorming system.
+
+Public names are resolved lazily (PEP 562): importing the package does not
+import LangGraph / LangChain or build any LLM client until a workflow
+function is actually accessed.
+"""
+
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .workflow import (
+        run,
+        run_streaming,
+        build_graph,
+        get_graph,
+        invalidate_graph_cache,
+        run_stage1_refinement,
+        run_stage2_classification,
+        run_stage3_soft_guesses,
+        run_stage4_specialist,
+        run_stage4_fanout,
+        start_speculation,
+        discard_speculation,
+        arun_stage1_refinement,
+        arun_stage2_classification,
+        arun_stage3_soft_guesses,
+        arun_stage4_specialist,
+        arun_stage4_fanout,
+    )
+    from .state import State
+    from .cancellation import CancelToken
+
+# Public name -> submodule that defines it
+_LAZY_EXPORTS = {
+    "run": ".workflow",
+    "run_streaming": ".workflow",
+    "build_graph": ".workflow",
+    "get_graph": ".workflow",
+    "invalidate_graph_cache": ".workflow",
+    "State": ".state",
+    # Staged workflow for human-in-the-loop flow
+    "run_stage1_refinement": ".workflow",
+    "run_stage2_classification": ".workflow",
+    "run_stage3_soft_guesses": ".workflow",
+    "run_stage4_specialist": ".workflow",
+    "run_stage4_fanout": ".workflow",
+    "start_speculation": ".workflow",
+    "discard_speculation": ".workflow",
+    # Async staged workflow for event-loop servers
+    "arun_stage1_refinement": ".workflow",
+    "arun_stage2_classification": ".workflow",
+    "arun_stage3_soft_guesses": ".workflow",
+    "arun_stage4_specialist": ".workflow",
+    "arun_stage4_fanout": ".workflow",
+    # Cooperative cancellation of streaming stages
+    "CancelToken": ".cancellation",
+}
+
+__all__ = list(_LAZY_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value  # Cache so later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
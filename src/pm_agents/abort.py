@@ -0,0 +1,166 @@
+"""
+Early-abort policies for specialist streams.
+
+A specialist answer runs to thousands of tokens. When a stream has clearly
+gone wrong (vague language, no ⚠️ soft guesses, not in the agent's markdown
+format) there is no point paying for the rest of it. An AbortPolicy watches
+the stream token by token; when it returns a reason, run_stage4_specialist
+closes the upstream stream, emits ("aborted", reason) and, if retries are
+allowed, regenerates with the policy's corrective note appended to the
+context.
+
+Policies are stateful: reset() is called at the start of every attempt, and
+an instance must not be shared by concurrent streams.
+
+Example:
+    policy = AnyPolicy(QualityAbortPolicy(), MissingSoftGuessesPolicy(within_tokens=1200))
+    for event_type, data in run_stage4_specialist(refined, classification, abort_policy=policy, max_retries=1):
+        ...
+"""
+
+from .validation import SOFT_GUESS_MARKER
+
+_MARKER_CHAR = SOFT_GUESS_MARKER[0]
+
+
+class AbortPolicy:
+    """
+    Base class for abort policies.
+
+    Attributes:
+        needs_validation: If True, the stage runs the StreamingValidator so
+            ("quality_warning", ...) events reach on_token()
+    """
+
+    needs_validation = False
+
+    def reset(self):
+        """Clear per-attempt state (called before every attempt)."""
+
+    def on_token(self, token: str, output, events: list):
+        """
+        Inspect one streamed token.
+
+        Args:
+            token: The token just received
+            output: StreamAccumulator with the attempt's output so far
+            events: Structured/quality events produced for this token
+
+        Returns:
+            A reason string to abort, or None to continue
+        """
+        return None
+
+    def correction(self, reason: str) -> str:
+        """Return the note appended to the context when regenerating."""
+        return (
+            "IMPORTANT: A previous answer to this problem was stopped because: "
+            f"{reason}. Follow the Output Structure and the MANDATORY OUTPUT "
+            "REQUIREMENTS exactly."
+        )
+
+
+class QualityAbortPolicy(AbortPolicy):
+    """
+    Abort on streaming quality violations.
+
+    Args:
+        checks: Validator checks that trigger an abort (default: vague language)
+    """
+
+    needs_validation = True
+
+    def __init__(self, checks=("vague_language",)):
+        self.checks = tuple(checks)
+
+    def on_token(self, token, output, events):
+        for event_type, data in events:
+            if event_type == "quality_warning" and data["check"] in self.checks:
+                if data["check"] == "vague_language":
+                    return f"Vague language: {data['phrase']!r}"
+                return f"Quality check failed: {data['check']}"
+        return None
+
+    def correction(self, reason):
+        return (
+            f"IMPORTANT: A previous answer was stopped because of {reason}. Never use "
+            "hedged language; give concrete Proceed IF / Do NOT proceed IF criteria."
+        )
+
+
+class MissingSoftGuessesPolicy(AbortPolicy):
+    """
+    Abort if no ⚠️ soft guess has appeared within the first N tokens.
+
+    Every specialist lists its soft guesses near the top of the answer.
+    """
+
+    def __init__(self, within_tokens: int = 1500):
+        self.within_tokens = within_tokens
+        self._seen = False
+
+    def reset(self):
+        self._seen = False
+
+    def on_token(self, token, output, events):
+        if not self._seen and _MARKER_CHAR in token:
+            self._seen = True
+        if not self._seen and output.token_count >= self.within_tokens:
+            return f"No ⚠️ soft guesses in the first {self.within_tokens} tokens"
+        return None
+
+    def correction(self, reason):
+        return (
+            f"IMPORTANT: A previous answer was stopped because: {reason}. Mark every "
+            "assumption with ⚠️ in the Soft Guesses section near the top of your answer."
+        )
+
+
+class WrongFormatPolicy(AbortPolicy):
+    """
+    Abort if no markdown heading has appeared within the first N tokens.
+
+    Specialist answers open with "### 1. ..." sections; prose without any
+    heading means the model ignored the agent's output format.
+    """
+
+    def __init__(self, within_tokens: int = 400):
+        self.within_tokens = within_tokens
+        self._seen = False
+
+    def reset(self):
+        self._seen = False
+
+    def on_token(self, token, output, events):
+        if not self._seen and "#" in token:
+            self._seen = True
+        if not self._seen and output.token_count >= self.within_tokens:
+            return f"No markdown sections in the first {self.within_tokens} tokens"
+        return None
+
+
+class AnyPolicy(AbortPolicy):
+    """Abort when any of the given policies does (first reason wins)."""
+
+    def __init__(self, *policies):
+        self.policies = policies
+        self.needs_validation = any(p.needs_validation for p in policies)
+        self._triggered = None
+
+    def reset(self):
+        self._triggered = None
+        for policy in self.policies:
+            policy.reset()
+
+    def on_token(self, token, output, events):
+        for policy in self.policies:
+            reason = policy.on_token(token, output, events)
+            if reason:
+                self._triggered = policy
+                return reason
+        return None
+
+    def correction(self, reason):
+        if self._triggered is not None:
+            return self._triggered.correction(reason)
+        return super().correction(reason)
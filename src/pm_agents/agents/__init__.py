@@ -2,51 +2,81 @@
 
 # Prioritization agent (existing)
 from .prioritization import PROMPT as PRIORITIZATION_PROMPT
+from .prioritization import TOKEN_BUDGET as PRIORITIZATION_TOKEN_BUDGET
 from .prioritization import run_agent as run_prioritization
 from .prioritization import stream_agent as stream_prioritization
+from .prioritization import astream_agent as astream_prioritization
 
 # Problem Space agent (new - validates if problems exist and matter)
 from .problem_space import PROMPT as PROBLEM_SPACE_PROMPT
+from .problem_space import TOKEN_BUDGET as PROBLEM_SPACE_TOKEN_BUDGET
 from .problem_space import run_agent as run_problem_space
 from .problem_space import stream_agent as stream_problem_space
+from .problem_space import astream_agent as astream_problem_space
 
 # Context Mapping agent (new - maps domains and stakeholders)
 from .context_mapping import PROMPT as CONTEXT_MAPPING_PROMPT
+from .context_mapping import TOKEN_BUDGET as CONTEXT_MAPPING_TOKEN_BUDGET
 from .context_mapping import run_agent as run_context_mapping
 from .context_mapping import stream_agent as stream_context_mapping
+from .context_mapping import astream_agent as astream_context_mapping
 
 # Constraints agent (new - surfaces hidden limitations)
 from .constraints import PROMPT as CONSTRAINTS_PROMPT
+from .constraints import TOKEN_BUDGET as CONSTRAINTS_TOKEN_BUDGET
 from .constraints import run_agent as run_constraints
 from .constraints import stream_agent as stream_constraints
+from .constraints import astream_agent as astream_constraints
 
 # Solution Validation agent (new - validates against 4 risks)
 from .solution_validation import PROMPT as SOLUTION_VALIDATION_PROMPT
+from .solution_validation import TOKEN_BUDGET as SOLUTION_VALIDATION_TOKEN_BUDGET
 from .solution_validation import run_agent as run_solution_validation
 from .solution_validation import stream_agent as stream_solution_validation
+from .solution_validation import astream_agent as astream_solution_validation
+
+# Default output budgets by classification (see budget.py)
+TOKEN_BUDGETS = {
+    "prioritization": PRIORITIZATION_TOKEN_BUDGET,
+    "problem_space": PROBLEM_SPACE_TOKEN_BUDGET,
+    "context_mapping": CONTEXT_MAPPING_TOKEN_BUDGET,
+    "constraints": CONSTRAINTS_TOKEN_BUDGET,
+    "solution_validation": SOLUTION_VALIDATION_TOKEN_BUDGET,
+}
 
 # Note: discovery.py is deprecated and will be removed after verification
 # The 4 new agents above replace the single discovery agent with specialized capabilities
 
 __all__ = [
+    "TOKEN_BUDGETS",
     # Prioritization
     "PRIORITIZATION_PROMPT",
+    "PRIORITIZATION_TOKEN_BUDGET",
     "run_prioritization",
     "stream_prioritization",
+    "astream_prioritization",
     # Problem Space
     "PROBLEM_SPACE_PROMPT",
+    "PROBLEM_SPACE_TOKEN_BUDGET",
     "run_problem_space",
     "stream_problem_space",
+    "astream_problem_space",
     # Context Mapping
     "CONTEXT_MAPPING_PROMPT",
+    "CONTEXT_MAPPING_TOKEN_BUDGET",
     "run_context_mapping",
     "stream_context_mapping",
+    "astream_context_mapping",
     # Constraints
     "CONSTRAINTS_PROMPT",
+    "CONSTRAINTS_TOKEN_BUDGET",
     "run_constraints",
     "stream_constraints",
+    "astream_constraints",
     # Solution Validation
     "SOLUTION_VALIDATION_PROMPT",
+    "SOLUTION_VALIDATION_TOKEN_BUDGET",
     "run_solution_validation",
     "stream_solution_validation",
+    "astream_solution_validation",
 ]
@@ -0,0 +1,265 @@
+"""
+Shared building blocks for the specialist agents.
+
+Each specialist's system prompt is sent as one system block marked with
+Anthropic cache_control, so repeated runs of the same agent read the prompt
+from the cache instead of reprocessing it. Anthropic ignores breakpoints on
+prefixes shorter than the model's minimum (1024 tokens for Sonnet), so a
+prompt is only marked when it is clearly above that.
+
+run_agent / stream_agent / astream_agent are the one implementation of a
+specialist call; each agent module binds them to its PROMPT and TOKEN_BUDGET.
+"""
+
+from ..logs import get_logger, token_logging_enabled
+from ..ratelimit import arate_limited, rate_limited
+
+# Marks a system block as a prompt-cache breakpoint
+CACHE_CONTROL = {"type": "ephemeral"}
+
+# Shortest prefix Anthropic caches for Sonnet
+MIN_CACHEABLE_TOKENS = 1024
+
+# Deliberately generous, so short prompts are not marked on an overestimate
+CHARS_PER_TOKEN = 4.5
+
+
+def is_cacheable(text: str) -> bool:
+    """Return True if text is long enough for Anthropic to cache it."""
+    return len(text) / CHARS_PER_TOKEN >= MIN_CACHEABLE_TOKENS
+
+
+def build_messages(system_prompt: str, user_input: str) -> list:
+    """
+    Build specialist messages, marking the system prompt as cacheable.
+
+    Args:
+        system_prompt: The agent's PROMPT
+        user_input: The user's problem statement
+
+    Returns:
+        Messages list for llm.invoke / llm.stream
+    """
+    block = {"type": "text", "text": system_prompt}
+    if is_cacheable(system_prompt):
+        block["cache_control"] = CACHE_CONTROL
+    return [
+        {"role": "system", "content": [block]},
+        {"role": "user", "content": user_input},
+    ]
+
+
+# --------------------
+# TOKEN USAGE
+# --------------------
+
+def summarize_usage(usage_metadata) -> dict:
+    """
+    Flatten LangChain usage metadata into prompt-cache aware token counts.
+
+    Args:
+        usage_metadata: AIMessage.usage_metadata (may be None)
+
+    Returns:
+        Dict with keys: input_tokens, output_tokens, cache_read_tokens, cache_write_tokens
+    """
+    usage = usage_metadata or {}
+    details = usage.get("input_token_details") or {}
+    return {
+        "input_tokens": usage.get("input_tokens") or 0,
+        "output_tokens": usage.get("output_tokens") or 0,
+        "cache_read_tokens": details.get("cache_read") or 0,
+        "cache_write_tokens": details.get("cache_creation") or 0,
+    }
+
+
+def add_usage(total: dict, usage_metadata) -> dict:
+    """Add a streamed chunk's usage metadata into a running summarize_usage() dict."""
+    if not usage_metadata:
+        return total
+    chunk = summarize_usage(usage_metadata)
+    return {key: total.get(key, 0) + chunk[key] for key in chunk}
+
+
+def cancelled_usage(usage: dict, produced: int) -> dict:
+    """
+    Usage of a stream stopped before its final chunk.
+
+    Anthropic reports output tokens at the end of the stream, so each chunk
+    received before cancelling counts as one output token.
+    """
+    return {**usage, "output_tokens": max(usage.get("output_tokens", 0), produced), "cancelled": True}
+
+
+def report_usage(logger, usage: dict, on_usage=None):
+    """
+    Surface per-call token usage, including prompt-cache reads and writes.
+
+    Args:
+        logger: The agent's structured logger
+        usage: Dict from summarize_usage / add_usage
+        on_usage: Optional callback receiving the usage dict
+    """
+    logger.info("Token usage", extra=usage)
+    if on_usage:
+        on_usage(usage)
+
+
+# --------------------
+# AGENT CALLS
+# --------------------
+
+def agent_logger(agent_name: str):
+    """Return the structured logger of an agent module (pm_agents.agents.<agent_name>)."""
+    return get_logger(f"{__package__}.{agent_name}", agent=agent_name)
+
+
+def run_agent(
+    prompt: str, agent_name: str, token_budget: int, user_input: str, llm, on_usage=None, max_tokens: int = None
+) -> str:
+    """
+    Run a specialist agent and return the response.
+
+    Args:
+        prompt: The agent's system prompt
+        agent_name: The agent's classification name (used for logging)
+        token_budget: Default output token limit for this agent
+        user_input: The user's problem statement
+        llm: The LLM instance to use for generating responses
+        on_usage: Optional callback receiving token usage (incl. prompt-cache reads/writes)
+        max_tokens: Output token limit (default: token_budget)
+
+    Returns:
+        The agent's response as a string
+    """
+    logger = agent_logger(agent_name)
+    logger.info("Agent started")
+
+    messages = build_messages(prompt, user_input)
+    max_tokens = max_tokens or token_budget
+    with rate_limited(messages, max_tokens) as permit:
+        response = llm.invoke(messages, max_tokens=max_tokens)
+        usage = permit.settle(summarize_usage(getattr(response, "usage_metadata", None)))
+
+    logger.debug("Agent output: %s...", response.content[:500])
+    report_usage(logger, usage, on_usage)
+
+    return response.content
+
+
+def stream_agent(
+    prompt: str,
+    agent_name: str,
+    token_budget: int,
+    user_input: str,
+    llm_streaming,
+    on_usage=None,
+    max_tokens: int = None,
+    cancel_token=None,
+):
+    """
+    Stream a specialist agent's response token by token.
+
+    Args:
+        prompt: The agent's system prompt
+        agent_name: The agent's classification name (used for logging)
+        token_budget: Default output token limit for this agent
+        user_input: The user's problem statement
+        llm_streaming: The streaming LLM instance
+        on_usage: Optional callback receiving token usage (incl. prompt-cache reads/writes)
+        max_tokens: Output token limit (default: token_budget)
+        cancel_token: Optional CancelToken; when cancelled, the stream stops at
+            the next chunk and the upstream request is closed
+
+    Yields:
+        Individual tokens as they're generated
+    """
+    logger = agent_logger(agent_name)
+    logger.info("Agent streaming started")
+
+    messages = build_messages(prompt, user_input)
+    max_tokens = max_tokens or token_budget
+    usage = summarize_usage(None)
+    log_tokens = token_logging_enabled(logger)
+
+    if cancel_token is not None and cancel_token.cancelled:
+        return
+
+    with rate_limited(messages, max_tokens) as permit:
+        stream = llm_streaming.stream(messages, max_tokens=max_tokens)
+        produced, completed = 0, False
+        try:
+            for chunk in stream:
+                if cancel_token is not None and cancel_token.cancelled:
+                    break
+                usage = add_usage(usage, getattr(chunk, "usage_metadata", None))
+                token = chunk.content
+                if token:
+                    if log_tokens:
+                        logger.debug("Token: %r", token)
+                    produced += 1
+                    yield token
+            else:
+                completed = True
+        finally:
+            stream.close()  # Stops upstream generation if we were cancelled or closed early
+            if not completed:
+                logger.info("Agent streaming cancelled", extra={"chunks": produced})
+                usage = cancelled_usage(usage, produced)
+            usage = permit.settle(usage)
+            report_usage(logger, usage, on_usage)
+
+
+async def astream_agent(
+    prompt: str,
+    agent_name: str,
+    token_budget: int,
+    user_input: str,
+    llm_streaming,
+    on_usage=None,
+    max_tokens: int = None,
+    cancel_token=None,
+):
+    """
+    Async version of stream_agent, streaming the response via astream.
+
+    Args:
+        (as for stream_agent)
+
+    Yields:
+        Individual tokens as they're generated
+    """
+    logger = agent_logger(agent_name)
+    logger.info("Agent async streaming started")
+
+    messages = build_messages(prompt, user_input)
+    max_tokens = max_tokens or token_budget
+    usage = summarize_usage(None)
+    log_tokens = token_logging_enabled(logger)
+
+    if cancel_token is not None and cancel_token.cancelled:
+        return
+
+    async with arate_limited(messages, max_tokens) as permit:
+        stream = llm_streaming.astream(messages, max_tokens=max_tokens)
+        produced, completed = 0, False
+        try:
+            async for chunk in stream:
+                if cancel_token is not None and cancel_token.cancelled:
+                    break
+                usage = add_usage(usage, getattr(chunk, "usage_metadata", None))
+                token = chunk.content
+                if token:
+                    if log_tokens:
+                        logger.debug("Token: %r", token)
+                    produced += 1
+                    yield token
+            else:
+                completed = True
+        finally:
+            await stream.aclose()  # Stops upstream generation if we were cancelled or closed early
+            if not completed:
+                logger.info("Agent streaming cancelled", extra={"chunks": produced})
+                usage = cancelled_usage(usage, produced)
+            usage = permit.settle(usage)
+            report_usage(logger, usage, on_usage)
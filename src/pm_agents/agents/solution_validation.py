@@ -7,6 +7,10 @@ This agent uses "generative" behavior: makes soft guesses, proceeds with analysi
 and produces validation questions instead of blocking and waiting for user input.
 """
 
+from . import common
+
+AGENT = "solution_validation"
+
 PROMPT = """You are a senior PM coach helping validate solution ideas.
 
 ## Your Role
@@ -199,57 +203,24 @@ Don't say: "Confidence: Medium"
 Do say: "Confidence: Medium - based on 3 soft guesses about your current process. Would increase to High if you confirm [X, Y, Z]."
 """
 
+# Default max_tokens for this agent's answers; budget.py adapts it from observed lengths
+TOKEN_BUDGET = 8192
 
-def run_agent(user_input: str, llm) -> str:
-    """
-    Run the solution validation agent and return the response.
-
-    Args:
-        user_input: The user's problem statement
-        llm: The LLM instance to use for generating responses
-
-    Returns:
-        The agent's response as a string
-    """
-    print("\n" + "="*50)
-    print("SOLUTION VALIDATION AGENT")
-    print("="*50)
-
-    messages = [
-        {"role": "system", "content": PROMPT},
-        {"role": "user", "content": user_input}
-    ]
-    response = llm.invoke(messages)
-
-    print(f"\nAgent output:\n{response.content[:500]}...")
-
-    return response.content
-
-
-def stream_agent(user_input: str, llm_streaming):
-    """
-    Stream the solution validation agent's response token by token.
 
-    Args:
-        user_input: The user's problem statement
-        llm_streaming: The streaming LLM instance
+def run_agent(user_input: str, llm, on_usage=None, max_tokens: int = None) -> str:
+    """Run the solution validation agent and return the response (see common.run_agent)."""
+    return common.run_agent(PROMPT, AGENT, TOKEN_BUDGET, user_input, llm, on_usage, max_tokens)
 
-    Yields:
-        Individual tokens as they're generated
-    """
-    print("\n" + "="*50)
-    print("SOLUTION VALIDATION AGENT (STREAMING)")
-    print("="*50)
 
-    messages = [
-        {"role": "system", "content": PROMPT},
-        {"role": "user", "content": user_input}
-    ]
+def stream_agent(user_input: str, llm_streaming, on_usage=None, max_tokens: int = None, cancel_token=None):
+    """Stream the solution validation agent's response token by token (see common.stream_agent)."""
+    return common.stream_agent(
+        PROMPT, AGENT, TOKEN_BUDGET, user_input, llm_streaming, on_usage, max_tokens, cancel_token
+    )
 
-    for chunk in llm_streaming.stream(messages):
-        token = chunk.content
-        if token:
-            print(token, end="", flush=True)
-            yield token
 
-    print()  # Newline after streaming
+def astream_agent(user_input: str, llm_streaming, on_usage=None, max_tokens: int = None, cancel_token=None):
+    """Async version of stream_agent; returns an async generator (see common.astream_agent)."""
+    return common.astream_agent(
+        PROMPT, AGENT, TOKEN_BUDGET, user_input, llm_streaming, on_usage, max_tokens, cancel_token
+    )
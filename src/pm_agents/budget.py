@@ -0,0 +1,237 @@
+"""
+Per-agent output token budgets.
+
+Each specialist defines a default TOKEN_BUDGET next to its prompt (the
+client's MAX_TOKENS, so a cold start never truncates answers the baseline
+would have finished). The OutputBudget here learns each agent's typical
+output length from finished specialist runs (live metrics records, or a
+metrics file from earlier runs) and, once MIN_SAMPLES runs are measured, sets:
+
+- limit: the max_tokens sent with the request, the observed p95 plus
+  headroom, clamped between MIN_LIMIT and the model's MAX_TOKENS
+- expected: the typical (median) output length, for schedulers that admit
+  concurrent streams by expected token cost instead of the worst case
+
+A run that hits its limit was probably cut short, so it counts as a longer
+sample and the next limit grows.
+
+"Concise" mode halves the budgets and asks the agent for a shorter answer;
+it is learned separately from normal runs.
+
+Configure via environment variables:
+- PM_AGENTS_CONCISE: "1" to run specialists in concise mode by default
+- PM_AGENTS_ADAPTIVE_BUDGETS: "0" to always use the static TOKEN_BUDGETs
+- PM_AGENTS_METRICS_FILE: Also read on first use to learn from earlier runs
+"""
+
+import json
+import os
+import threading
+from collections import deque
+
+from .agents import TOKEN_BUDGETS
+from .llm import MAX_TOKENS
+from .metrics import add_metrics_exporter, remove_metrics_exporter
+
+MIN_LIMIT = 1024
+MIN_SAMPLES = 10
+LIMIT_QUANTILE = 0.95
+HEADROOM = 1.2
+CONCISE_FACTOR = 0.5
+TRUNCATION_GROWTH = 1.5
+EXPECTED_FRACTION = 0.6  # Expected length as a share of the limit before samples exist
+
+CONCISE_INSTRUCTION = (
+    "Be concise: keep the entire answer under about {words} words. Keep every "
+    "section of the Output Structure and the Questions section, but use short "
+    "bullets instead of paragraphs."
+)
+
+
+def concise_mode_default() -> bool:
+    """Return True if PM_AGENTS_CONCISE enables concise mode by default."""
+    return os.getenv("PM_AGENTS_CONCISE", "") in ("1", "true", "yes")
+
+
+def concise_instruction(limit: int) -> str:
+    """Return the note appended to a specialist's context in concise mode."""
+    return CONCISE_INSTRUCTION.format(words=int(limit * 0.6) // 50 * 50)
+
+
+def _key(agent: str, concise: bool) -> str:
+    return f"{agent}:concise" if concise else agent
+
+
+class OutputBudget:
+    """
+    Learns per-agent output lengths and derives max_tokens limits.
+
+    Args:
+        static_budgets: Default limits by agent (TOKEN_BUDGETS)
+        adaptive: Learn from observed runs; if False, only the static budgets are used
+        window: Samples kept per agent and mode
+        min_samples: Samples needed before the learned limit replaces the static one
+    """
+
+    def __init__(
+        self,
+        static_budgets: dict = None,
+        adaptive: bool = True,
+        window: int = 200,
+        min_samples: int = MIN_SAMPLES,
+    ):
+        self.static_budgets = dict(static_budgets or TOKEN_BUDGETS)
+        self.adaptive = adaptive
+        self.window = window
+        self.min_samples = min_samples
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def _static(self, agent: str, concise: bool) -> int:
+        budget = self.static_budgets.get(agent, MAX_TOKENS)
+        return max(MIN_LIMIT, int(budget * CONCISE_FACTOR)) if concise else budget
+
+    def _sorted_samples(self, agent: str, concise: bool) -> list:
+        if not self.adaptive:
+            return []
+        with self._lock:
+            samples = sorted(self._samples.get(_key(agent, concise), ()))
+        return samples if len(samples) >= self.min_samples else []
+
+    def limit(self, agent: str, concise: bool = False) -> int:
+        """Return the max_tokens to request for an agent."""
+        samples = self._sorted_samples(agent, concise)
+        if not samples:
+            return self._static(agent, concise)
+        p95 = samples[min(len(samples) - 1, int(LIMIT_QUANTILE * len(samples)))]
+        return max(MIN_LIMIT, min(MAX_TOKENS, int(p95 * HEADROOM)))
+
+    def expected(self, agent: str, concise: bool = False) -> int:
+        """Return the typical output tokens for an agent (for admission and scheduling)."""
+        samples = self._sorted_samples(agent, concise)
+        if not samples:
+            return int(self._static(agent, concise) * EXPECTED_FRACTION)
+        return samples[len(samples) // 2]
+
+    def observe(self, agent: str, output_tokens: int, limit: int = None, concise: bool = False):
+        """
+        Record one finished run.
+
+        Args:
+            agent: Classification of the specialist
+            output_tokens: Tokens it generated
+            limit: max_tokens it ran with (to detect truncation)
+            concise: Whether it ran in concise mode
+        """
+        if not output_tokens:
+            return
+        if limit and output_tokens >= limit * 0.98:
+            # Probably cut off: the answer wanted more than the limit
+            output_tokens = int(limit * TRUNCATION_GROWTH)
+        with self._lock:
+            samples = self._samples.get(_key(agent, concise))
+            if samples is None:
+                samples = self._samples[_key(agent, concise)] = deque(maxlen=self.window)
+            samples.append(output_tokens)
+
+    def observe_record(self, record: dict):
+        """Learn from a metrics record of a finished specialist run (others are ignored)."""
+        if record.get("stage") not in ("specialist", "specialist_fanout") or not record.get("agent"):
+            return
+        if record.get("aborted") or record.get("cancelled"):
+            return
+        self.observe(
+            record["agent"],
+            record.get("output_tokens") or 0,
+            limit=record.get("max_tokens"),
+            concise=bool(record.get("concise")),
+        )
+
+    # Usable directly as a metrics exporter
+    __call__ = observe_record
+
+    def learn_from_file(self, path: str) -> int:
+        """
+        Learn from a JSON-lines metrics file (see metrics.JsonlExporter).
+
+        Returns:
+            Number of lines read
+        """
+        if not path or not os.path.exists(path):
+            return 0
+        count = 0
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    self.observe_record(json.loads(line))
+                except (ValueError, TypeError, AttributeError):
+                    continue
+                count += 1
+        return count
+
+    def snapshot(self) -> dict:
+        """Return {agent: {"limit", "expected", "samples"}} for normal and concise modes."""
+        result = {}
+        for agent in self.static_budgets:
+            for concise in (False, True):
+                with self._lock:
+                    count = len(self._samples.get(_key(agent, concise), ()))
+                result[_key(agent, concise)] = {
+                    "limit": self.limit(agent, concise),
+                    "expected": self.expected(agent, concise),
+                    "samples": count,
+                }
+        return result
+
+
+# --------------------
+# ACTIVE BUDGET
+# --------------------
+
+_budget = None
+_budget_lock = threading.Lock()
+
+
+def get_output_budget() -> OutputBudget:
+    """
+    Return the shared OutputBudget, building it on first use.
+
+    The first call loads PM_AGENTS_METRICS_FILE (if any) and registers the
+    budget as a metrics exporter, so it keeps learning from live runs.
+    """
+    global _budget
+    if _budget is None:
+        with _budget_lock:
+            if _budget is None:
+                adaptive = os.getenv("PM_AGENTS_ADAPTIVE_BUDGETS", "1") not in ("0", "false", "no")
+                budget = OutputBudget(adaptive=adaptive)
+                if adaptive:
+                    budget.learn_from_file(os.getenv("PM_AGENTS_METRICS_FILE"))
+                    add_metrics_exporter(budget)
+                _budget = budget
+    return _budget
+
+
+def set_output_budget(budget: OutputBudget = None):
+    """Replace the shared OutputBudget (None rebuilds it on next use); it learns from live runs if adaptive."""
+    global _budget
+    with _budget_lock:
+        if _budget is not None:
+            remove_metrics_exporter(_budget)
+        if budget is not None and budget.adaptive:
+            add_metrics_exporter(budget)
+        _budget = budget
+
+
+def token_limit(agent: str, concise: bool = None) -> int:
+    """max_tokens for an agent's next run (concise defaults to PM_AGENTS_CONCISE)."""
+    if concise is None:
+        concise = concise_mode_default()
+    return get_output_budget().limit(agent, concise)
+
+
+def expected_output_tokens(agent: str, concise: bool = None) -> int:
+    """Typical output tokens of an agent's run (concise defaults to PM_AGENTS_CONCISE)."""
+    if concise is None:
+        concise = concise_mode_default()
+    return get_output_budget().expected(agent, concise)
@@ -0,0 +1,292 @@
+"""
+Response cache for coordinator LLM calls.
+
+Refinement, classification and soft-guess extraction are short, deterministic-
+enough calls that users re-trigger constantly (e.g. hitting "Back" at a
+checkpoint and continuing again). Responses are cached by a content hash of
+the messages plus the model parameters, so an identical request is served
+without a model round-trip.
+
+Caching is opt-in: a cached answer is replayed verbatim instead of being
+sampled again, which changes what callers of the coordinator see.
+
+Two backends are provided:
+- InMemoryCache: per-process LRU
+- SQLiteCache: on-disk, shared across processes and restarts
+
+Configure via environment variables (read on first use):
+- PM_AGENTS_CACHE: "off" (default), "memory", or "sqlite"
+- PM_AGENTS_CACHE_PATH: SQLite file path (default: .pm_agents_cache.sqlite3)
+- PM_AGENTS_CACHE_TTL: Entry lifetime in seconds (default: 3600)
+- PM_AGENTS_CACHE_MAX_ENTRIES: Size bound before eviction (default: 1024)
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+DEFAULT_TTL_SECONDS = 3600
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_SQLITE_PATH = ".pm_agents_cache.sqlite3"
+
+
+def make_cache_key(messages: list, model: str = None, max_tokens: int = None, **params) -> str:
+    """
+    Build a content-addressed cache key for an LLM request.
+
+    Args:
+        messages: The chat messages sent to the model
+        model: Model identifier
+        max_tokens: Output token limit
+        **params: Any other request parameters that affect the response
+
+    Returns:
+        Hex SHA-256 digest identifying the request
+    """
+    payload = {
+        "messages": messages,
+        "model": model,
+        "max_tokens": max_tokens,
+        "params": params,
+    }
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def cache_key_for_llm(messages: list, llm) -> str:
+    """Build a cache key using the model parameters of a ChatAnthropic-like client."""
+    return make_cache_key(
+        messages,
+        model=getattr(llm, "model", None) or getattr(llm, "model_name", None),
+        max_tokens=getattr(llm, "max_tokens", None),
+        temperature=getattr(llm, "temperature", None),
+    )
+
+
+# --------------------
+# BACKENDS
+# --------------------
+
+class ResponseCache:
+    """
+    Base class for response caches.
+
+    Subclasses implement _get, _set, _clear and _size; this class handles
+    TTL bookkeeping and hit/miss counters.
+    """
+
+    def __init__(self, ttl_seconds: float = DEFAULT_TTL_SECONDS, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+    def get(self, key: str):
+        """Return the cached response text for key, or None on a miss."""
+        value = self._get(key, time.time())
+        with self._stats_lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key: str, value: str):
+        """Store response text under key, evicting old entries if needed."""
+        self._set(key, value, time.time())
+
+    def clear(self):
+        """Remove all entries and reset counters."""
+        self._clear()
+        with self._stats_lock:
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and current size."""
+        with self._stats_lock:
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / total if total else 0.0,
+            "size": self._size(),
+        }
+
+    def _is_expired(self, created_at: float, now: float) -> bool:
+        return self.ttl_seconds is not None and now - created_at > self.ttl_seconds
+
+    def _get(self, key: str, now: float):
+        raise NotImplementedError
+
+    def _set(self, key: str, value: str, now: float):
+        raise NotImplementedError
+
+    def _clear(self):
+        raise NotImplementedError
+
+    def _size(self) -> int:
+        raise NotImplementedError
+
+
+class InMemoryCache(ResponseCache):
+    """Thread-safe in-process LRU cache with TTL."""
+
+    def __init__(self, ttl_seconds: float = DEFAULT_TTL_SECONDS, max_entries: int = DEFAULT_MAX_ENTRIES):
+        super().__init__(ttl_seconds, max_entries)
+        self._entries = OrderedDict()  # key -> (created_at, value)
+        self._lock = threading.Lock()
+
+    def _get(self, key, now):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            created_at, value = entry
+            if self._is_expired(created_at, now):
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def _set(self, key, value, now):
+        with self._lock:
+            self._entries[key] = (now, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _size(self):
+        with self._lock:
+            return len(self._entries)
+
+
+class SQLiteCache(ResponseCache):
+    """
+    On-disk cache backed by SQLite.
+
+    Entries survive restarts and can be shared by several worker processes
+    pointing at the same file. Eviction is least-recently-accessed.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_SQLITE_PATH,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ):
+        import sqlite3  # Deferred: only needed when the SQLite backend is used
+
+        super().__init__(ttl_seconds, max_entries)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )"""
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)"
+            )
+
+    def _get(self, key, now):
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            if self._is_expired(created_at, now):
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            self._conn.execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            return value
+
+    def _set(self, key, value, now):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+            if self.ttl_seconds is not None:
+                self._conn.execute(
+                    "DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,)
+                )
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def _clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses")
+
+    def _size(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+
+# --------------------
+# ACTIVE CACHE
+# --------------------
+
+_UNSET = object()
+_response_cache = _UNSET
+_cache_lock = threading.Lock()
+
+
+def cache_from_env():
+    """Build the cache described by the PM_AGENTS_CACHE* environment variables."""
+    backend = os.getenv("PM_AGENTS_CACHE", "off").lower()
+    ttl = float(os.getenv("PM_AGENTS_CACHE_TTL", DEFAULT_TTL_SECONDS))
+    max_entries = int(os.getenv("PM_AGENTS_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES))
+
+    if backend == "sqlite":
+        path = os.getenv("PM_AGENTS_CACHE_PATH", DEFAULT_SQLITE_PATH)
+        return SQLiteCache(path, ttl_seconds=ttl, max_entries=max_entries)
+    if backend == "memory":
+        return InMemoryCache(ttl_seconds=ttl, max_entries=max_entries)
+    return None
+
+
+def get_response_cache():
+    """Return the active response cache, or None if caching is disabled."""
+    global _response_cache
+    if _response_cache is _UNSET:
+        with _cache_lock:
+            if _response_cache is _UNSET:
+                _response_cache = cache_from_env()
+    return _response_cache
+
+
+def set_response_cache(cache):
+    """
+    Replace the active response cache.
+
+    Args:
+        cache: A ResponseCache instance, or None to disable caching
+    """
+    global _response_cache
+    with _cache_lock:
+        _response_cache = cache
@@ -0,0 +1,59 @@
+"""
+Cooperative cancellation for streaming stages.
+
+A specialist stream keeps generating until max_tokens unless someone stops
+it. Stage generators stop (and close the upstream HTTP stream) in two ways:
+
+- The consumer stops iterating: closing the generator (generator.close(),
+  aclose(), or a cancelled asyncio task) closes the agent's stream.
+- A CancelToken passed to the stage is cancelled, e.g. from another thread
+  when the user starts a new problem: the stream stops at its next chunk.
+
+Either way the stage records a metrics record with cancelled=True and
+tokens_saved, the output tokens the agent would typically still have
+generated (see budget.expected_output_tokens).
+
+Usage:
+    token = CancelToken()
+    for event_type, data in run_stage4_specialist(refined, classification, cancel_token=token):
+        ...
+    # elsewhere
+    token.cancel("new problem")
+"""
+
+import threading
+
+from .budget import expected_output_tokens
+
+
+class CancelToken:
+    """Thread-safe flag asking streaming stages to stop."""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self.reason = None
+
+    def cancel(self, reason: str = "cancelled"):
+        """Request cancellation (only the first reason is kept)."""
+        if not self._event.is_set():
+            self.reason = reason
+            self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+
+def tokens_saved(agent: str, produced: int, concise: bool = None) -> int:
+    """
+    Estimate the output tokens a cancelled run did not generate.
+
+    Args:
+        agent: Classification of the specialist
+        produced: Output tokens generated before cancelling
+        concise: Whether it ran in concise mode
+
+    Returns:
+        max(0, typical output length - produced)
+    """
+    return max(0, expected_output_tokens(agent, concise) - produced)
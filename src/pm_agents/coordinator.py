@@ -12,8 +12,149 @@ Currently supports 5 agent types (with room to expand to ~10):
 Also handles:
 - Problem refinement (making vague inputs more specific)
 - Soft guesses extraction (surfacing assumptions for validation)
+- Fast path: refinement + classification + soft guesses in one call
+
+Coordinator LLM calls go through the response cache when one is enabled
+(see cache.py); cache misses are admitted by the rate limiter (see ratelimit.py) and run
+under the retry / deadline / hedging policy (see resilience.py).
+Classification can be answered by a local model when it is confident
+(see local_classifier.py).
 """
 
+from .agents.common import summarize_usage
+from .cache import cache_key_for_llm, get_response_cache
+from .local_classifier import classify_locally, record_decision
+from .logs import get_logger
+from .metrics import StageTimer
+from .ratelimit import arate_limited, rate_limited
+from .resilience import get_resilience_policy
+
+logger = get_logger(__name__, agent="coordinator")
+
+# --------------------
+# LLM CALLS
+# --------------------
+
+def _cache_hit_usage() -> dict:
+    """Usage reported for a response served from the response cache."""
+    return {**summarize_usage(None), "response_cache_hit": True}
+
+
+def _local_classification(user_input: str, on_usage=None):
+    """Return the local classifier's confident answer (reporting zero usage), or None."""
+    local = classify_locally(user_input)
+    if local is not None:
+        logger.info(
+            "Classified locally",
+            extra={"step": "classification", "classification": local[0], "alternatives": local[2]},
+        )
+        if on_usage:
+            on_usage({**summarize_usage(None), "local_classifier": True})
+    return local
+
+
+def _with_call_info(usage: dict, info: dict) -> dict:
+    """Add retry/hedge details from the resilience policy to a usage dict."""
+    if info["attempts"] > 1:
+        usage = {**usage, "retries": info["attempts"] - 1}
+    if info["hedged"]:
+        usage = {**usage, "hedged": True}
+    return usage
+
+
+def _discarded_usage(stage: str):
+    """on_discarded callback exporting the usage of an unused (e.g. losing hedged) request."""
+    def report(result):
+        timer = StageTimer("hedge")
+        timer.add_usage(result[1])
+        timer.finish(discarded=True, hedged_stage=stage)
+
+    return report
+
+
+def _call_llm(llm, messages: list) -> tuple:
+    """One rate-limited request; returns (text, usage)."""
+    with rate_limited(messages) as permit:
+        response = llm.invoke(messages)
+        usage = permit.settle(summarize_usage(getattr(response, "usage_metadata", None)))
+    return response.content, usage
+
+
+async def _acall_llm(llm, messages: list) -> tuple:
+    """Async version of _call_llm."""
+    async with arate_limited(messages) as permit:
+        response = await llm.ainvoke(messages)
+        usage = permit.settle(summarize_usage(getattr(response, "usage_metadata", None)))
+    return response.content, usage
+
+
+def _fetch(llm, messages: list, on_usage=None, stage: str = None) -> tuple:
+    """
+    Invoke the LLM, serving identical requests from the response cache.
+
+    Args:
+        llm: The LLM instance
+        messages: Chat messages to send
+        on_usage: Optional callback receiving token usage for this call
+        stage: Stage name for the resilience policy's deadlines and hedging
+
+    Returns:
+        Tuple of (response text, fresh), fresh being False for a cache hit
+    """
+    cache = get_response_cache()
+    key = cache_key_for_llm(messages, llm) if cache is not None else None
+
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            logger.debug("Served from response cache")
+            if on_usage:
+                on_usage(_cache_hit_usage())
+            return cached, False
+
+    (content, usage), info = get_resilience_policy().call(
+        lambda: _call_llm(llm, messages), stage=stage, on_discarded=_discarded_usage(stage)
+    )
+    if on_usage:
+        on_usage(_with_call_info(usage, info))
+    if cache is not None:
+        cache.set(key, content)
+    return content, True
+
+
+async def _afetch(llm, messages: list, on_usage=None, stage: str = None) -> tuple:
+    """Async version of _fetch, using llm.ainvoke on a cache miss."""
+    cache = get_response_cache()
+    key = cache_key_for_llm(messages, llm) if cache is not None else None
+
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            logger.debug("Served from response cache")
+            if on_usage:
+                on_usage(_cache_hit_usage())
+            return cached, False
+
+    (content, usage), info = await get_resilience_policy().acall(
+        lambda: _acall_llm(llm, messages), stage=stage, on_discarded=_discarded_usage(stage)
+    )
+    if on_usage:
+        on_usage(_with_call_info(usage, info))
+    if cache is not None:
+        cache.set(key, content)
+    return content, True
+
+
+def _invoke(llm, messages: list, on_usage=None, stage: str = None) -> str:
+    """_fetch, returning just the response text."""
+    return _fetch(llm, messages, on_usage, stage)[0]
+
+
+async def _ainvoke(llm, messages: list, on_usage=None, stage: str = None) -> str:
+    """Async version of _invoke."""
+    return (await _afetch(llm, messages, on_usage, stage))[0]
+
+
 # --------------------
 # PROMPTS
 # --------------------
@@ -95,6 +236,68 @@ CLASSIFICATION: [prioritization, problem_space, context_mapping, constraints, or
 REASONING: [2-3 sentences explaining why this category fits]
 ALTERNATIVES: [Comma-separated list of other categories that could partially fit, ranked by relevance. If none, write "None"]"""
 
+COMBINED_PROMPT = """You are a PM coach coordinator. In a single pass you will:
+1. Refine the user's problem statement
+2. Classify the refined statement into ONE of 5 categories
+3. Identify 3-5 assumptions that would significantly change the analysis if wrong
+
+## Step 1: Refinement
+- Make it more specific and concrete: WHO, WHAT pain, HOW OFTEN
+- If already specific, make minimal changes
+- Don't add fluff or corporate speak
+
+## Step 2: Classification
+Use exactly one of: prioritization, problem_space, context_mapping, constraints, solution_validation
+- prioritization: choosing between options, ranking, trade-offs, resource allocation
+- problem_space: validating if a problem actually exists and matters
+- context_mapping: learning an unfamiliar domain, organization, or stakeholder landscape
+- constraints: surfacing hidden blockers or limitations
+- solution_validation: validating a solution idea (value, usability, feasibility, viability)
+
+## Step 3: Assumptions
+Focus on who experiences the problem, how severe/frequent it is, the current state,
+why they're asking now, and what success looks like.
+
+## Response Format
+Respond in this exact format and order:
+REFINED_STATEMENT: [2-3 sentence specific version]
+
+IMPROVEMENTS_MADE:
+- [What you made more specific]
+- [What assumptions you surfaced]
+
+CLASSIFICATION: [one category]
+REASONING: [2-3 sentences explaining why this category fits]
+ALTERNATIVES: [Comma-separated list of other categories that could partially fit, ranked by relevance. If none, write "None"]
+
+SOFT_GUESSES:
+- [Topic]: [What we're assuming] — Confidence: [High/Medium/Low] — [Brief reason]"""
+
+
+# Valid classifications (order matters for matching: longer names first)
+VALID_CLASSIFICATIONS = (
+    "solution_validation",
+    "context_mapping",
+    "problem_space",
+    "prioritization",
+    "constraints",
+)
+_VALID_CLASSIFICATION_SET = frozenset(VALID_CLASSIFICATIONS)
+
+
+def _match_classification(text: str):
+    """Return the first valid classification (in list order) contained in text, or None."""
+    if text in _VALID_CLASSIFICATION_SET:
+        return text
+    for valid in VALID_CLASSIFICATIONS:
+        if valid in text:
+            return valid
+    return None
+
+
+# The parsers below run in one pass over the lines. str.upper() maps each
+# character independently, so upper-casing just a key-length prefix answers
+# line.upper().startswith(KEY) without upper-casing the whole line.
 
 def parse_response(response_text: str) -> tuple[str, str, list]:
     """
@@ -106,88 +309,127 @@ def parse_response(response_text: str) -> tuple[str, str, list]:
     Returns:
         Tuple of (classification, reasoning, alternatives)
     """
-    # Valid classifications (order matters for matching)
-    valid_classifications = [
-        "solution_validation",  # Check longer names first
-        "context_mapping",
-        "problem_space",
-        "prioritization",
-        "constraints",
-    ]
+    return _parse_response(response_text)[:3]
+
 
+def _parse_response(response_text: str) -> tuple:
+    """parse_response, plus whether a valid CLASSIFICATION line was found (False means the fallback)."""
     classification = "problem_space"  # default fallback for unknown
+    parsed = False
     reasoning = ""
     alternatives = []
 
+    # Sometimes reasoning spans multiple lines: remember where the first
+    # REASONING line starts and where the next ALTERNATIVES line ends it
+    reasoning_start = None
+    reasoning_end = None
+
     lines = response_text.strip().split("\n")
-    for line in lines:
-        if line.upper().startswith("CLASSIFICATION:"):
-            value = line.split(":", 1)[1].strip().lower()
-            # Find matching classification
-            for valid in valid_classifications:
-                if valid in value:
-                    classification = valid
-                    break
-        elif line.upper().startswith("REASONING:"):
-            reasoning = line.split(":", 1)[1].strip()
-        elif line.upper().startswith("ALTERNATIVES:"):
-            alt_text = line.split(":", 1)[1].strip().lower()
+    for index, line in enumerate(lines):
+        head = line[:15].upper()
+        if head.startswith("CLASSIFICATION:"):
+            match = _match_classification(line.partition(":")[2].strip().lower())
+            if match:
+                classification = match
+                parsed = True
+        elif head.startswith("REASONING:"):
+            reasoning = line.partition(":")[2].strip()
+            if reasoning_start is None:
+                reasoning_start = index
+        elif head.startswith("ALTERNATIVES:"):
+            if reasoning_start is not None and reasoning_end is None:
+                reasoning_end = index
+            alt_text = line.partition(":")[2].strip().lower()
             if alt_text and alt_text != "none":
                 # Parse comma-separated alternatives
                 for alt in alt_text.split(","):
-                    alt = alt.strip()
-                    for valid in valid_classifications:
-                        if valid in alt:
-                            if valid != classification:  # Don't include primary
-                                alternatives.append(valid)
-                            break
-
-    # Sometimes reasoning spans multiple lines
-    if not reasoning:
-        for i, line in enumerate(lines):
-            if line.upper().startswith("REASONING:"):
-                # Get text until ALTERNATIVES line
-                reasoning_lines = []
-                for j in range(i, len(lines)):
-                    if lines[j].upper().startswith("ALTERNATIVES:"):
-                        break
-                    reasoning_lines.append(lines[j])
-                reasoning = " ".join(reasoning_lines).replace("REASONING:", "").strip()
-                break
+                    match = _match_classification(alt.strip())
+                    if match and match != classification:  # Don't include primary
+                        alternatives.append(match)
 
-    return classification, reasoning, alternatives
+    if not reasoning and reasoning_start is not None:
+        end = len(lines) if reasoning_end is None else reasoning_end
+        reasoning = " ".join(lines[reasoning_start:end]).replace("REASONING:", "").strip()
+
+    return classification, reasoning, alternatives, parsed
 
 
-def run_coordinator(user_input: str, llm) -> tuple[str, str, list]:
+def run_coordinator(user_input: str, llm, on_usage=None) -> tuple[str, str, list]:
     """
     Run the coordinator to classify the problem.
 
     Args:
         user_input: The user's problem statement
         llm: The LLM instance
+        on_usage: Optional callback receiving token usage for this call
 
     Returns:
         Tuple of (classification, reasoning, alternatives)
     """
-    print("\n" + "="*50)
-    print("COORDINATOR AGENT")
-    print("="*50)
-    print(f"Input: {user_input[:100]}...")
+    logger.info("Classification started: %s...", user_input[:100], extra={"step": "classification"})
+
+    local = _local_classification(user_input, on_usage)
+    if local is not None:
+        return local
 
     messages = [
         {"role": "system", "content": PROMPT},
         {"role": "user", "content": user_input}
     ]
-    response = llm.invoke(messages)
-    response_text = response.content
+    response_text, fresh = _fetch(llm, messages, on_usage, stage="classification")
 
-    print(f"\nRaw response:\n{response_text}")
+    logger.debug("Raw response:\n%s", response_text)
 
-    classification, reasoning, alternatives = parse_response(response_text)
+    classification, reasoning, alternatives, parsed = _parse_response(response_text)
+    # Only teach the local classifier from answers the model actually gave
+    if fresh and parsed:
+        record_decision(user_input, classification)
 
-    print(f"\nParsed classification: {classification}")
-    print(f"Parsed reasoning: {reasoning}")
-    print(f"Parsed alternatives: {alternatives}")
+    logger.info(
+        "Parsed classification",
+        extra={"classification": classification, "alternatives": alternatives},
+    )
+    logger.debug("Parsed reasoning: %s", reasoning)
+
+    return classification, reasoning, alternatives
+
+
+async def arun_coordinator(user_input: str, llm, on_usage=None) -> tuple[str, str, list]:
+    """
+    Async version of run_coordinator, using llm.ainvoke.
+
+    Args:
+        user_input: The user's problem statement
+        llm: The LLM instance
+        on_usage: Optional callback receiving token usage for this call
+
+    Returns:
+        Tuple of (classification, reasoning, alternatives)
+    """
+    logger.info("Classification started: %s...", user_input[:100], extra={"step": "classification"})
+
+    local = _local_classification(user_input, on_usage)
+    if local is not None:
+        return local
+
+    messages = [
+        {"role": "system", "content": PROMPT},
+        {"role": "user", "content": user_input}
+    ]
+    response_text, fresh = await _afetch(llm, messages, on_usage, stage="classification")
+
+    logger.debug("Raw response:\n%s", response_text)
+
+    classification, reasoning, alternatives, parsed = _parse_response(response_text)
+    # Only teach the local classifier from answers the model actually gave
+    if fresh and parsed:
+        record_decision(user_input, classification)
+
+    logger.info(
+        "Parsed classification",
+        extra={"classification": classification, "alternatives": alternatives},
+    )
+    logger.debug("Parsed reasoning: %s", reasoning)
 
     return classification, reasoning, alternatives
 
@@ -203,67 +445,94 @@ def parse_refinement_response(response_text: str) -> dict:
     Returns:
         Dict with keys: refined_statement, improvements, soft_guesses
     """
-    result = {
-        "refined_statement": "",
-        "improvements": [],
-        "soft_guesses": []
-    }
-
-    lines = response_text.strip().split("\n")
+    refined_parts = []
+    improvements = []
+    soft_guesses = []
     current_section = None
 
-    for line in lines:
+    for line in response_text.strip().split("\n"):
         line_stripped = line.strip()
+        head = line_stripped[:18].upper()
 
-        if line_stripped.upper().startswith("REFINED_STATEMENT:"):
+        if head.startswith("REFINED_STATEMENT:"):
             current_section = "refined"
-            result["refined_statement"] = line_stripped.split(":", 1)[1].strip()
-        elif line_stripped.upper().startswith("IMPROVEMENTS_MADE:"):
+            refined_parts = [line_stripped.partition(":")[2].strip()]
+        elif head.startswith("IMPROVEMENTS_MADE:"):
             current_section = "improvements"
-        elif line_stripped.upper().startswith("SOFT_GUESSES:"):
+        elif head.startswith("SOFT_GUESSES:"):
             current_section = "soft_guesses"
         elif line_stripped.startswith("- "):
-            item = line_stripped[2:].strip()
             if current_section == "improvements":
-                result["improvements"].append(item)
+                improvements.append(line_stripped[2:].strip())
             elif current_section == "soft_guesses":
-                result["soft_guesses"].append(item)
+                soft_guesses.append(line_stripped[2:].strip())
         elif current_section == "refined" and line_stripped:
             # Multi-line refined statement
-            result["refined_statement"] += " " + line_stripped
+            refined_parts.append(line_stripped)
 
-    return result
+    return {
+        "refined_statement": " ".join(refined_parts),
+        "improvements": improvements,
+        "soft_guesses": soft_guesses
+    }
 
 
-def run_refinement(user_input: str, llm) -> dict:
+def run_refinement(user_input: str, llm, on_usage=None) -> dict:
     """
     Run the refinement step to make the problem statement more specific.
 
     Args:
         user_input: The user's original problem statement
         llm: The LLM instance
+        on_usage: Optional callback receiving token usage for this call
+
+    Returns:
+        Dict with keys: refined_statement, improvements, soft_guesses
+    """
+    logger.info("Refinement started: %s...", user_input[:100], extra={"step": "refinement"})
+
+    messages = [
+        {"role": "system", "content": REFINEMENT_PROMPT},
+        {"role": "user", "content": user_input}
+    ]
+    response_text = _invoke(llm, messages, on_usage, stage="refinement")
+
+    logger.debug("Raw response:\n%s", response_text)
+
+    result = parse_refinement_response(response_text)
+
+    logger.info("Refined statement: %s...", result["refined_statement"][:100])
+    logger.debug("Improvements: %s", result["improvements"])
+
+    return result
+
+
+async def arun_refinement(user_input: str, llm, on_usage=None) -> dict:
+    """
+    Async version of run_refinement, using llm.ainvoke.
+
+    Args:
+        user_input: The user's original problem statement
+        llm: The LLM instance
+        on_usage: Optional callback receiving token usage for this call
 
     Returns:
         Dict with keys: refined_statement, improvements, soft_guesses
     """
-    print("\n" + "="*50)
-    print("REFINEMENT STEP")
-    print("="*50)
-    print(f"Input: {user_input[:100]}...")
+    logger.info("Refinement started: %s...", user_input[:100], extra={"step": "refinement"})
 
     messages = [
         {"role": "system", "content": REFINEMENT_PROMPT},
         {"role": "user", "content": user_input}
     ]
-    response = llm.invoke(messages)
-    response_text = response.content
+    response_text = await _ainvoke(llm, messages, on_usage, stage="refinement")
 
-    print(f"\nRaw response:\n{response_text}")
+    logger.debug("Raw response:\n%s", response_text)
 
     result = parse_refinement_response(response_text)
 
-    print(f"\nRefined statement: {result['refined_statement'][:100]}...")
-    print(f"Improvements: {result['improvements']}")
+    logger.info("Refined statement: %s...", result["refined_statement"][:100])
+    logger.debug("Improvements: %s", result["improvements"])
 
     return result
 
@@ -280,52 +549,54 @@ def parse_soft_guesses_response(response_text: str) -> list:
         List of dicts with keys: topic, assumption, confidence, reason
     """
     guesses = []
-    lines = response_text.strip().split("\n")
 
-    for line in lines:
+    for line in response_text.strip().split("\n"):
+        # Cheap substring test first: most lines are not bullets
+        if "- " not in line:
+            continue
         line_stripped = line.strip()
-        if line_stripped.startswith("- "):
-            # Parse format: "- [Topic]: [Assumption] — Confidence: [Level] — [Reason]"
-            content = line_stripped[2:].strip()
-
-            # Split by — (em-dash) or - (hyphen with spaces)
-            parts = content.replace(" — ", " - ").split(" - ")
-
-            if len(parts) >= 2:
-                # First part: Topic: Assumption
-                first_part = parts[0]
-                if ":" in first_part:
-                    topic, assumption = first_part.split(":", 1)
+        if not line_stripped.startswith("- "):
+            continue
+
+        # Parse format: "- [Topic]: [Assumption] — Confidence: [Level] — [Reason]"
+        # Split by — (em-dash) or - (hyphen with spaces)
+        parts = line_stripped[2:].strip().replace(" — ", " - ").split(" - ")
+        if len(parts) < 2:
+            continue
+
+        # First part: Topic: Assumption
+        topic, colon, assumption = parts[0].partition(":")
+        if not colon:
+            topic = "General"
+            assumption = parts[0]
+
+        # Extract confidence if present
+        confidence = "Medium"
+        reason = ""
+        for part in parts[1:]:
+            lowered = part.lower()
+            if "confidence" in lowered:
+                conf_text = lowered.replace("confidence:", "").replace("confidence", "").strip()
+                if "high" in conf_text:
+                    confidence = "High"
+                elif "low" in conf_text:
+                    confidence = "Low"
                 else:
-                    topic = "General"
-                    assumption = first_part
-
-                # Extract confidence if present
-                confidence = "Medium"
-                reason = ""
-                for part in parts[1:]:
-                    if "confidence" in part.lower():
-                        conf_text = part.lower().replace("confidence:", "").replace("confidence", "").strip()
-                        if "high" in conf_text:
-                            confidence = "High"
-                        elif "low" in conf_text:
-                            confidence = "Low"
-                        else:
-                            confidence = "Medium"
-                    else:
-                        reason = part.strip()
-
-                guesses.append({
-                    "topic": topic.strip(),
-                    "assumption": assumption.strip(),
-                    "confidence": confidence,
-                    "reason": reason
-                })
+                    confidence = "Medium"
+            else:
+                reason = part.strip()
+
+        guesses.append({
+            "topic": topic.strip(),
+            "assumption": assumption.strip(),
+            "confidence": confidence,
+            "reason": reason
+        })
 
     return guesses
 
 
-def extract_soft_guesses(refined_input: str, classification: str, llm) -> list:
+def extract_soft_guesses(refined_input: str, classification: str, llm, on_usage=None) -> list:
     """
     Extract soft guesses (assumptions) from the problem statement.
 
@@ -333,13 +604,12 @@ def extract_soft_guesses(refined_input: str, classification: str, llm) -> list:
         refined_input: The refined problem statement
         classification: The classification category
         llm: The LLM instance
+        on_usage: Optional callback receiving token usage for this call
 
     Returns:
         List of dicts with keys: topic, assumption, confidence, reason
     """
-    print("\n" + "="*50)
-    print("SOFT GUESSES EXTRACTION")
-    print("="*50)
+    logger.info("Soft guess extraction started", extra={"step": "soft_guesses"})
 
     context = f"""Problem Statement: {refined_input}
 
@@ -349,15 +619,164 @@ Classification: {classification}"""
         {"role": "system", "content": SOFT_GUESSES_PROMPT},
         {"role": "user", "content": context}
     ]
-    response = llm.invoke(messages)
-    response_text = response.content
+    response_text = _invoke(llm, messages, on_usage, stage="soft_guesses")
 
-    print(f"\nRaw response:\n{response_text}")
+    logger.debug("Raw response:\n%s", response_text)
 
     guesses = parse_soft_guesses_response(response_text)
 
-    print(f"\nParsed {len(guesses)} soft guesses")
+    logger.info("Parsed soft guesses", extra={"count": len(guesses)})
     for g in guesses:
-        print(f"  - {g['topic']}: {g['assumption'][:50]}... ({g['confidence']})")
+        logger.debug("Soft guess - %s: %s... (%s)", g["topic"], g["assumption"][:50], g["confidence"])
 
     return guesses
+
+
+async def aextract_soft_guesses(refined_input: str, classification: str, llm, on_usage=None) -> list:
+    """
+    Async version of extract_soft_guesses, using llm.ainvoke.
+
+    Args:
+        refined_input: The refined problem statement
+        classification: The classification category
+        llm: The LLM instance
+        on_usage: Optional callback receiving token usage for this call
+
+    Returns:
+        List of dicts with keys: topic, assumption, confidence, reason
+    """
+    logger.info("Soft guess extraction started", extra={"step": "soft_guesses"})
+
+    context = f"""Problem Statement: {refined_input}
+
+Classification: {classification}"""
+
+    messages = [
+        {"role": "system", "content": SOFT_GUESSES_PROMPT},
+        {"role": "user", "content": context}
+    ]
+    response_text = await _ainvoke(llm, messages, on_usage, stage="soft_guesses")
+
+    logger.debug("Raw response:\n%s", response_text)
+
+    guesses = parse_soft_guesses_response(response_text)
+
+    logger.info("Parsed soft guesses", extra={"count": len(guesses)})
+    for g in guesses:
+        logger.debug("Soft guess - %s: %s... (%s)", g["topic"], g["assumption"][:50], g["confidence"])
+
+    return guesses
+
+
+# --------------------
+# FAST PATH (SINGLE COMBINED CALL)
+# --------------------
+# For integrations that skip the checkpoints, refinement, classification and
+# soft guesses come back from one structured call instead of three.
+
+def parse_combined_response(response_text: str) -> dict:
+    """
+    Parse the combined fast-path response.
+
+    Returns:
+        Dict with keys:
+            refined_statement, improvements, soft_guesses (as in parse_refinement_response),
+            classification, reasoning, alternatives (as in parse_response),
+            assumptions (structured guesses as in parse_soft_guesses_response)
+    """
+    return _parse_combined_response(response_text)[0]
+
+
+def _parse_combined_response(response_text: str) -> tuple:
+    """parse_combined_response, plus whether a valid CLASSIFICATION line was found."""
+    result = parse_refinement_response(response_text)
+
+    classification, reasoning, alternatives, parsed = _parse_response(response_text)
+    result["classification"] = classification
+    result["reasoning"] = reasoning
+    result["alternatives"] = alternatives
+
+    # Only the SOFT_GUESSES section holds structured assumptions; other
+    # bullets (e.g. IMPROVEMENTS_MADE) must not be parsed as guesses
+    upper = response_text.upper()
+    start = upper.find("SOFT_GUESSES:")
+    guesses_text = response_text[start + len("SOFT_GUESSES:"):] if start != -1 else ""
+    result["assumptions"] = parse_soft_guesses_response(guesses_text)
+
+    return result, parsed
+
+
+def run_combined(user_input: str, llm, on_usage=None) -> dict:
+    """
+    Refine, classify and extract soft guesses in a single LLM call.
+
+    Args:
+        user_input: The user's original problem statement
+        llm: The LLM instance
+        on_usage: Optional callback receiving token usage for this call
+
+    Returns:
+        Dict as returned by parse_combined_response
+    """
+    logger.info("Combined fast path started: %s...", user_input[:100], extra={"step": "combined"})
+
+    messages = [
+        {"role": "system", "content": COMBINED_PROMPT},
+        {"role": "user", "content": user_input}
+    ]
+    response_text, fresh = _fetch(llm, messages, on_usage, stage="fast_path")
+
+    logger.debug("Raw response:\n%s", response_text)
+
+    result, parsed = _parse_combined_response(response_text)
+    if fresh and parsed and result["refined_statement"]:
+        record_decision(result["refined_statement"], result["classification"])
+
+    logger.info(
+        "Parsed combined response",
+        extra={
+            "classification": result["classification"],
+            "soft_guesses": len(result["assumptions"]),
+        },
+    )
+    logger.debug("Refined statement: %s...", result["refined_statement"][:100])
+
+    return result
+
+
+async def arun_combined(user_input: str, llm, on_usage=None) -> dict:
+    """
+    Async version of run_combined, using llm.ainvoke.
+
+    Args:
+        user_input: The user's original problem statement
+        llm: The LLM instance
+        on_usage: Optional callback receiving token usage for this call
+
+    Returns:
+        Dict as returned by parse_combined_response
+    """
+    logger.info("Combined fast path started: %s...", user_input[:100], extra={"step": "combined"})
+
+    messages = [
+        {"role": "system", "content": COMBINED_PROMPT},
+        {"role": "user", "content": user_input}
+    ]
+    response_text, fresh = await _afetch(llm, messages, on_usage, stage="fast_path")
+
+    logger.debug("Raw response:\n%s", response_text)
+
+    result, parsed = _parse_combined_response(response_text)
+    if fresh and parsed and result["refined_statement"]:
+        record_decision(result["refined_statement"], result["classification"])
+
+    logger.info(
+        "Parsed combined response",
+        extra={
+            "classification": result["classification"],
+            "soft_guesses": len(result["assumptions"]),
+        },
+    )
+    logger.debug("Refined statement: %s...", result["refined_statement"][:100])
+
+    return result
@@ -0,0 +1,95 @@
+"""
+LLM client construction.
+
+Clients are built lazily on first use rather than at import time, so
+importing pm_agents stays cheap (no langchain_anthropic import, no .env
+loading, no client construction) for callers that only need the parsers or
+prompts, and for short-lived batch workers and Streamlit reruns.
+
+PM_AGENTS_LLM_PROVIDER selects an offline backend instead of Anthropic
+("synthetic", "record" or "replay"; see providers.py). Anthropic clients share
+one pooled HTTP transport (see transport.py).
+"""
+
+import os
+
+import threading
+
+# max_tokens=8192 ensures complete output for complex multi-section responses
+# (agents can produce 4,000-7,000 tokens; default 1024 causes truncation)
+MODEL = "claude-sonnet-4-20250514"
+MAX_TOKENS = 8192
+
+_llm = None
+_llm_streaming = None
+_llm_lock = threading.Lock()
+
+
+def _build_anthropic_client(streaming: bool):
+    """Construct a ChatAnthropic client on the shared transport (heavy imports happen here)."""
+    from .resilience import get_resilience_policy
+    from .transport import build_chat_anthropic
+
+    if streaming:
+        return build_chat_anthropic(model=MODEL, streaming=True, max_tokens=MAX_TOKENS)
+    # Coordinator calls retry in the resilience policy when it is set to; don't
+    # stack the SDK's own retries on top of those attempts
+    retries = {"max_retries": 0} if get_resilience_policy().max_attempts > 1 else {}
+    return build_chat_anthropic(model=MODEL, max_tokens=MAX_TOKENS, **retries)
+
+
+def _build_client(streaming: bool):
+    """Load .env and construct the client selected by PM_AGENTS_LLM_PROVIDER."""
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    if os.getenv("PM_AGENTS_LLM_PROVIDER", "anthropic").lower() == "anthropic":
+        return _build_anthropic_client(streaming)
+
+    from .providers import provider_from_env
+
+    return provider_from_env(streaming, lambda: _build_anthropic_client(streaming))
+
+
+def get_llm():
+    """Return the shared non-streaming LLM, building it on first use."""
+    global _llm
+    if _llm is None:
+        with _llm_lock:
+            if _llm is None:
+                _llm = _build_client(streaming=False)
+    return _llm
+
+
+def get_streaming_llm():
+    """Return the shared streaming LLM, building it on first use."""
+    global _llm_streaming
+    if _llm_streaming is None:
+        with _llm_lock:
+            if _llm_streaming is None:
+                _llm_streaming = _build_client(streaming=True)
+    return _llm_streaming
+
+
+def set_llms(llm=None, llm_streaming=None):
+    """
+    Override the shared LLM clients (e.g. for tests or benchmarks).
+
+    Args:
+        llm: Client used for invoke calls; None leaves it unchanged
+        llm_streaming: Client used for stream calls; None leaves it unchanged
+    """
+    global _llm, _llm_streaming
+    with _llm_lock:
+        if llm is not None:
+            _llm = llm
+        if llm_streaming is not None:
+            _llm_streaming = llm_streaming
+
+
+def reset_llms():
+    """Forget the shared clients so the next call rebuilds them."""
+    global _llm, _llm_streaming
+    with _llm_lock:
+        _llm = None
+        _llm_streaming = None
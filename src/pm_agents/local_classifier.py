@@ -0,0 +1,323 @@
+"""
+Local classifier for the coordinator's classification step.
+
+run_coordinator spends a full model round-trip to pick one of five labels.
+For clear-cut inputs ("How do I prioritize these three features?") a small
+multinomial Naive Bayes model over words and word pairs gets the same answer
+in microseconds. run_coordinator asks this model first and only calls the LLM
+when its confidence is below the threshold.
+
+The model starts from a small seed set written from the category
+descriptions in the coordinator prompt, and learns from the coordinator's
+own decisions: every LLM classification is appended to a JSON-lines log,
+which is loaded on startup. With enough logged decisions, the softmax
+temperature is fitted on them (leave-one-out), so "confidence" is a
+calibrated probability rather than Naive Bayes' usual overconfident one.
+
+Configure via environment variables:
+- PM_AGENTS_LOCAL_CLASSIFIER: "1" to answer confident classifications locally
+- PM_AGENTS_LOCAL_CLASSIFIER_THRESHOLD: Minimum confidence to skip the LLM (default 0.85)
+- PM_AGENTS_CLASSIFIER_LOG: JSON-lines file of LLM decisions to learn from
+  (appended to whenever the LLM classifies, even if local classification is off)
+"""
+
+import json
+import math
+import os
+import re
+import threading
+import time
+
+DEFAULT_THRESHOLD = 0.85
+MIN_CALIBRATION_EXAMPLES = 20
+_TEMPERATURES = (0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 4.0, 6.0, 8.0)
+
+# Written from the "Use when" descriptions and examples in the coordinator prompt
+SEED_EXAMPLES = {
+    "prioritization": [
+        "Should we build A or B first?",
+        "How do I prioritize these features?",
+        "Which project is more important?",
+        "We have too many requests on the roadmap and need to decide what to build first",
+        "Help me rank these initiatives by impact and effort",
+        "Trade-offs between tech debt and new features this quarter",
+        "How should I allocate limited engineering resources across three projects?",
+        "Deciding between two competing roadmap priorities",
+    ],
+    "problem_space": [
+        "I think users struggle with X, but not sure if it's a real problem",
+        "Is this actually a problem worth solving?",
+        "Do customers really care about this?",
+        "Not sure if the pain point is real or just anecdotal",
+        "Sales says customers complain about onboarding but I don't know if it matters",
+        "Validate whether users actually experience this pain",
+        "How do I know if this problem is big enough to matter?",
+        "Some users mention reporting is painful, is it a real need?",
+    ],
+    "context_mapping": [
+        "Just joined the team and need to learn the domain",
+        "Who are the key stakeholders?",
+        "I don't understand how this space works",
+        "New to the healthcare industry and need to map the landscape",
+        "I inherited a product area and don't know the organization or players",
+        "Help me understand the stakeholders and decision makers in this org",
+        "Ramping up on an unfamiliar market and its terminology",
+        "Map out the teams, systems and people involved in billing",
+    ],
+    "constraints": [
+        "Engineering keeps saying it won't work but I don't know why",
+        "What am I missing?",
+        "Why can't we do this?",
+        "Something is blocking progress and I can't articulate what",
+        "There are hidden blockers slowing the launch",
+        "Legal and compliance keep pushing back on the feature",
+        "The project keeps stalling and nobody explains the limitations",
+        "What technical or organizational limitations are we up against?",
+    ],
+    "solution_validation": [
+        "Want to build X. Is this a good idea?",
+        "Will this solution work?",
+        "Should we proceed with this approach?",
+        "We plan to launch an AI assistant, validate whether customers will use it",
+        "Is this feature idea viable and feasible to build?",
+        "Test whether our proposed redesign solves the problem",
+        "I have a solution in mind and want to check value, usability and feasibility",
+        "Would a mobile app be worth building for our users?",
+    ],
+}
+
+_WORD = re.compile(r"[a-z][a-z'-]*")
+_STOPWORDS = frozenset(
+    "a an the and or but of to in on for with at by from as is are was were be been it its "
+    "this that these those i we you they he she our my your their me us them do does did "
+    "so if then than there here have has had will would can could should just very".split()
+)
+
+
+def tokenize(text: str) -> list:
+    """Lower-cased content words plus adjacent word pairs."""
+    words = [w for w in _WORD.findall(text.lower()) if w not in _STOPWORDS]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def _softmax(logits: dict, temperature: float) -> dict:
+    top = max(logits.values())
+    weights = {label: math.exp((value - top) / temperature) for label, value in logits.items()}
+    total = sum(weights.values())
+    return {label: weight / total for label, weight in weights.items()}
+
+
+class LocalClassifier:
+    """
+    Multinomial Naive Bayes over words and word pairs.
+
+    Args:
+        alpha: Additive (Laplace) smoothing
+        temperature: Softmax temperature applied to the log-likelihoods; the
+            default is deliberately conservative until calibrate() fits one
+    """
+
+    def __init__(self, alpha: float = 0.5, temperature: float = 2.0):
+        self.alpha = alpha
+        self.temperature = temperature
+        self.labels = list(SEED_EXAMPLES)
+        self._doc_counts = {label: 0 for label in self.labels}
+        self._word_counts = {label: {} for label in self.labels}
+        self._totals = {label: 0 for label in self.labels}
+        self._vocabulary = {}  # term -> number of labels it has been seen with
+        self._lock = threading.Lock()
+
+    def _update(self, tokens: list, label: str, sign: int):
+        counts = self._word_counts[label]
+        self._doc_counts[label] += sign
+        self._totals[label] += sign * len(tokens)
+        for token in tokens:
+            before = counts.get(token, 0)
+            after = before + sign
+            if after:
+                counts[token] = after
+            else:
+                del counts[token]
+            if not before:
+                self._vocabulary[token] = self._vocabulary.get(token, 0) + 1
+            elif not after:
+                self._vocabulary[token] -= 1
+                if not self._vocabulary[token]:
+                    del self._vocabulary[token]
+
+    def add_examples(self, examples):
+        """
+        Train on (text, label) pairs (incremental; labels outside the five are ignored).
+        """
+        with self._lock:
+            for text, label in examples:
+                if label in self._doc_counts:
+                    self._update(tokenize(text), label, 1)
+
+    def _logits(self, tokens: list) -> dict:
+        vocabulary_size = len(self._vocabulary) + 1
+        documents = sum(self._doc_counts.values()) + len(self.labels)
+        logits = {}
+        for label in self.labels:
+            counts = self._word_counts[label]
+            denominator = math.log(self._totals[label] + self.alpha * vocabulary_size)
+            score = math.log((self._doc_counts[label] + 1) / documents)
+            for token in tokens:
+                score += math.log(counts.get(token, 0) + self.alpha) - denominator
+            logits[label] = score
+        return logits
+
+    def predict_proba(self, text: str) -> dict:
+        """Return {label: probability} for a problem statement."""
+        tokens = tokenize(text)
+        with self._lock:
+            # Filter under the lock: record_decision may be training concurrently
+            known = [t for t in tokens if t in self._vocabulary]
+            return _softmax(self._logits(known), self.temperature)
+
+    def classify(self, text: str) -> tuple:
+        """
+        Classify a problem statement.
+
+        Returns:
+            (classification, confidence, probabilities, evidence) where
+            evidence lists the known terms that most favour the classification
+        """
+        tokens = tokenize(text)
+        with self._lock:
+            known = [t for t in tokens if t in self._vocabulary]
+            probabilities = _softmax(self._logits(known), self.temperature)
+            label = max(probabilities, key=probabilities.get)
+            counts = self._word_counts[label]
+            # Terms seen with few labels are the distinctive ones
+            evidence = sorted({t for t in known if t in counts}, key=lambda t: (self._vocabulary[t], -counts[t]))
+        return label, probabilities[label], probabilities, evidence[:3]
+
+    def calibrate(self, examples) -> float:
+        """
+        Fit the softmax temperature to (text, label) pairs by leave-one-out
+        negative log-likelihood; the pairs must already be in the training data.
+
+        Returns:
+            The chosen temperature
+        """
+        examples = [(tokenize(text), label) for text, label in examples if label in self._doc_counts]
+        if not examples:
+            return self.temperature
+        with self._lock:
+            held_out = []
+            for tokens, label in examples:
+                self._update(tokens, label, -1)
+                known = [t for t in tokens if t in self._vocabulary]
+                held_out.append((self._logits(known), label))
+                self._update(tokens, label, 1)
+
+            def loss(temperature):
+                return -sum(math.log(max(_softmax(logits, temperature)[label], 1e-12)) for logits, label in held_out)
+
+            self.temperature = min(_TEMPERATURES, key=loss)
+        return self.temperature
+
+
+# --------------------
+# DECISION LOG
+# --------------------
+
+_log_lock = threading.Lock()
+
+
+def load_decisions(path: str) -> list:
+    """Read (text, classification) pairs from a decision log (missing file = none)."""
+    examples = []
+    if not path or not os.path.exists(path):
+        return examples
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+                examples.append((record["text"], record["classification"]))
+            except (ValueError, KeyError, TypeError):
+                continue  # Skip partial or foreign lines
+    return examples
+
+
+def record_decision(text: str, classification: str):
+    """Append an LLM classification to PM_AGENTS_CLASSIFIER_LOG (no-op if unset)."""
+    path = os.getenv("PM_AGENTS_CLASSIFIER_LOG")
+    if not path:
+        return
+    line = json.dumps({"text": text, "classification": classification, "recorded_at": time.time()}, ensure_ascii=False)
+    with _log_lock, open(path, "a", encoding="utf-8") as f:
+        f.write(line + "\n")
+    classifier = _classifier
+    if classifier is not None:
+        classifier.add_examples([(text, classification)])
+
+
+# --------------------
+# ACTIVE CLASSIFIER
+# --------------------
+
+_classifier = None
+_classifier_lock = threading.Lock()
+
+
+def build_classifier(log_path: str = None) -> LocalClassifier:
+    """Build a classifier from the seed examples plus a decision log (calibrated if large enough)."""
+    classifier = LocalClassifier()
+    classifier.add_examples((text, label) for label, texts in SEED_EXAMPLES.items() for text in texts)
+    decisions = load_decisions(log_path)
+    classifier.add_examples(decisions)
+    if len(decisions) >= MIN_CALIBRATION_EXAMPLES:
+        classifier.calibrate(decisions)
+    return classifier
+
+
+def get_local_classifier() -> LocalClassifier:
+    """Return the shared classifier, building it on first use."""
+    global _classifier
+    if _classifier is None:
+        with _classifier_lock:
+            if _classifier is None:
+                _classifier = build_classifier(os.getenv("PM_AGENTS_CLASSIFIER_LOG"))
+    return _classifier
+
+
+def set_local_classifier(classifier: LocalClassifier = None):
+    """Replace the shared classifier (None rebuilds it on next use)."""
+    global _classifier
+    with _classifier_lock:
+        _classifier = classifier
+
+
+def classify_locally(text: str, threshold: float = None):
+    """
+    Classify without the LLM if enabled and confident enough.
+
+    Args:
+        text: The (refined) problem statement
+        threshold: Minimum confidence; defaults to PM_AGENTS_LOCAL_CLASSIFIER_THRESHOLD
+
+    Returns:
+        (classification, reasoning, alternatives) like run_coordinator, or
+        None when disabled or below the threshold
+    """
+    if os.getenv("PM_AGENTS_LOCAL_CLASSIFIER", "") not in ("1", "true", "yes"):
+        return None
+    if threshold is None:
+        threshold = float(os.getenv("PM_AGENTS_LOCAL_CLASSIFIER_THRESHOLD", DEFAULT_THRESHOLD))
+
+    classification, confidence, probabilities, evidence = get_local_classifier().classify(text)
+    if confidence < threshold:
+        return None
+
+    terms = ", ".join(repr(term) for term in evidence) or "overall wording"
+    reasoning = (
+        f"Classified locally with {confidence:.0%} confidence: the statement matches "
+        f"{classification} problems (key terms: {terms})."
+    )
+    alternatives = [
+        label for label, p in sorted(probabilities.items(), key=lambda item: -item[1])
+        if label != classification and p >= 0.05
+    ]
+    return classification, reasoning, alternatives
@@ -0,0 +1,161 @@
+"""
+Structured logging for pm_agents.
+
+Modules log through get_logger(__name__, stage=..., agent=...). Records carry
+structured fields (session_id, stage, agent, ...) merged from three places:
+- log_context(...): request-scoped fields, e.g. the UI session id
+- get_logger(..., **fields): fields bound to a logger
+- logger.info(..., extra={...}): per-call fields
+
+Per-token logging in the streaming loops is off by default, so the hot loop
+does no I/O unless explicitly enabled (PM_AGENTS_LOG_TOKENS=1 and DEBUG level).
+
+The library only installs a NullHandler; applications call configure_logging().
+
+Environment variables (read by configure_logging):
+- PM_AGENTS_LOG_LEVEL: Level name (default: INFO)
+- PM_AGENTS_LOG_FORMAT: "text" (default) or "json"
+- PM_AGENTS_LOG_TOKENS: "1" to log every streamed token at DEBUG
+"""
+
+import contextvars
+import json
+import logging
+import os
+import sys
+from contextlib import contextmanager
+
+LOGGER_NAME = "pm_agents"
+
+_log_context = contextvars.ContextVar("pm_agents_log_context", default={})
+_log_tokens = os.getenv("PM_AGENTS_LOG_TOKENS", "") in ("1", "true", "yes")
+
+logging.getLogger(LOGGER_NAME).addHandler(logging.NullHandler())
+
+
+# --------------------
+# CONTEXT
+# --------------------
+
+@contextmanager
+def log_context(**fields):
+    """
+    Attach structured fields to every pm_agents log record in this context.
+
+    Example:
+        with log_context(session_id=session_id):
+            for event in run_stage4_specialist(...):
+                ...
+    """
+    token = _log_context.set({**_log_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _log_context.reset(token)
+
+
+def current_context() -> dict:
+    """Return the structured fields set by the enclosing log_context()."""
+    return _log_context.get()
+
+
+class ContextAdapter(logging.LoggerAdapter):
+    """Logger adapter that merges context, bound and per-call fields into record.fields."""
+
+    def process(self, msg, kwargs):
+        fields = {**current_context(), **self.extra, **kwargs.pop("extra", {})}
+        kwargs["extra"] = {"fields": fields}
+        return msg, kwargs
+
+    def bind(self, **fields) -> "ContextAdapter":
+        """Return a logger with additional bound fields."""
+        return ContextAdapter(self.logger, {**self.extra, **fields})
+
+
+def get_logger(name: str, **fields) -> ContextAdapter:
+    """
+    Return a structured logger.
+
+    Args:
+        name: Logger name (normally __name__)
+        **fields: Fields bound to every record from this logger
+    """
+    return ContextAdapter(logging.getLogger(name), fields)
+
+
+def token_logging_enabled(logger: ContextAdapter) -> bool:
+    """
+    Return True if streamed tokens should be logged.
+
+    Checked once per stream, not per token, so disabled token logging costs
+    nothing inside the streaming loop.
+    """
+    return _log_tokens and logger.isEnabledFor(logging.DEBUG)
+
+
+# --------------------
+# CONFIGURATION
+# --------------------
+
+class StructuredFormatter(logging.Formatter):
+    """Render records as `time level logger message key=value ...` or as JSON lines."""
+
+    def __init__(self, json_lines: bool = False):
+        super().__init__()
+        self.json_lines = json_lines
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields = getattr(record, "fields", {})
+        if self.json_lines:
+            payload = {
+                "time": self.formatTime(record),
+                "level": record.levelname,
+                "logger": record.name,
+                "message": record.getMessage(),
+                **fields,
+            }
+            if record.exc_info:
+                payload["exc_info"] = self.formatException(record.exc_info)
+            return json.dumps(payload, default=str, ensure_ascii=False)
+
+        line = f"{self.formatTime(record)} {record.levelname:<7} {record.name}: {record.getMessage()}"
+        if fields:
+            line += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+        if record.exc_info:
+            line += "\n" + self.formatException(record.exc_info)
+        return line
+
+
+def configure_logging(level=None, json_lines: bool = None, log_tokens: bool = None, stream=None):
+    """
+    Install a structured handler on the pm_agents logger.
+
+    Arguments default to the PM_AGENTS_LOG_* environment variables. Safe to
+    call repeatedly (e.g. on every Streamlit rerun); the handler is replaced.
+
+    Args:
+        level: Level name or number
+        json_lines: Emit JSON lines instead of key=value text
+        log_tokens: Log every streamed token at DEBUG
+        stream: Output stream (default: stderr)
+    """
+    global _log_tokens
+
+    if level is None:
+        level = os.getenv("PM_AGENTS_LOG_LEVEL", "INFO")
+    if json_lines is None:
+        json_lines = os.getenv("PM_AGENTS_LOG_FORMAT", "text").lower() == "json"
+    if log_tokens is not None:
+        _log_tokens = log_tokens
+
+    logger = logging.getLogger(LOGGER_NAME)
+    for handler in list(logger.handlers):
+        if getattr(handler, "_pm_agents_handler", False):
+            logger.removeHandler(handler)
+
+    handler = logging.StreamHandler(stream or sys.stderr)
+    handler.setFormatter(StructuredFormatter(json_lines=json_lines))
+    handler._pm_agents_handler = True
+    logger.addHandler(handler)
+    logger.setLevel(level.upper() if isinstance(level, str) else level)
+    logger.propagate = False
@@ -0,0 +1,198 @@
+"""
+Per-stage latency and token instrumentation.
+
+Each stage (and each specialist agent) is measured with a StageTimer:
+- wall_time_s: total time for the stage
+- ttft_s: time to first streamed token (streaming stages only)
+- tokens_per_sec: output tokens per second after the first token
+- input/output/cache read/cache write token counts from Anthropic usage metadata
+- queue_wait_s: time spent waiting for the rate limiter (only when limiting is on)
+- retries / hedged: coordinator calls retried or hedged by the resilience policy
+- local_classifier: classification answered without an LLM call
+
+Speculative Stage 2/3 calls (see workflow.start_speculation) are counted in
+the stage that uses them; a speculation that is never used is exported as a
+"speculation" record with discarded=True.
+
+Stage generators yield the finished record as ("metrics", {...}) and pass it
+to every registered exporter, e.g.:
+
+    from pm_agents.metrics import add_metrics_exporter, JsonlExporter
+    add_metrics_exporter(JsonlExporter("metrics.jsonl"))
+
+Environment variables (read by configure_metrics):
+- PM_AGENTS_METRICS_LOG: "1" to log every record at INFO
+- PM_AGENTS_METRICS_FILE: Path of a JSON-lines file to append records to
+"""
+
+import json
+import os
+import threading
+import time
+
+from .logs import get_logger
+
+logger = get_logger(__name__)
+
+_exporters = []
+_exporters_lock = threading.Lock()
+
+
+# --------------------
+# TIMERS
+# --------------------
+
+class StageTimer:
+    """
+    Measure one stage or agent call.
+
+    Usage:
+        timer = StageTimer("specialist", agent="constraints")
+        for token in stream_fn(context, llm, on_usage=timer.add_usage):
+            timer.on_token()
+            ...
+        record = timer.finish()
+    """
+
+    def __init__(self, stage: str, agent: str = None, clock=time.perf_counter):
+        self.stage = stage
+        self.agent = agent
+        self._clock = clock
+        self.started_at = clock()
+        self.first_token_at = None
+        self.chunks = 0
+        self.usage = {
+            "input_tokens": 0,
+            "output_tokens": 0,
+            "cache_read_tokens": 0,
+            "cache_write_tokens": 0,
+        }
+        self.extra = {}
+
+    def on_token(self):
+        """Record a streamed token (O(1); called from the hot streaming loop)."""
+        if self.first_token_at is None:
+            self.first_token_at = self._clock()
+        self.chunks += 1
+
+    def add_usage(self, usage: dict):
+        """Accumulate token usage (usable directly as an on_usage callback)."""
+        for key in self.usage:
+            self.usage[key] += usage.get(key, 0) or 0
+        if usage.get("response_cache_hit"):
+            self.extra["response_cache_hit"] = True
+        if "queue_wait_s" in usage:
+            self.extra["queue_wait_s"] = round(self.extra.get("queue_wait_s", 0.0) + usage["queue_wait_s"], 4)
+        if usage.get("retries"):
+            self.extra["retries"] = self.extra.get("retries", 0) + usage["retries"]
+        if usage.get("hedged"):
+            self.extra["hedged"] = True
+        if usage.get("local_classifier"):
+            self.extra["local_classifier"] = True
+
+    def finish(self, export: bool = True, **extra) -> dict:
+        """
+        Close the measurement and return the metrics record.
+
+        Args:
+            export: Send the record to registered exporters
+            **extra: Additional fields to include (e.g. speculative=True)
+        """
+        ended_at = self._clock()
+        wall = ended_at - self.started_at
+        ttft = None if self.first_token_at is None else self.first_token_at - self.started_at
+
+        output_tokens = self.usage["output_tokens"] or self.chunks
+        generation_time = wall - ttft if ttft is not None else wall
+        tokens_per_sec = output_tokens / generation_time if generation_time > 0 and output_tokens else 0.0
+
+        record = {
+            "stage": self.stage,
+            "agent": self.agent,
+            "wall_time_s": round(wall, 4),
+            "ttft_s": None if ttft is None else round(ttft, 4),
+            "tokens_per_sec": round(tokens_per_sec, 2),
+            "chunks": self.chunks,
+            **self.usage,
+            **self.extra,
+            **extra,
+        }
+        if export:
+            export_metrics(record)
+        return record
+
+
+# --------------------
+# EXPORTERS
+# --------------------
+
+def add_metrics_exporter(exporter):
+    """
+    Register a callable that receives every finished metrics record.
+
+    Exporters run synchronously on the stage's thread, so they should be cheap.
+    """
+    with _exporters_lock:
+        _exporters.append(exporter)
+
+
+def remove_metrics_exporter(exporter):
+    """Unregister an exporter added with add_metrics_exporter."""
+    with _exporters_lock:
+        if exporter in _exporters:
+            _exporters.remove(exporter)
+
+
+def export_metrics(record: dict):
+    """Send a metrics record to all exporters; exporter errors are logged, not raised."""
+    with _exporters_lock:
+        exporters = list(_exporters)
+    for exporter in exporters:
+        try:
+            exporter(record)
+        except Exception:
+            logger.exception("Metrics exporter failed", extra={"exporter": repr(exporter)})
+
+
+def log_exporter(record: dict):
+    """Exporter that logs each record at INFO with its fields."""
+    logger.info("Stage metrics", extra=record)
+
+
+class JsonlExporter:
+    """Exporter that appends each record as a JSON line (thread-safe)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def __call__(self, record: dict):
+        line = json.dumps({"timestamp": time.time(), **record}, default=str)
+        with self._lock, open(self.path, "a") as f:
+            f.write(line + "\n")
+
+
+def configure_metrics():
+    """
+    Register exporters described by the PM_AGENTS_METRICS_* environment variables.
+
+    Safe to call repeatedly (e.g. on every Streamlit rerun); exporters
+    installed by a previous call are replaced.
+    """
+    with _exporters_lock:
+        _exporters[:] = [e for e in _exporters if not getattr(e, "_from_env", False)]
+
+    if os.getenv("PM_AGENTS_METRICS_LOG", "") in ("1", "true", "yes"):
+        add_metrics_exporter(_EnvLogExporter())
+    path = os.getenv("PM_AGENTS_METRICS_FILE")
+    if path:
+        exporter = JsonlExporter(path)
+        exporter._from_env = True
+        add_metrics_exporter(exporter)
+
+
+class _EnvLogExporter:
+    _from_env = True
+
+    def __call__(self, record: dict):
+        log_exporter(record)
@@ -0,0 +1,568 @@
+"""
+Offline LLM backends for benchmarking and development without network access.
+
+All backends are drop-in replacements for the ChatAnthropic clients returned
+by get_llm() / get_streaming_llm(): they implement invoke, ainvoke, stream and
+astream and return LangChain AIMessage / AIMessageChunk objects with
+usage_metadata, so the coordinator, agents, parsers and UI run unchanged.
+
+- SyntheticLLM: deterministic responses in each prompt's section format
+  (refinement, classification, soft guesses, combined fast path, and every
+  specialist's "### N. ..." sections), sized like real agent output
+- RecordingLLM: wraps a real client and appends every response, with its
+  streaming chunk timings, to a JSON-lines recordings file
+- ReplayLLM: serves recorded responses by message hash, replaying the
+  recorded chunk timings or a configured latency and token rate
+
+Select a backend with environment variables (read when clients are built):
+- PM_AGENTS_LLM_PROVIDER: "anthropic" (default), "synthetic", "record" or "replay"
+- PM_AGENTS_RECORDINGS_PATH: Recordings file (default: .pm_agents_recordings.jsonl)
+- PM_AGENTS_FAKE_LATENCY: Seconds before the first token (default: 0)
+- PM_AGENTS_FAKE_TOKENS_PER_SEC: Output rate; unset streams as fast as possible
+- PM_AGENTS_FAKE_OUTPUT_TOKENS: Approximate specialist output size (default: 4500)
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+from .cache import make_cache_key
+from .coordinator import REFINEMENT_PROMPT, SOFT_GUESSES_PROMPT
+
+DEFAULT_RECORDINGS_PATH = ".pm_agents_recordings.jsonl"
+DEFAULT_OUTPUT_TOKENS = 4500
+
+# Roughly one LLM token per word-or-punctuation piece
+_TOKEN_PATTERN = re.compile(r"\s*\S+|\s+")
+_SECTION_PATTERN = re.compile(r"^###\s+\d+\.\s+(.+)$", re.MULTILINE)
+
+CATEGORIES = [
+    "prioritization",
+    "problem_space",
+    "context_mapping",
+    "constraints",
+    "solution_validation",
+]
+
+# Keyword hints used by the synthetic classifier (first match wins)
+_CATEGORY_HINTS = [
+    ("prioritization", ("prioritiz", "which should", " or ", "rank", "trade-off", "tradeoff", "first")),
+    ("constraints", ("blocker", "blocked", "won't work", "can't", "constraint", "missing")),
+    ("solution_validation", ("build", "good idea", "solution", "validate", "proceed")),
+    ("context_mapping", ("joined", "new to", "learn", "stakeholder", "domain", "onboard")),
+    ("problem_space", ("struggle", "pain", "real problem", "worth solving", "care about")),
+]
+
+_FILLER = (
+    "customers teams onboarding workflow retention adoption revenue pipeline "
+    "enterprise admins weekly churn activation engineering support latency "
+    "budget roadmap stakeholders integration reporting pricing experiment "
+    "signal cohort segment usage renewal quarter evidence risk impact effort"
+).split()
+
+
+def split_tokens(text: str) -> list:
+    """Split text into token-sized pieces whose concatenation is the original text."""
+    return _TOKEN_PATTERN.findall(text)
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token)."""
+    return max(1, len(text) // 4)
+
+
+def messages_text(messages: list) -> tuple:
+    """
+    Return (system_text, user_text) for a chat messages list.
+
+    Accepts the dict messages built by the coordinator and build_messages(),
+    including system content given as a list of text blocks.
+    """
+    system, user = [], []
+    for message in messages:
+        if isinstance(message, dict):
+            role, content = message.get("role"), message.get("content")
+        else:
+            role, content = getattr(message, "type", None), getattr(message, "content", "")
+        if isinstance(content, list):
+            content = "".join(block.get("text", "") for block in content if isinstance(block, dict))
+        (system if role == "system" else user).append(content or "")
+    return "\n".join(system), "\n".join(user)
+
+
+def _usage(input_tokens: int, output_tokens: int) -> dict:
+    return {
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+        "total_tokens": input_tokens + output_tokens,
+    }
+
+
+def _truncate(text: str, chunks, usage, max_tokens: int) -> tuple:
+    """Cut a response after max_tokens token pieces, as a max_tokens stop would."""
+    pieces = split_tokens(text)
+    if len(pieces) <= max_tokens:
+        return text, chunks, usage
+    kept = "".join(pieces[:max_tokens])
+    if chunks is not None:
+        kept_chunks, used = [], 0
+        for offset, piece in chunks:
+            piece = piece[:len(kept) - used]
+            if not piece:
+                break
+            kept_chunks.append([offset, piece])
+            used += len(piece)
+        chunks = kept_chunks
+    usage = usage or _usage(0, len(pieces))
+    output_tokens = max_tokens
+    if usage.get("output_tokens") != len(pieces):
+        # Recorded usage counts real tokens; scale it by the fraction kept
+        output_tokens = max(1, round((usage.get("output_tokens") or len(pieces)) * len(kept) / max(1, len(text))))
+    return kept, chunks, {**usage, **_usage(usage.get("input_tokens", 0), output_tokens)}
+
+
+# --------------------
+# PACED BASE CLASS
+# --------------------
+
+class _OfflineLLM:
+    """
+    Shared invoke/stream plumbing for offline backends.
+
+    Subclasses implement _respond(messages), returning (text, chunks, usage)
+    where chunks is a list of (offset_seconds, text) pairs, or None to pace
+    by latency and tokens_per_sec.
+    """
+
+    model = "offline"
+
+    def __init__(self, latency: float = 0.0, tokens_per_sec: float = None, max_tokens: int = None):
+        self.latency = latency
+        self.tokens_per_sec = tokens_per_sec
+        self.max_tokens = max_tokens
+        self.temperature = None
+        self.calls = 0
+        self._calls_lock = threading.Lock()
+
+    def _respond(self, messages: list) -> tuple:
+        raise NotImplementedError
+
+    def _next(self, messages: list, max_tokens: int = None) -> tuple:
+        with self._calls_lock:
+            self.calls += 1
+        text, chunks, usage = self._respond(messages)
+        max_tokens = max_tokens or self.max_tokens
+        if max_tokens:
+            text, chunks, usage = _truncate(text, chunks, usage, max_tokens)
+        return text, chunks, usage
+
+    def _schedule(self, text: str, chunks) -> list:
+        """Return [(delay_before_chunk, chunk_text), ...]."""
+        if chunks is None:
+            interval = 1.0 / self.tokens_per_sec if self.tokens_per_sec else 0.0
+            pieces = split_tokens(text) or [""]
+            return [(self.latency if i == 0 else interval, piece) for i, piece in enumerate(pieces)]
+        schedule, previous = [], 0.0
+        for offset, piece in chunks:
+            schedule.append((max(0.0, offset - previous), piece))
+            previous = offset
+        return schedule
+
+    def _total_delay(self, text: str, chunks) -> float:
+        return sum(delay for delay, _ in self._schedule(text, chunks))
+
+    def invoke(self, messages: list, **kwargs) -> AIMessage:
+        text, chunks, usage = self._next(messages, kwargs.get("max_tokens"))
+        delay = self._total_delay(text, chunks)
+        if delay:
+            time.sleep(delay)
+        return AIMessage(content=text, usage_metadata=usage)
+
+    async def ainvoke(self, messages: list, **kwargs) -> AIMessage:
+        text, chunks, usage = self._next(messages, kwargs.get("max_tokens"))
+        delay = self._total_delay(text, chunks)
+        if delay:
+            await asyncio.sleep(delay)
+        return AIMessage(content=text, usage_metadata=usage)
+
+    # Chunks are paced against an absolute deadline so per-sleep overshoot
+    # does not accumulate over thousands of tokens
+
+    def stream(self, messages: list, **kwargs):
+        text, chunks, usage = self._next(messages, kwargs.get("max_tokens"))
+        schedule = self._schedule(text, chunks)
+        deadline = time.perf_counter()
+        for i, (delay, piece) in enumerate(schedule):
+            deadline += delay
+            remaining = deadline - time.perf_counter()
+            if remaining > 0:
+                time.sleep(remaining)
+            last = i == len(schedule) - 1
+            yield AIMessageChunk(content=piece, usage_metadata=usage if last else None)
+
+    async def astream(self, messages: list, **kwargs):
+        text, chunks, usage = self._next(messages, kwargs.get("max_tokens"))
+        schedule = self._schedule(text, chunks)
+        deadline = time.perf_counter()
+        for i, (delay, piece) in enumerate(schedule):
+            deadline += delay
+            # Always yield control so concurrent streams interleave
+            await asyncio.sleep(max(0.0, deadline - time.perf_counter()))
+            last = i == len(schedule) - 1
+            yield AIMessageChunk(content=piece, usage_metadata=usage if last else None)
+
+
+# --------------------
+# SYNTHETIC BACKEND
+# --------------------
+
+class SyntheticLLM(_OfflineLLM):
+    """
+    Deterministic fake LLM that answers in each prompt's output format.
+
+    The same messages always produce the same response. Specialist responses
+    follow the agent's "### N. Title" sections, include ⚠️ soft guesses, a
+    markdown table and the mandatory questions section, padded to roughly
+    output_tokens tokens.
+
+    Args:
+        latency: Seconds before the first token
+        tokens_per_sec: Output rate (None = as fast as possible)
+        output_tokens: Approximate specialist response size
+    """
+
+    model = "synthetic"
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        tokens_per_sec: float = None,
+        output_tokens: int = DEFAULT_OUTPUT_TOKENS,
+        max_tokens: int = None,
+    ):
+        super().__init__(latency, tokens_per_sec, max_tokens)
+        self.output_tokens = output_tokens
+
+    def _respond(self, messages):
+        system, user = messages_text(messages)
+        seed = int(hashlib.sha256((system + "\0" + user).encode("utf-8")).hexdigest()[:16], 16)
+        rng = random.Random(seed)
+        text = self._render(system, user, rng)
+        return text, None, _usage(estimate_tokens(system + user), len(split_tokens(text)))
+
+    def _render(self, system: str, user: str, rng: random.Random) -> str:
+        if "In a single pass" in system and "CLASSIFICATION:" in system:
+            return self._combined(user, rng)
+        if system.startswith(REFINEMENT_PROMPT[:60]):
+            return self._refinement(user, rng)
+        if system.startswith(SOFT_GUESSES_PROMPT[:60]):
+            return self._soft_guesses(rng)
+        if "CLASSIFICATION:" in system and "ALTERNATIVES:" in system:
+            return self._classification(user, rng)
+        return self._specialist(system, user, rng)
+
+    # Coordinator formats
+
+    def _statement(self, user: str) -> str:
+        first = user.strip().splitlines()[0] if user.strip() else "The team has an unclear problem"
+        first = first.replace("Problem Statement:", "").strip().rstrip(".?! ")
+        return f"{first[:200]}. This affects enterprise admins weekly during onboarding."
+
+    def _category(self, user: str, rng: random.Random) -> str:
+        lowered = user.lower()
+        for category, hints in _CATEGORY_HINTS:
+            if any(hint in lowered for hint in hints):
+                return category
+        return rng.choice(CATEGORIES)
+
+    def _guess_lines(self, rng: random.Random, count: int) -> list:
+        topics = ["Target User", "Severity", "Frequency", "Current State", "Success Metric"]
+        return [
+            f"- {topic}: {self._sentence(rng, 8)} — Confidence: {rng.choice(['High', 'Medium', 'Low'])}"
+            f" — {self._sentence(rng, 6)}"
+            for topic in topics[:count]
+        ]
+
+    def _refinement(self, user, rng):
+        return "\n".join([
+            f"REFINED_STATEMENT: {self._statement(user)}",
+            "",
+            "IMPROVEMENTS_MADE:",
+            "- Made WHO specific by naming the affected users",
+            "- Added HOW OFTEN the problem occurs",
+            "",
+            "SOFT_GUESSES:",
+            *[line.rsplit(" — ", 1)[0] for line in self._guess_lines(rng, 3)],
+        ])
+
+    def _classification(self, user, rng):
+        category = self._category(user, rng)
+        others = [c for c in CATEGORIES if c != category]
+        rng.shuffle(others)
+        return "\n".join([
+            f"CLASSIFICATION: {category}",
+            f"REASONING: {self._sentence(rng, 14)}. {self._sentence(rng, 12)}.",
+            f"ALTERNATIVES: {', '.join(others[:2])}",
+        ])
+
+    def _soft_guesses(self, rng):
+        return "\n".join(self._guess_lines(rng, rng.randint(3, 5)))
+
+    def _combined(self, user, rng):
+        refinement = self._refinement(user, rng).split("\n\nSOFT_GUESSES:")[0]
+        return "\n".join([
+            refinement,
+            "",
+            self._classification(user, rng),
+            "",
+            "SOFT_GUESSES:",
+            *self._guess_lines(rng, rng.randint(3, 5)),
+        ])
+
+    # Specialist format
+
+    def _sentence(self, rng: random.Random, words: int) -> str:
+        text = " ".join(rng.choice(_FILLER) for _ in range(words))
+        return text[0].upper() + text[1:]
+
+    def _paragraph(self, rng: random.Random, tokens: int) -> str:
+        sentences = []
+        while sum(len(s.split()) + 1 for s in sentences) < tokens:
+            sentences.append(self._sentence(rng, rng.randint(10, 18)) + ".")
+        return " ".join(sentences)
+
+    def _specialist(self, system, user, rng):
+        titles = _SECTION_PATTERN.findall(system) or [
+            "Core Trade-off",
+            "Soft Guesses (mark each with ⚠️)",
+            "Framework Application",
+            "Recommendation",
+            "Decision Criteria",
+        ]
+        budget = max(50, self.output_tokens // (len(titles) + 1))
+        parts = []
+        for number, title in enumerate(titles, 1):
+            parts.append(f"### {number}. {title.strip()}\n")
+            lowered = title.lower()
+            if "soft guess" in lowered:
+                for _ in range(5):
+                    parts.append(f"- ⚠️ {self._sentence(rng, 12)}")
+                parts.append("")
+            elif "matrix" in lowered or "framework" in lowered:
+                parts.append("| Option | Impact | Effort | Confidence | Score |")
+                parts.append("|---|---|---|---|---|")
+                for _ in range(5):
+                    parts.append(
+                        f"| {self._sentence(rng, 2)} | {rng.randint(1, 10)} | {rng.randint(1, 10)} "
+                        f"| {rng.choice(['High', 'Medium', 'Low'])} | {rng.randint(10, 99)} |"
+                    )
+                parts.append("")
+            elif "decision criteria" in lowered:
+                parts.append("**Proceed IF all of these are true:**")
+                parts.extend(f"{i}. {self._sentence(rng, 12)}" for i in range(1, 4))
+                parts.append("\n**STOP and reconsider IF any of these are true:**")
+                parts.extend(f"{i}. {self._sentence(rng, 12)}" for i in range(1, 4))
+                parts.append("")
+            parts.append(self._paragraph(rng, budget) + "\n")
+
+        parts.append("---\n\n## Questions for Your Next Stakeholder Meeting\n")
+        parts.append("### Must Validate (High Risk)")
+        for i in range(1, 6):
+            parts.append(f"{i}. {self._sentence(rng, 14)}?")
+            parts.append(f"   - WHY it matters: {self._sentence(rng, 14)}.")
+        parts.append("\n### Good to Clarify (Lower Risk)")
+        parts.extend(f"{i}. {self._sentence(rng, 12)}?" for i in range(1, 4))
+        parts.append("\n### Validation Experiments to Run")
+        parts.append(f"1. **What to test:** {self._sentence(rng, 10)}")
+        parts.append(f"   - **Success criteria:** at least {rng.randint(20, 60)}% of {self._sentence(rng, 4)}")
+        parts.append(f"\nConfidence: Medium - based on 5 soft guesses. {self._sentence(rng, 10)}.")
+        return "\n".join(parts) + "\n"
+
+
+# --------------------
+# RECORD / REPLAY
+# --------------------
+
+def recording_key(messages: list) -> str:
+    """Key recordings by message content only, so any model's recording replays."""
+    return make_cache_key(messages)
+
+
+class RecordingLLM:
+    """
+    Wrap a real client and append every response to a JSON-lines file.
+
+    Each line holds the message hash, response text, streaming chunk offsets
+    (seconds since the request started) and usage metadata, for ReplayLLM.
+
+    Args:
+        llm: The client to record (e.g. ChatAnthropic)
+        path: Recordings file to append to
+    """
+
+    def __init__(self, llm, path: str = DEFAULT_RECORDINGS_PATH):
+        self.llm = llm
+        self.path = path
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        # model, max_tokens, temperature, ... come from the wrapped client
+        return getattr(self.llm, name)
+
+    def _write(self, messages, text, chunks, usage):
+        line = json.dumps({
+            "key": recording_key(messages),
+            "content": text,
+            "chunks": chunks,
+            "usage": usage,
+            "recorded_at": time.time(),
+        }, ensure_ascii=False, default=str)
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+    def invoke(self, messages, **kwargs):
+        started = time.perf_counter()
+        response = self.llm.invoke(messages, **kwargs)
+        offset = round(time.perf_counter() - started, 4)
+        self._write(messages, response.content, [[offset, response.content]], response.usage_metadata)
+        return response
+
+    async def ainvoke(self, messages, **kwargs):
+        started = time.perf_counter()
+        response = await self.llm.ainvoke(messages, **kwargs)
+        offset = round(time.perf_counter() - started, 4)
+        self._write(messages, response.content, [[offset, response.content]], response.usage_metadata)
+        return response
+
+    def stream(self, messages, **kwargs):
+        started = time.perf_counter()
+        chunks, usage = [], None
+        stream = self.llm.stream(messages, **kwargs)
+        try:
+            for chunk in stream:
+                chunks.append([round(time.perf_counter() - started, 4), chunk.content])
+                usage = getattr(chunk, "usage_metadata", None) or usage
+                yield chunk
+        finally:
+            stream.close()  # Partial (cancelled) responses are not recorded
+        self._write(messages, "".join(c for _, c in chunks), chunks, usage)
+
+    async def astream(self, messages, **kwargs):
+        started = time.perf_counter()
+        chunks, usage = [], None
+        stream = self.llm.astream(messages, **kwargs)
+        try:
+            async for chunk in stream:
+                chunks.append([round(time.perf_counter() - started, 4), chunk.content])
+                usage = getattr(chunk, "usage_metadata", None) or usage
+                yield chunk
+        finally:
+            await stream.aclose()  # Partial (cancelled) responses are not recorded
+        self._write(messages, "".join(c for _, c in chunks), chunks, usage)
+
+
+class ReplayMissError(KeyError):
+    """Raised by ReplayLLM when no recording matches the request."""
+
+
+class ReplayLLM(_OfflineLLM):
+    """
+    Serve responses recorded by RecordingLLM.
+
+    By default the recorded chunk timings are replayed, scaled by `speed`
+    (2.0 = twice as fast, 0 = no delay). Setting latency or tokens_per_sec
+    re-paces the recorded text instead.
+
+    Args:
+        path: Recordings file written by RecordingLLM
+        speed: Timing multiplier for recorded chunk offsets
+        latency: Seconds before the first token (overrides recorded timing)
+        tokens_per_sec: Output rate (overrides recorded timing)
+        fallback: Client used for unrecorded requests (e.g. SyntheticLLM());
+            without one, a miss raises ReplayMissError
+    """
+
+    model = "replay"
+
+    def __init__(
+        self,
+        path: str = DEFAULT_RECORDINGS_PATH,
+        speed: float = 1.0,
+        latency: float = None,
+        tokens_per_sec: float = None,
+        fallback=None,
+        max_tokens: int = None,
+    ):
+        super().__init__(latency or 0.0, tokens_per_sec, max_tokens)
+        self.path = path
+        self.speed = speed
+        self.fallback = fallback
+        self._repace = latency is not None or tokens_per_sec is not None
+        self._recordings = {}
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._recordings[entry["key"]] = entry  # Latest recording wins
+
+    def __len__(self):
+        return len(self._recordings)
+
+    def _respond(self, messages):
+        entry = self._recordings.get(recording_key(messages))
+        if entry is None:
+            if self.fallback is None:
+                raise ReplayMissError(f"No recording for request in {self.path}")
+            return self.fallback._respond(messages)
+
+        text = entry["content"]
+        usage = entry.get("usage") or _usage(estimate_tokens(messages_text(messages)[0]), len(split_tokens(text)))
+        if self._repace:
+            return text, None, usage
+        scale = 0.0 if not self.speed else 1.0 / self.speed
+        chunks = [(offset * scale, piece) for offset, piece in entry.get("chunks") or [[0.0, text]]]
+        return text, chunks, usage
+
+
+# --------------------
+# SELECTION
+# --------------------
+
+def provider_from_env(streaming: bool, build_anthropic):
+    """
+    Build the client selected by PM_AGENTS_LLM_PROVIDER.
+
+    Args:
+        streaming: Whether the streaming client is being built
+        build_anthropic: Zero-argument callable building the real client
+
+    Returns:
+        An LLM client
+    """
+    provider = os.getenv("PM_AGENTS_LLM_PROVIDER", "anthropic").lower()
+    path = os.getenv("PM_AGENTS_RECORDINGS_PATH", DEFAULT_RECORDINGS_PATH)
+    latency = os.getenv("PM_AGENTS_FAKE_LATENCY")
+    tokens_per_sec = os.getenv("PM_AGENTS_FAKE_TOKENS_PER_SEC")
+    latency = float(latency) if latency else None
+    tokens_per_sec = float(tokens_per_sec) if tokens_per_sec else None
+
+    if provider == "synthetic":
+        return SyntheticLLM(
+            latency=latency or 0.0,
+            tokens_per_sec=tokens_per_sec,
+            output_tokens=int(os.getenv("PM_AGENTS_FAKE_OUTPUT_TOKENS", DEFAULT_OUTPUT_TOKENS)),
+        )
+    if provider == "replay":
+        return ReplayLLM(path, latency=latency, tokens_per_sec=tokens_per_sec)
+    if provider == "record":
+        return RecordingLLM(build_anthropic(), path)
+    if provider != "anthropic":
+        raise ValueError(f"Unknown PM_AGENTS_LLM_PROVIDER: {provider!r}")
+    return build_anthropic()
@@ -0,0 +1,435 @@
+"""
+Client-side rate limiting for LLM calls.
+
+When many Streamlit sessions or batch workers call the model at once, the
+API answers with 429s and every client retries at the same moment. Here each
+call first takes a permit from a token-bucket limiter that tracks both
+budgets Anthropic enforces, requests per minute and tokens per minute, plus
+an optional cap on concurrent in-flight calls. Calls queue briefly on the
+client instead of failing and retrying, which smooths load and keeps
+throughput at the budget.
+
+A permit charges the estimated prompt tokens plus the expected output up
+front; when the call finishes, the charge is corrected with the real usage
+(cache reads excluded, as Anthropic does), so a larger-than-expected answer
+delays later callers instead of overshooting the budget.
+
+Two backends are provided:
+- RateLimiter: per-process buckets (default)
+- SQLiteRateLimiter: buckets stored in SQLite, shared by every process on the host
+
+The concurrency cap is always per process.
+
+Configure via environment variables (read on first use; limiting is off
+unless one of the budgets is set):
+- PM_AGENTS_RATE_LIMIT_RPM: Requests per minute
+- PM_AGENTS_RATE_LIMIT_TPM: Tokens (input + output) per minute
+- PM_AGENTS_MAX_CONCURRENCY: Maximum in-flight LLM calls in this process
+- PM_AGENTS_RATE_LIMIT_PATH: SQLite file to coordinate the budgets across processes
+
+Time spent queueing is added to the call's usage as "queue_wait_s" and shows
+up in the stage metrics.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+
+DEFAULT_OUTPUT_TOKENS = 1024
+POLL_INTERVAL = 0.02  # Seconds between checks while the concurrency cap is reached
+
+
+def estimate_request_tokens(messages: list) -> int:
+    """
+    Roughly estimate the prompt tokens of a request (~4 characters per token).
+
+    Args:
+        messages: Chat messages (dicts or LangChain messages, str or block content)
+    """
+    chars = 0
+    for message in messages:
+        content = message.get("content") if isinstance(message, dict) else getattr(message, "content", message)
+        if isinstance(content, str):
+            chars += len(content)
+        else:
+            for block in content or ():
+                chars += len(block.get("text", "")) if isinstance(block, dict) else len(str(block))
+    return chars // 4 + 1
+
+
+def billed_tokens(usage: dict) -> int:
+    """Tokens counted against the per-minute budget for a summarize_usage() dict."""
+    return max(0, usage.get("input_tokens", 0) - usage.get("cache_read_tokens", 0)) + usage.get("output_tokens", 0)
+
+
+def _refill(level: float, capacity: float, per_second: float, elapsed: float) -> float:
+    return min(capacity, level + elapsed * per_second)
+
+
+# --------------------
+# PERMITS
+# --------------------
+
+class Permit:
+    """
+    One admitted LLM call.
+
+    Attributes:
+        wait_s: Seconds the call queued before being admitted
+        estimated_tokens: Tokens charged up front
+    """
+
+    def __init__(self, limiter=None, estimated_tokens: int = 0, wait_s: float = 0.0):
+        self.limiter = limiter
+        self.estimated_tokens = estimated_tokens
+        self.wait_s = wait_s
+        self.actual_tokens = None
+
+    def settle(self, usage: dict) -> dict:
+        """
+        Record the call's real usage.
+
+        Args:
+            usage: Dict from summarize_usage / add_usage
+
+        Returns:
+            The usage dict, with queue_wait_s added when a limiter is active
+        """
+        if self.limiter is None:
+            return usage
+        self.actual_tokens = billed_tokens(usage)
+        return {**usage, "queue_wait_s": round(self.wait_s, 4)}
+
+    def _release(self):
+        if self.limiter is not None:
+            self.limiter.release(self.estimated_tokens, self.actual_tokens)
+
+
+# --------------------
+# LIMITERS
+# --------------------
+
+class RateLimiter:
+    """
+    Token-bucket limiter for requests/min and tokens/min with a concurrency cap.
+
+    Each budget is a bucket holding up to one minute's allowance that refills
+    continuously. A request larger than the whole token bucket is admitted
+    once the bucket is full, so it cannot block forever.
+
+    Args:
+        requests_per_minute: Request budget (None = unlimited)
+        tokens_per_minute: Token budget (None = unlimited)
+        max_concurrency: Maximum in-flight calls in this process (None = unlimited)
+    """
+
+    # True when bucket storage may block (the async path then uses a thread)
+    _blocking_io = False
+
+    def __init__(
+        self,
+        requests_per_minute: float = None,
+        tokens_per_minute: float = None,
+        max_concurrency: int = None,
+        clock=time.monotonic,
+    ):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_concurrency = max_concurrency
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._requests = float(requests_per_minute or 0)
+        self._tokens = float(tokens_per_minute or 0)
+        self._updated_at = clock()
+
+        self.admitted = 0
+        self.total_wait_s = 0.0
+        self.max_wait_s = 0.0
+
+    # Bucket storage (overridden by SQLiteRateLimiter)
+
+    def _reserve(self, tokens: int) -> float:
+        """Take one request and `tokens` if available; otherwise return the seconds to wait."""
+        now = self._clock()
+        requests, token_level, wait = self._take(self._requests, self._tokens, now - self._updated_at, tokens)
+        self._requests, self._tokens, self._updated_at = requests, token_level, now
+        return wait
+
+    def _refund(self, tokens: int):
+        """Return tokens to the bucket (negative values charge extra usage)."""
+        if self.tokens_per_minute:
+            self._tokens = min(float(self.tokens_per_minute), self._tokens + tokens)
+
+    def _take(self, requests: float, token_level: float, elapsed: float, tokens: int) -> tuple:
+        """Refill both buckets and try to take from them; returns (requests, tokens, wait_s)."""
+        wait = 0.0
+        if self.requests_per_minute:
+            rate = self.requests_per_minute / 60.0
+            requests = _refill(requests, self.requests_per_minute, rate, elapsed)
+            if requests < 1:
+                wait = (1 - requests) / rate
+        if self.tokens_per_minute:
+            rate = self.tokens_per_minute / 60.0
+            token_level = _refill(token_level, self.tokens_per_minute, rate, elapsed)
+            needed = min(tokens, self.tokens_per_minute)
+            if token_level < needed:
+                wait = max(wait, (needed - token_level) / rate)
+        if wait == 0.0:
+            requests -= 1
+            token_level -= tokens
+        return requests, token_level, wait
+
+    # Admission
+
+    def _try_acquire(self, tokens: int) -> float:
+        with self._lock:
+            if self.max_concurrency and self._in_flight >= self.max_concurrency:
+                return POLL_INTERVAL
+            wait = self._reserve(tokens)
+            if wait == 0.0:
+                self._in_flight += 1
+            return wait
+
+    def _admitted(self, waited: float):
+        with self._lock:
+            self.admitted += 1
+            self.total_wait_s += waited
+            self.max_wait_s = max(self.max_wait_s, waited)
+
+    def acquire(self, tokens: int) -> float:
+        """
+        Block until a call charging `tokens` may start.
+
+        Returns:
+            Seconds spent waiting
+        """
+        started = self._clock()
+        while True:
+            wait = self._try_acquire(tokens)
+            if wait == 0.0:
+                break
+            time.sleep(wait)
+        waited = self._clock() - started
+        self._admitted(waited)
+        return waited
+
+    async def _atry_acquire(self, tokens: int) -> float:
+        if not self._blocking_io:
+            return self._try_acquire(tokens)
+        loop = asyncio.get_running_loop()
+        attempt = loop.run_in_executor(None, self._try_acquire, tokens)
+
+        def release_if_admitted(done):
+            # The caller was cancelled while the reservation ran; give the slot back
+            if not done.cancelled() and done.exception() is None and done.result() == 0.0:
+                loop.run_in_executor(None, self.release, tokens, 0)
+
+        try:
+            return await asyncio.shield(attempt)
+        except asyncio.CancelledError:
+            attempt.add_done_callback(release_if_admitted)
+            raise
+
+    async def aacquire(self, tokens: int) -> float:
+        """Async version of acquire (waits with asyncio.sleep)."""
+        started = self._clock()
+        while True:
+            wait = await self._atry_acquire(tokens)
+            if wait == 0.0:
+                break
+            await asyncio.sleep(wait)
+        waited = self._clock() - started
+        self._admitted(waited)
+        return waited
+
+    def release(self, estimated_tokens: int, actual_tokens: int = None):
+        """
+        Finish a call admitted by acquire.
+
+        Args:
+            estimated_tokens: Tokens charged at admission
+            actual_tokens: Tokens really used (None = keep the estimate)
+        """
+        with self._lock:
+            self._in_flight -= 1
+            if actual_tokens is not None and actual_tokens != estimated_tokens:
+                self._refund(estimated_tokens - actual_tokens)
+
+    # Context managers
+
+    @contextmanager
+    def limit(self, messages: list, expected_output_tokens: int = DEFAULT_OUTPUT_TOKENS):
+        """Hold a Permit for the duration of one LLM call."""
+        estimated = estimate_request_tokens(messages) + expected_output_tokens
+        permit = Permit(self, estimated, self.acquire(estimated))
+        try:
+            yield permit
+        finally:
+            permit._release()
+
+    @asynccontextmanager
+    async def alimit(self, messages: list, expected_output_tokens: int = DEFAULT_OUTPUT_TOKENS):
+        """Async version of limit."""
+        estimated = estimate_request_tokens(messages) + expected_output_tokens
+        permit = Permit(self, estimated, await self.aacquire(estimated))
+        try:
+            yield permit
+        finally:
+            if self._blocking_io:
+                await asyncio.get_running_loop().run_in_executor(None, permit._release)
+            else:
+                permit._release()
+
+    def stats(self) -> dict:
+        """Return admitted calls, in-flight calls and queue wait totals."""
+        with self._lock:
+            return {
+                "admitted": self.admitted,
+                "in_flight": self._in_flight,
+                "total_wait_s": round(self.total_wait_s, 4),
+                "avg_wait_s": round(self.total_wait_s / self.admitted, 4) if self.admitted else 0.0,
+                "max_wait_s": round(self.max_wait_s, 4),
+            }
+
+
+class SQLiteRateLimiter(RateLimiter):
+    """
+    RateLimiter whose buckets live in SQLite, shared by all processes using the file.
+
+    Each reservation is one BEGIN IMMEDIATE transaction, so processes see a
+    consistent bucket. Wall-clock time is used because monotonic clocks are
+    not comparable across processes.
+
+    Args:
+        path: SQLite database file
+        (other arguments as for RateLimiter)
+    """
+
+    # Reservations can wait up to the 30s busy timeout for another process's
+    # lock, so the async path runs them in the default executor
+    _blocking_io = True
+
+    def __init__(self, path: str, requests_per_minute=None, tokens_per_minute=None, max_concurrency=None):
+        super().__init__(requests_per_minute, tokens_per_minute, max_concurrency, clock=time.time)
+        self.path = path
+        import sqlite3  # Deferred: only needed when the shared limiter is used
+
+        # isolation_level=None: transactions are managed explicitly below
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS rate_limit ("
+            "id INTEGER PRIMARY KEY CHECK (id = 1), "
+            "requests REAL NOT NULL, tokens REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "INSERT OR IGNORE INTO rate_limit (id, requests, tokens, updated_at) VALUES (1, ?, ?, ?)",
+            (float(requests_per_minute or 0), float(tokens_per_minute or 0), time.time()),
+        )
+
+    def _reserve(self, tokens):
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            requests, token_level, updated_at = self._conn.execute(
+                "SELECT requests, tokens, updated_at FROM rate_limit WHERE id = 1"
+            ).fetchone()
+            now = time.time()
+            requests, token_level, wait = self._take(requests, token_level, max(0.0, now - updated_at), tokens)
+            self._conn.execute(
+                "UPDATE rate_limit SET requests = ?, tokens = ?, updated_at = ? WHERE id = 1",
+                (requests, token_level, now),
+            )
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        return wait
+
+    def _refund(self, tokens):
+        if self.tokens_per_minute:
+            self._conn.execute(
+                "UPDATE rate_limit SET tokens = MIN(?, tokens + ?) WHERE id = 1",
+                (float(self.tokens_per_minute), tokens),
+            )
+
+
+# --------------------
+# ACTIVE LIMITER
+# --------------------
+
+_UNSET = object()
+_rate_limiter = _UNSET
+_limiter_lock = threading.Lock()
+
+
+def limiter_from_env():
+    """Build the limiter described by the PM_AGENTS_RATE_LIMIT_* variables (None if unset)."""
+    rpm = os.getenv("PM_AGENTS_RATE_LIMIT_RPM")
+    tpm = os.getenv("PM_AGENTS_RATE_LIMIT_TPM")
+    concurrency = os.getenv("PM_AGENTS_MAX_CONCURRENCY")
+    if not (rpm or tpm or concurrency):
+        return None
+
+    kwargs = {
+        "requests_per_minute": float(rpm) if rpm else None,
+        "tokens_per_minute": float(tpm) if tpm else None,
+        "max_concurrency": int(concurrency) if concurrency else None,
+    }
+    path = os.getenv("PM_AGENTS_RATE_LIMIT_PATH")
+    if path:
+        return SQLiteRateLimiter(path, **kwargs)
+    return RateLimiter(**kwargs)
+
+
+def get_rate_limiter():
+    """Return the active rate limiter, or None if limiting is disabled."""
+    global _rate_limiter
+    if _rate_limiter is _UNSET:
+        with _limiter_lock:
+            if _rate_limiter is _UNSET:
+                _rate_limiter = limiter_from_env()
+    return _rate_limiter
+
+
+def set_rate_limiter(limiter):
+    """
+    Replace the active rate limiter.
+
+    Args:
+        limiter: A RateLimiter instance, or None to disable limiting
+    """
+    global _rate_limiter
+    with _limiter_lock:
+        _rate_limiter = limiter
+
+
+@contextmanager
+def rate_limited(messages: list, expected_output_tokens: int = DEFAULT_OUTPUT_TOKENS):
+    """
+    Admit one LLM call through the active limiter (a no-op Permit if disabled).
+
+    Usage:
+        with rate_limited(messages) as permit:
+            response = llm.invoke(messages)
+            usage = permit.settle(summarize_usage(response.usage_metadata))
+    """
+    limiter = get_rate_limiter()
+    if limiter is None:
+        yield Permit()
+        return
+    with limiter.limit(messages, expected_output_tokens) as permit:
+        yield permit
+
+
+@asynccontextmanager
+async def arate_limited(messages: list, expected_output_tokens: int = DEFAULT_OUTPUT_TOKENS):
+    """Async version of rate_limited."""
+    limiter = get_rate_limiter()
+    if limiter is None:
+        yield Permit()
+        return
+    async with limiter.alimit(messages, expected_output_tokens) as permit:
+        yield permit
@@ -0,0 +1,410 @@
+"""
+Retries, deadlines and hedged requests for the short coordinator calls.
+
+Refinement, classification and soft-guess extraction sit on the checkpoint
+path: the user is waiting on each one, so a transient 529 or one slow tail
+response stalls the whole flow. Every coordinator call goes through the
+active ResiliencePolicy, which adds:
+
+- Retries with exponential backoff and full jitter on transient errors
+  (rate limits, overload, 5xx, connection errors and timeouts)
+- A per-stage deadline covering all attempts and backoff sleeps
+- Optional hedging: if a call has not returned after the stage's observed
+  p95 latency, a second identical request is fired and whichever returns
+  first wins (the other is cancelled, or, on the sync path where a running
+  request cannot be stopped, its result is passed to on_discarded)
+
+Hedging waits until a stage has enough latency samples to estimate its
+p95, and every hedge is a real request (it also takes a rate-limiter permit),
+so it costs at most ~5% extra calls at the default quantile.
+
+Configure via environment variables (read on first use):
+- PM_AGENTS_RETRY_ATTEMPTS: Attempts per call, including the first (default 1)
+- PM_AGENTS_RETRY_BASE_DELAY / PM_AGENTS_RETRY_MAX_DELAY: Backoff bounds in seconds (0.5 / 8)
+- PM_AGENTS_DEADLINE: Seconds allowed per coordinator call, all attempts included (default: none)
+- PM_AGENTS_DEADLINE_<STAGE>: Per-stage override, e.g. PM_AGENTS_DEADLINE_REFINEMENT=20
+- PM_AGENTS_HEDGE: "1" to hedge slow calls
+- PM_AGENTS_HEDGE_QUANTILE: Latency quantile after which to hedge (default 0.95)
+
+The Anthropic SDK also retries connection errors, 429s and 5xx internally
+(max_retries=2 by default) without knowing about the deadline. By default
+the policy leaves retrying to the SDK; with PM_AGENTS_RETRY_ATTEMPTS > 1 the
+coordinator's client is built with max_retries=0 (see llm.py), so one call
+never sends more than max_attempts requests (plus hedges).
+"""
+
+import asyncio
+import contextvars
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from .logs import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_MAX_ATTEMPTS = 1
+DEFAULT_BASE_DELAY = 0.5
+DEFAULT_MAX_DELAY = 8.0
+DEFAULT_HEDGE_QUANTILE = 0.95
+DEFAULT_HEDGE_MIN_SAMPLES = 20
+DEFAULT_HEDGE_MIN_DELAY = 0.25
+
+# HTTP statuses worth retrying: timeout, conflict, rate limit, server errors / overload
+_TRANSIENT_STATUS = {408, 409, 429}
+_TRANSIENT_NAMES = {
+    "APIConnectionError",
+    "APITimeoutError",
+    "RateLimitError",
+    "InternalServerError",
+    "OverloadedError",
+    "ServiceUnavailableError",
+    "TimeoutException",
+    "ConnectError",
+    "ReadError",
+    "RemoteProtocolError",
+}
+
+
+class DeadlineExceeded(TimeoutError):
+    """A call did not complete within its stage deadline."""
+
+
+def is_transient(exc: BaseException) -> bool:
+    """Return True if an LLM error is worth retrying."""
+    if isinstance(exc, DeadlineExceeded):
+        return False
+    status = getattr(exc, "status_code", None)
+    if isinstance(status, int):
+        return status in _TRANSIENT_STATUS or status >= 500
+    if isinstance(exc, (TimeoutError, ConnectionError)):
+        return True
+    return any(cls.__name__ in _TRANSIENT_NAMES for cls in type(exc).__mro__)
+
+
+# --------------------
+# LATENCY TRACKING
+# --------------------
+
+class LatencyTracker:
+    """
+    Sliding window of successful call latencies per stage.
+
+    Args:
+        window: Samples kept per stage
+    """
+
+    def __init__(self, window: int = 256):
+        self.window = window
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, seconds: float):
+        with self._lock:
+            samples = self._samples.get(stage)
+            if samples is None:
+                samples = self._samples[stage] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def quantile(self, stage: str, q: float, min_samples: int = 1):
+        """Return the q-quantile latency for a stage, or None with fewer than min_samples."""
+        with self._lock:
+            samples = sorted(self._samples.get(stage, ()))
+        if len(samples) < max(1, min_samples):
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+# --------------------
+# POLICY
+# --------------------
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="pm-agents-llm")
+    return _executor
+
+
+def _submit(fn):
+    # Each request gets its own copy of the caller's context (log fields etc.)
+    return _get_executor().submit(contextvars.copy_context().run, fn)
+
+
+def _report_when_done(future, on_discarded):
+    """Pass a discarded request's result to on_discarded once it finishes."""
+    def callback(done):
+        if not done.cancelled() and done.exception() is None:
+            on_discarded(done.result())
+
+    future.add_done_callback(callback)
+
+
+class ResiliencePolicy:
+    """
+    Retry / deadline / hedging policy for coordinator LLM calls.
+
+    Args:
+        max_attempts: Attempts per call, including the first
+        base_delay: First backoff ceiling in seconds (doubles per retry)
+        max_delay: Backoff ceiling cap in seconds
+        deadline: Seconds allowed per call across all attempts (None = no limit)
+        stage_deadlines: Per-stage deadline overrides
+        hedge: Fire a second request when a call exceeds the stage's hedge_quantile latency
+        hedge_quantile: Latency quantile that triggers the hedge
+        hedge_min_samples: Samples needed before a stage is hedged
+        hedge_min_delay: Never hedge sooner than this many seconds
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        base_delay: float = DEFAULT_BASE_DELAY,
+        max_delay: float = DEFAULT_MAX_DELAY,
+        deadline: float = None,
+        stage_deadlines: dict = None,
+        hedge: bool = False,
+        hedge_quantile: float = DEFAULT_HEDGE_QUANTILE,
+        hedge_min_samples: int = DEFAULT_HEDGE_MIN_SAMPLES,
+        hedge_min_delay: float = DEFAULT_HEDGE_MIN_DELAY,
+        clock=time.monotonic,
+    ):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.stage_deadlines = dict(stage_deadlines or {})
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_samples = hedge_min_samples
+        self.hedge_min_delay = hedge_min_delay
+        self.latencies = LatencyTracker()
+        self._clock = clock
+
+    def deadline_for(self, stage: str):
+        """Return the deadline in seconds for a stage (None = no limit)."""
+        return self.stage_deadlines.get(stage, self.deadline)
+
+    def hedge_delay(self, stage: str):
+        """Return seconds after which to hedge a call, or None to not hedge."""
+        if not self.hedge:
+            return None
+        latency = self.latencies.quantile(stage, self.hedge_quantile, self.hedge_min_samples)
+        if latency is None:
+            return None
+        return max(self.hedge_min_delay, latency)
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter delay before retry number `attempt` (1-based)."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    def _remaining(self, expires):
+        return None if expires is None else max(0.0, expires - self._clock())
+
+    def _should_retry(self, exc, attempt: int, expires, stage: str):
+        """Return the backoff delay before the next attempt, or None to give up."""
+        if not is_transient(exc) or attempt >= self.max_attempts:
+            return None
+        delay = self.backoff(attempt)
+        if expires is not None and self._clock() + delay >= expires:
+            return None
+        logger.warning(
+            "Transient LLM error, retrying in %.2fs: %s", delay, exc,
+            extra={"stage": stage, "attempt": attempt, "error": type(exc).__name__},
+        )
+        return delay
+
+    # Sync
+
+    def call(self, fn, stage: str = None, on_discarded=None) -> tuple:
+        """
+        Run fn() under this policy.
+
+        Args:
+            fn: Zero-argument callable making one LLM request
+            stage: Stage name for deadlines and latency tracking
+            on_discarded: Optional callback receiving the result of a request
+                that finished but was not used (a losing hedge, or one still
+                running when the deadline passed); called from its worker thread
+
+        Returns:
+            (result, info) where info is {"attempts": int, "hedged": bool}
+
+        Raises:
+            DeadlineExceeded: If the stage deadline passed
+            Exception: The last error if it was not transient or attempts ran out
+        """
+        deadline = self.deadline_for(stage)
+        expires = None if deadline is None else self._clock() + deadline
+        info = {"attempts": 0, "hedged": False}
+        while True:
+            info["attempts"] += 1
+            try:
+                return self._attempt(fn, stage, expires, info, on_discarded), info
+            except Exception as exc:
+                delay = self._should_retry(exc, info["attempts"], expires, stage)
+                if delay is None:
+                    raise
+            time.sleep(delay)
+
+    def _attempt(self, fn, stage, expires, info, on_discarded=None):
+        started = self._clock()
+        hedge_delay = self.hedge_delay(stage)
+        if hedge_delay is None and expires is None:
+            result = fn()
+            self.latencies.record(stage, self._clock() - started)
+            return result
+
+        # Run on worker threads so the deadline and hedge timer can fire
+        pending = [_submit(fn)]
+        if hedge_delay is not None:
+            remaining = self._remaining(expires)
+            done, _ = wait(pending, timeout=hedge_delay if remaining is None else min(hedge_delay, remaining))
+            if not done and (expires is None or self._clock() < expires):
+                logger.info("Hedging slow LLM call after %.2fs", hedge_delay, extra={"stage": stage})
+                pending.append(_submit(fn))
+                info["hedged"] = True
+
+        error = None
+        try:
+            while pending:
+                done, _ = wait(pending, timeout=self._remaining(expires), return_when=FIRST_COMPLETED)
+                if not done:
+                    raise DeadlineExceeded(f"{stage or 'LLM'} call exceeded its {self.deadline_for(stage)}s deadline")
+                succeeded = [future for future in done if future.exception() is None]
+                pending = [future for future in pending if future not in done]
+                if succeeded:
+                    self.latencies.record(stage, self._clock() - started)
+                    if on_discarded is not None:
+                        for future in succeeded[1:]:
+                            on_discarded(future.result())
+                    return succeeded[0].result()
+                error = next(iter(done)).exception()
+            raise error
+        finally:
+            # Requests still running cannot be stopped on their threads
+            for future in pending:
+                if not future.cancel() and on_discarded is not None:
+                    _report_when_done(future, on_discarded)
+
+    # Async
+
+    async def acall(self, afn, stage: str = None, on_discarded=None) -> tuple:
+        """
+        Async version of call; afn is a zero-argument coroutine function.
+
+        Losing requests are cancelled, so on_discarded only receives results
+        of requests that finished at the same moment as the winner.
+        """
+        deadline = self.deadline_for(stage)
+        expires = None if deadline is None else self._clock() + deadline
+        info = {"attempts": 0, "hedged": False}
+        while True:
+            info["attempts"] += 1
+            try:
+                return await self._aattempt(afn, stage, expires, info, on_discarded), info
+            except Exception as exc:
+                delay = self._should_retry(exc, info["attempts"], expires, stage)
+                if delay is None:
+                    raise
+            await asyncio.sleep(delay)
+
+    async def _aattempt(self, afn, stage, expires, info, on_discarded=None):
+        started = self._clock()
+        hedge_delay = self.hedge_delay(stage)
+        if hedge_delay is None and expires is None:
+            result = await afn()
+            self.latencies.record(stage, self._clock() - started)
+            return result
+
+        pending = {asyncio.ensure_future(afn())}
+        try:
+            if hedge_delay is not None:
+                remaining = self._remaining(expires)
+                done, _ = await asyncio.wait(
+                    pending, timeout=hedge_delay if remaining is None else min(hedge_delay, remaining)
+                )
+                if not done and (expires is None or self._clock() < expires):
+                    logger.info("Hedging slow LLM call after %.2fs", hedge_delay, extra={"stage": stage})
+                    pending.add(asyncio.ensure_future(afn()))
+                    info["hedged"] = True
+
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, timeout=self._remaining(expires), return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    raise DeadlineExceeded(f"{stage or 'LLM'} call exceeded its {self.deadline_for(stage)}s deadline")
+                succeeded = [task for task in done if task.exception() is None]
+                if succeeded:
+                    self.latencies.record(stage, self._clock() - started)
+                    if on_discarded is not None:
+                        for task in succeeded[1:]:
+                            on_discarded(task.result())
+                    return succeeded[0].result()
+                error = next(iter(done)).exception()
+            raise error
+        finally:
+            # Cancel the losing (or timed-out) request
+            for task in pending:
+                task.cancel()
+
+
+# --------------------
+# ACTIVE POLICY
+# --------------------
+
+_policy = None
+_policy_lock = threading.Lock()
+
+
+def policy_from_env() -> ResiliencePolicy:
+    """Build the policy described by the PM_AGENTS_RETRY_* / DEADLINE* / HEDGE* variables."""
+    prefix = "PM_AGENTS_DEADLINE_"
+    stage_deadlines = {
+        name[len(prefix):].lower(): float(value)
+        for name, value in os.environ.items()
+        if name.startswith(prefix) and value
+    }
+    deadline = os.getenv("PM_AGENTS_DEADLINE")
+    return ResiliencePolicy(
+        max_attempts=int(os.getenv("PM_AGENTS_RETRY_ATTEMPTS", DEFAULT_MAX_ATTEMPTS)),
+        base_delay=float(os.getenv("PM_AGENTS_RETRY_BASE_DELAY", DEFAULT_BASE_DELAY)),
+        max_delay=float(os.getenv("PM_AGENTS_RETRY_MAX_DELAY", DEFAULT_MAX_DELAY)),
+        deadline=float(deadline) if deadline else None,
+        stage_deadlines=stage_deadlines,
+        hedge=os.getenv("PM_AGENTS_HEDGE", "") in ("1", "true", "yes"),
+        hedge_quantile=float(os.getenv("PM_AGENTS_HEDGE_QUANTILE", DEFAULT_HEDGE_QUANTILE)),
+    )
+
+
+def get_resilience_policy() -> ResiliencePolicy:
+    """Return the active policy, building it from the environment on first use."""
+    global _policy
+    if _policy is None:
+        with _policy_lock:
+            if _policy is None:
+                _policy = policy_from_env()
+    return _policy
+
+
+def set_resilience_policy(policy: ResiliencePolicy = None):
+    """
+    Replace the active policy.
+
+    Args:
+        policy: A ResiliencePolicy, or None to rebuild from the environment on next use
+    """
+    global _policy
+    with _policy_lock:
+        _policy = policy
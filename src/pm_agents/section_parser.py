@@ -0,0 +1,184 @@
+"""
+Incremental parser for streamed specialist output.
+
+Specialist answers follow a known markdown structure: "### N. ..." sections,
+⚠️-marked soft guesses, markdown tables (e.g. "Risk Summary Matrix") and the
+mandatory "Questions for Your Next Stakeholder Meeting" section. SectionParser
+consumes tokens as they arrive and emits structured events as soon as each
+line completes, so consumers can act on soft guesses and questions before
+generation finishes instead of re-parsing the whole answer at ("done", ...).
+
+Tokens are buffered until a newline, so each character is examined a
+constant number of times: O(1) amortized work per token.
+
+Events are (event_type, data) tuples:
+    ("section_started", {"title": str, "level": int})
+    ("soft_guess", {"text": str, "section": str})
+    ("question", {"text": str, "section": str})
+    ("table_row", {"section": str, "headers": list[str], "cells": list[str]})
+
+Example:
+    parser = SectionParser()
+    for token in stream_agent(context, llm):
+        for event_type, data in parser.feed(token):
+            ...
+    events = parser.close()
+"""
+
+import re
+
+SOFT_GUESS_MARKER = "⚠"  # Also matches "⚠️" (with variation selector)
+
+_HEADING = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+_LIST_ITEM = re.compile(r"^(?:[-*+]|\d+[.)])\s+(.*)$")
+_TABLE_SEPARATOR = re.compile(r"^\|?[\s:|-]+\|?$")
+_NUMBERING = re.compile(r"^\d+[.)]\s*")
+
+
+def _split_row(line: str) -> list:
+    """Split a markdown table row into stripped cell texts."""
+    body = line.strip()
+    if body.startswith("|"):
+        body = body[1:]
+    if body.endswith("|"):
+        body = body[:-1]
+    return [cell.strip() for cell in body.split("|")]
+
+
+class SectionParser:
+    """
+    Line-buffered incremental parser for specialist markdown.
+
+    Attributes:
+        soft_guesses: Soft guess texts seen so far
+        questions: Stakeholder questions seen so far
+        sections: Heading titles seen so far
+    """
+
+    def __init__(self):
+        self._pending = []  # Token fragments of the current, incomplete line
+        self._headings = []  # Stack of (level, title)
+        self._in_questions = False
+        self._in_experiments = False
+        self._in_fence = False
+        self._table_headers = None
+        self.soft_guesses = []
+        self.questions = []
+        self.sections = []
+
+    @property
+    def section(self) -> str:
+        """Title of the innermost heading, or "" before the first heading."""
+        return self._headings[-1][1] if self._headings else ""
+
+    def feed(self, token: str) -> list:
+        """
+        Consume one streamed token.
+
+        Returns:
+            Events for every line completed by this token (usually none)
+        """
+        if "\n" not in token:
+            self._pending.append(token)
+            return []
+
+        events = []
+        lines = token.split("\n")
+        self._pending.append(lines[0])
+        self._parse_line("".join(self._pending), events)
+        for line in lines[1:-1]:
+            self._parse_line(line, events)
+        self._pending = [lines[-1]] if lines[-1] else []
+        return events
+
+    def close(self) -> list:
+        """Flush the final (unterminated) line and return its events."""
+        events = []
+        if self._pending:
+            self._parse_line("".join(self._pending), events)
+            self._pending = []
+        return events
+
+    def _parse_line(self, line: str, events: list):
+        stripped = line.strip()
+
+        if stripped.startswith("```"):
+            self._in_fence = not self._in_fence
+            return
+        if self._in_fence or not stripped:
+            if not stripped:
+                self._table_headers = None
+            return
+
+        if stripped.startswith("#"):
+            heading = _HEADING.match(stripped)
+            if heading:
+                self._start_section(len(heading.group(1)), heading.group(2), events)
+                return
+
+        if stripped.startswith("|"):
+            self._parse_table_row(stripped, events)
+            return
+        self._table_headers = None
+
+        if SOFT_GUESS_MARKER in stripped:
+            text = stripped
+            item = _LIST_ITEM.match(text)
+            if item:
+                text = item.group(1)
+            text = text.replace("⚠️", "").replace(SOFT_GUESS_MARKER, "").strip()
+            self.soft_guesses.append(text)
+            events.append(("soft_guess", {"text": text, "section": self.section}))
+            return
+
+        # Questions are top-level list items in the questions section
+        # (indented lines are the "WHY it matters" notes under a question)
+        if self._in_questions and not self._in_experiments and line[:1] not in (" ", "\t"):
+            item = _LIST_ITEM.match(stripped)
+            if item:
+                text = item.group(1).strip()
+                self.questions.append(text)
+                events.append(("question", {"text": text, "section": self.section}))
+
+    def _start_section(self, level: int, title: str, events: list):
+        title = title.strip("*").strip()
+        while self._headings and self._headings[-1][0] >= level:
+            self._headings.pop()
+        self._headings.append((level, title))
+        self._table_headers = None
+
+        titles = [t.lower() for _, t in self._headings]
+        self._in_questions = any("question" in t for t in titles)
+        self._in_experiments = "experiment" in titles[-1]
+
+        self.sections.append(title)
+        events.append(("section_started", {"title": title, "level": level}))
+
+    def _parse_table_row(self, line: str, events: list):
+        if _TABLE_SEPARATOR.match(line):
+            return
+        cells = _split_row(line)
+        if self._table_headers is None:
+            self._table_headers = cells
+            return
+        events.append(("table_row", {
+            "section": self.section,
+            "headers": self._table_headers,
+            "cells": cells,
+        }))
+
+
+def parse_stream(tokens):
+    """
+    Yield parser events for an iterable of tokens (including the final line).
+
+    Args:
+        tokens: Iterable of streamed text tokens
+
+    Yields:
+        (event_type, data) tuples as described in the module docstring
+    """
+    parser = SectionParser()
+    for token in tokens:
+        yield from parser.feed(token)
+    yield from parser.close()
@@ -0,0 +1,430 @@
+"""
+Headless HTTP service for the staged workflow.
+
+A plain ASGI application (no web framework dependency) exposing the async
+stage generators, so the backend can run behind a load balancer separately
+from the Streamlit UI. Requests are stateless: every call carries the data
+from the previous stages.
+
+Endpoints (POST bodies are JSON):
+    GET  /healthz
+    POST /v1/refinement         {"input": str, "fast_path": bool}
+    POST /v1/classification     {"refined_input": str}
+    POST /v1/soft-guesses       {"refined_input": str, "classification": str}
+    POST /v1/specialist         {"refined_input": str, "classification": str,
+                                 "confirmed_guesses": list, "concise": bool, "validate": bool}
+    POST /v1/specialist/stream  same body; Server-Sent Events, one per stage event:
+                                 "event: token\\ndata: \\"...\\"\\n\\n", ..., done, metrics
+
+Stage endpoints answer {"result": ..., "metrics": {...}}; errors answer
+{"error": str} with a 4xx/5xx status.
+
+Admission: at most PM_AGENTS_SERVER_MAX_REQUESTS requests run at once, and
+(optionally) specialist streams are admitted by their expected output tokens
+(see budget.py) up to PM_AGENTS_SERVER_MAX_STREAM_TOKENS in flight. Requests
+that cannot be admitted within PM_AGENTS_SERVER_QUEUE_TIMEOUT seconds get a
+503 with Retry-After, so the gateway can route them elsewhere.
+
+When a client disconnects, its request task is cancelled; the stage
+generators close the upstream LLM stream, so no tokens are generated for a
+client that has gone.
+
+Run with any ASGI server, e.g. uvicorn (the "server" extra: uv sync --extra server):
+    uvicorn pm_agents.server:app --workers 4
+"""
+
+import asyncio
+import json
+import os
+import time
+import uuid
+
+from .budget import expected_output_tokens
+from .coordinator import VALID_CLASSIFICATIONS
+from .logs import configure_logging, get_logger, log_context
+from .metrics import configure_metrics
+from .ratelimit import DEFAULT_OUTPUT_TOKENS
+from .resilience import DeadlineExceeded
+from .workflow import (
+    arun_stage1_refinement,
+    arun_stage2_classification,
+    arun_stage3_soft_guesses,
+    arun_stage4_specialist,
+)
+
+logger = get_logger(__name__)
+
+DEFAULT_MAX_REQUESTS = 64
+DEFAULT_QUEUE_TIMEOUT = 10.0
+MAX_BODY_BYTES = 1024 * 1024
+
+_JSON_HEADERS = [(b"content-type", b"application/json")]
+_SSE_HEADERS = [
+    (b"content-type", b"text/event-stream"),
+    (b"cache-control", b"no-cache"),
+    (b"x-accel-buffering", b"no"),  # Stop nginx-style proxies from buffering the stream
+]
+
+
+class HTTPError(Exception):
+    """An error answered with a status code and JSON {"error": message}."""
+
+    def __init__(self, status: int, message: str, headers: list = None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.headers = headers or []
+
+
+class ClientDisconnected(Exception):
+    """The client went away before the response was complete."""
+
+
+# --------------------
+# ADMISSION CONTROL
+# --------------------
+
+class Admission:
+    """
+    Admit requests by count and by expected output tokens.
+
+    A request costing more than the whole token capacity is admitted when
+    nothing else is in flight, so it cannot wait forever.
+
+    Args:
+        max_requests: Requests allowed in flight
+        max_tokens: Expected output tokens allowed in flight (None = unlimited)
+        queue_timeout: Seconds a request may wait before being rejected
+    """
+
+    def __init__(self, max_requests: int = DEFAULT_MAX_REQUESTS, max_tokens: int = None,
+                 queue_timeout: float = DEFAULT_QUEUE_TIMEOUT):
+        self.max_requests = max_requests
+        self.max_tokens = max_tokens
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self.tokens_in_flight = 0
+        self.rejected = 0
+        self._condition = None  # Created on first use, inside the server's event loop
+
+    def _fits(self, cost: int) -> bool:
+        if self.in_flight >= self.max_requests:
+            return False
+        if self.max_tokens is None or self.in_flight == 0:
+            return True
+        return self.tokens_in_flight + cost <= self.max_tokens
+
+    async def acquire(self, cost: int) -> float:
+        """Wait for admission; returns seconds waited. Raises HTTPError(503) on timeout."""
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        started = time.perf_counter()
+        async with self._condition:
+            try:
+                await asyncio.wait_for(self._condition.wait_for(lambda: self._fits(cost)), self.queue_timeout)
+            except asyncio.TimeoutError:
+                self.rejected += 1
+                raise HTTPError(
+                    503, "Server busy, retry later", [(b"retry-after", str(max(1, int(self.queue_timeout))).encode())]
+                )
+            self.in_flight += 1
+            self.tokens_in_flight += cost
+        return time.perf_counter() - started
+
+    async def release(self, cost: int):
+        async with self._condition:
+            self.in_flight -= 1
+            self.tokens_in_flight -= cost
+            self._condition.notify_all()
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "tokens_in_flight": self.tokens_in_flight,
+            "max_requests": self.max_requests,
+            "max_tokens": self.max_tokens,
+            "rejected": self.rejected,
+        }
+
+
+# --------------------
+# ASGI HELPERS
+# --------------------
+
+async def _read_json(receive) -> dict:
+    chunks, size = [], 0
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            raise ClientDisconnected()
+        body = message.get("body", b"")
+        size += len(body)
+        if size > MAX_BODY_BYTES:
+            raise HTTPError(413, "Request body too large")
+        chunks.append(body)
+        if not message.get("more_body"):
+            break
+    try:
+        payload = json.loads(b"".join(chunks) or b"{}")
+    except ValueError:
+        raise HTTPError(400, "Request body must be JSON")
+    if not isinstance(payload, dict):
+        raise HTTPError(400, "Request body must be a JSON object")
+    return payload
+
+
+async def _send_json(send, status: int, payload, headers: list = None):
+    body = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": _JSON_HEADERS + [(b"content-length", str(len(body)).encode())] + (headers or []),
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+def _sse(event_type: str, data) -> bytes:
+    payload = json.dumps(data, ensure_ascii=False, default=str)
+    return f"event: {event_type}\ndata: {payload}\n\n".encode("utf-8")
+
+
+async def _wait_for_disconnect(receive):
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return
+
+
+async def _cancel_on_disconnect(receive, coro):
+    """Run coro; cancel it (and raise ClientDisconnected) if the client disconnects first."""
+    task = asyncio.ensure_future(coro)
+    watcher = asyncio.ensure_future(_wait_for_disconnect(receive))
+    try:
+        done, _ = await asyncio.wait({task, watcher}, return_when=asyncio.FIRST_COMPLETED)
+    except asyncio.CancelledError:
+        task.cancel()
+        raise
+    finally:
+        watcher.cancel()
+    if task in done:
+        return task.result()
+    task.cancel()
+    try:
+        await task
+    except (asyncio.CancelledError, Exception):
+        pass
+    raise ClientDisconnected()
+
+
+def _require(payload: dict, field: str, kind=str):
+    value = payload.get(field)
+    if not isinstance(value, kind) or (kind is str and not value.strip()):
+        raise HTTPError(400, f"'{field}' is required")
+    return value
+
+
+def _classification(payload: dict) -> str:
+    classification = _require(payload, "classification")
+    if classification not in VALID_CLASSIFICATIONS:
+        raise HTTPError(400, f"'classification' must be one of {list(VALID_CLASSIFICATIONS)}")
+    return classification
+
+
+def _guesses(payload: dict) -> list:
+    guesses = payload.get("confirmed_guesses") or []
+    if not isinstance(guesses, list) or not all(
+        isinstance(g, dict) and "topic" in g and "assumption" in g for g in guesses
+    ):
+        raise HTTPError(400, "'confirmed_guesses' must be a list of {topic, assumption} objects")
+    return guesses
+
+
+async def _collect(stage) -> dict:
+    """Run a stage generator to completion and return {"result", "metrics"}."""
+    response = {"result": None, "metrics": None}
+    async for event_type, data in stage:
+        if event_type == "metrics":
+            response["metrics"] = data
+        else:
+            response["result"] = data
+    return response
+
+
+# --------------------
+# APPLICATION
+# --------------------
+
+class PMAgentsApp:
+    """
+    ASGI application serving the staged workflow.
+
+    Args:
+        admission: Admission controller (default: from PM_AGENTS_SERVER_* variables)
+    """
+
+    def __init__(self, admission: Admission = None):
+        self.admission = admission or admission_from_env()
+        self._routes = {
+            "/v1/refinement": self._refinement,
+            "/v1/classification": self._classification,
+            "/v1/soft-guesses": self._soft_guesses,
+            "/v1/specialist": self._specialist,
+            "/v1/specialist/stream": self._specialist_stream,
+        }
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        headers = dict(scope.get("headers") or [])
+        request_id = headers.get(b"x-request-id", b"").decode("latin-1") or uuid.uuid4().hex[:12]
+        with log_context(request_id=request_id):
+            await self._handle(scope, receive, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                configure_logging()
+                configure_metrics()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                from .transport import aclose_http_clients
+
+                await aclose_http_clients()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _handle(self, scope, receive, send):
+        path, method = scope["path"], scope["method"]
+        started = time.perf_counter()
+        try:
+            if path == "/healthz":
+                await _send_json(send, 200, {"status": "ok", "admission": self.admission.stats()})
+                return
+            handler = self._routes.get(path)
+            if handler is None:
+                raise HTTPError(404, "Not found")
+            if method != "POST":
+                raise HTTPError(405, "Method not allowed", [(b"allow", b"POST")])
+            payload = await _read_json(receive)
+            await handler(payload, receive, send)
+            logger.info(
+                "Request complete",
+                extra={"path": path, "elapsed_s": round(time.perf_counter() - started, 4)},
+            )
+        except ClientDisconnected:
+            logger.info("Client disconnected, request cancelled", extra={"path": path})
+        except HTTPError as e:
+            await _send_json(send, e.status, {"error": e.message}, e.headers)
+        except DeadlineExceeded as e:
+            logger.warning("Request deadline exceeded: %s", e, extra={"path": path})
+            await _send_json(send, 504, {"error": str(e)})
+        except Exception:
+            logger.exception("Request failed", extra={"path": path})
+            await _send_json(send, 500, {"error": "Internal server error"})
+
+    async def _admitted(self, cost: int, receive, coro):
+        """Run coro once admitted, cancelling it if the client disconnects."""
+        try:
+            waited = await self.admission.acquire(cost)
+        except BaseException:
+            coro.close()
+            raise
+        if waited > 0.001:
+            logger.info("Request admitted after queueing", extra={"queued_s": round(waited, 4)})
+        try:
+            return await _cancel_on_disconnect(receive, coro)
+        finally:
+            await self.admission.release(cost)
+
+    # Coordinator stages
+
+    async def _refinement(self, payload, receive, send):
+        user_input = _require(payload, "input")
+        stage = arun_stage1_refinement(user_input, fast_path=bool(payload.get("fast_path")))
+        await _send_json(send, 200, await self._admitted(DEFAULT_OUTPUT_TOKENS, receive, _collect(stage)))
+
+    async def _classification(self, payload, receive, send):
+        stage = arun_stage2_classification(_require(payload, "refined_input"))
+        await _send_json(send, 200, await self._admitted(DEFAULT_OUTPUT_TOKENS, receive, _collect(stage)))
+
+    async def _soft_guesses(self, payload, receive, send):
+        stage = arun_stage3_soft_guesses(_require(payload, "refined_input"), _classification(payload))
+        await _send_json(send, 200, await self._admitted(DEFAULT_OUTPUT_TOKENS, receive, _collect(stage)))
+
+    # Specialist
+
+    def _specialist_stage(self, payload: dict, structured: bool = False):
+        classification = _classification(payload)
+        concise = payload.get("concise")
+        concise = bool(concise) if concise is not None else None
+        stage = arun_stage4_specialist(
+            _require(payload, "refined_input"),
+            classification,
+            _guesses(payload),
+            structured=structured,
+            validate=bool(payload.get("validate")),
+            concise=concise,
+        )
+        return stage, expected_output_tokens(classification, concise)
+
+    async def _specialist(self, payload, receive, send):
+        stage, cost = self._specialist_stage(payload)
+
+        async def run():
+            response = {"result": None, "metrics": None, "quality_warnings": []}
+            async for event_type, data in stage:
+                if event_type == "done":
+                    response["result"] = data
+                elif event_type == "metrics":
+                    response["metrics"] = data
+                elif event_type == "quality_warning":
+                    response["quality_warnings"].append(data)
+            return response
+
+        await _send_json(send, 200, await self._admitted(cost, receive, run()))
+
+    async def _specialist_stream(self, payload, receive, send):
+        stage, cost = self._specialist_stage(payload, structured=bool(payload.get("structured")))
+
+        async def run():
+            await send({"type": "http.response.start", "status": 200, "headers": _SSE_HEADERS})
+            try:
+                async for event_type, data in stage:
+                    await send({"type": "http.response.body", "body": _sse(event_type, data), "more_body": True})
+            except OSError:
+                raise ClientDisconnected()
+            except (asyncio.CancelledError, ClientDisconnected):
+                raise
+            except Exception as e:
+                # Headers are already sent: report the failure in-band
+                logger.exception("Specialist stream failed")
+                message = str(e) if isinstance(e, DeadlineExceeded) else "Internal server error"
+                await send({"type": "http.response.body", "body": _sse("error", message), "more_body": True})
+            finally:
+                await stage.aclose()  # Closes the upstream LLM stream if we stopped early
+            await send({"type": "http.response.body", "body": b""})
+
+        await self._admitted(cost, receive, run())
+
+
+def admission_from_env() -> Admission:
+    """Build the Admission described by the PM_AGENTS_SERVER_* environment variables."""
+    max_tokens = os.getenv("PM_AGENTS_SERVER_MAX_STREAM_TOKENS")
+    return Admission(
+        max_requests=int(os.getenv("PM_AGENTS_SERVER_MAX_REQUESTS", DEFAULT_MAX_REQUESTS)),
+        max_tokens=int(max_tokens) if max_tokens else None,
+        queue_timeout=float(os.getenv("PM_AGENTS_SERVER_QUEUE_TIMEOUT", DEFAULT_QUEUE_TIMEOUT)),
+    )
+
+
+def create_app(admission: Admission = None) -> PMAgentsApp:
+    """Return a new ASGI application (see PMAgentsApp)."""
+    return PMAgentsApp(admission)
+
+
+app = create_app()
@@ -0,0 +1,101 @@
+"""
+Helpers for consuming streamed specialist output.
+
+Specialist answers run to 4,000-8,000 tokens, so building them with
+`text += token` and re-reading the whole string per token adds up.
+StreamAccumulator keeps tokens in a list and joins lazily, making
+accumulation linear in output size. FrameThrottle batches tokens into
+render frames so a UI re-renders the growing answer a bounded number of
+times per second instead of once per token.
+"""
+
+import time
+
+DEFAULT_FPS = 15
+
+
+class StreamAccumulator:
+    """
+    Linear-time accumulator for streamed tokens.
+
+    append() is O(1). The text property joins pending tokens once and caches
+    the result, so repeated snapshots between appends are free and the final
+    snapshot costs one pass over the output.
+    """
+
+    def __init__(self):
+        self._parts = []
+        self._text = ""
+        self._length = 0
+        self.token_count = 0
+
+    def append(self, token: str):
+        """Add a streamed token."""
+        if token:
+            self._parts.append(token)
+            self._length += len(token)
+            self.token_count += 1
+
+    @property
+    def text(self) -> str:
+        """The accumulated text so far."""
+        if self._parts:
+            self._text = self._text + "".join(self._parts)
+            self._parts = []
+        return self._text
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __str__(self) -> str:
+        return self.text
+
+
+class FrameThrottle:
+    """
+    Decide when a streaming view should re-render.
+
+    A frame is due when the frame interval (1 / fps) has elapsed, when
+    max_tokens tokens are pending, or when a token starts a new markdown
+    section (so headings appear promptly).
+
+    Usage:
+        throttle = FrameThrottle(fps=15)
+        for token in stream:
+            acc.append(token)
+            if throttle.should_render(token):
+                placeholder.markdown(acc.text + "▌")
+        placeholder.markdown(acc.text)  # final frame
+    """
+
+    def __init__(self, fps: float = DEFAULT_FPS, max_tokens: int = None, clock=time.monotonic):
+        """
+        Args:
+            fps: Maximum render frames per second (<= 0 renders every token)
+            max_tokens: Also render after this many pending tokens (None = no limit)
+            clock: Monotonic time source (injectable for tests/benchmarks)
+        """
+        self.interval = 1.0 / fps if fps and fps > 0 else 0.0
+        self.max_tokens = max_tokens
+        self._clock = clock
+        self._last_render = None
+        self._pending = 0
+        self.frames = 0
+
+    def should_render(self, token: str) -> bool:
+        """Record a token and return True if a frame should be rendered now."""
+        self._pending += 1
+        now = self._clock()
+
+        due = (
+            self._last_render is None
+            or now - self._last_render >= self.interval
+            or (self.max_tokens and self._pending >= self.max_tokens)
+            or token.startswith("#")
+            or "\n#" in token
+        )
+        if due:
+            self._last_render = now
+            self._pending = 0
+            self.frames += 1
+        return bool(due)
@@ -0,0 +1,225 @@
+"""
+Shared, pooled HTTP transport for the Anthropic clients.
+
+By default every ChatAnthropic instance gets its own httpx pool with the SDK's
+default limits, so the streaming and non-streaming clients never reuse each
+other's keep-alive connections and there is no way to size the pool or set
+connect/read timeouts separately. Here both clients are built on one
+process-wide httpx.Client (and one httpx.AsyncClient) configured from the
+environment, so high-concurrency deployments reuse warm TLS connections
+instead of re-handshaking.
+
+Environment variables (all optional):
+    PM_AGENTS_HTTP_CONNECT_TIMEOUT   seconds to establish a connection (default 5)
+    PM_AGENTS_HTTP_READ_TIMEOUT      seconds between received bytes (default 120;
+                                     long enough for gaps in a streamed answer)
+    PM_AGENTS_HTTP_WRITE_TIMEOUT     seconds to send the request (default 30)
+    PM_AGENTS_HTTP_POOL_TIMEOUT      seconds to wait for a free connection (default 30)
+    PM_AGENTS_HTTP_MAX_CONNECTIONS   pool size (default 100)
+    PM_AGENTS_HTTP_MAX_KEEPALIVE     idle connections kept open (default 20)
+    PM_AGENTS_HTTP_KEEPALIVE_EXPIRY  seconds an idle connection is kept (default 30)
+    PM_AGENTS_HTTP2                  "1" to multiplex requests over HTTP/2
+                                     (needs the h2 package: pip install httpx[http2])
+
+ANTHROPIC_BASE_URL and ANTHROPIC_PROXY apply to the shared pool as they do to
+ChatAnthropic's own clients.
+
+The async client's pool belongs to the event loop that first uses it; an
+asyncio server runs on one loop, which is the case this is for.
+"""
+
+import os
+import threading
+from functools import cached_property, lru_cache
+
+from .logs import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_CONNECT_TIMEOUT = 5.0
+DEFAULT_READ_TIMEOUT = 120.0
+DEFAULT_WRITE_TIMEOUT = 30.0
+DEFAULT_POOL_TIMEOUT = 30.0
+DEFAULT_MAX_CONNECTIONS = 100
+DEFAULT_MAX_KEEPALIVE = 20
+DEFAULT_KEEPALIVE_EXPIRY = 30.0
+
+_http_client = None
+_async_http_client = None
+_lock = threading.Lock()
+
+
+def transport_settings() -> dict:
+    """
+    Read the transport configuration from the environment.
+
+    Returns:
+        Dict with connect_timeout, read_timeout, write_timeout, pool_timeout,
+        max_connections, max_keepalive, keepalive_expiry and http2
+    """
+    return {
+        "connect_timeout": float(os.getenv("PM_AGENTS_HTTP_CONNECT_TIMEOUT", DEFAULT_CONNECT_TIMEOUT)),
+        "read_timeout": float(os.getenv("PM_AGENTS_HTTP_READ_TIMEOUT", DEFAULT_READ_TIMEOUT)),
+        "write_timeout": float(os.getenv("PM_AGENTS_HTTP_WRITE_TIMEOUT", DEFAULT_WRITE_TIMEOUT)),
+        "pool_timeout": float(os.getenv("PM_AGENTS_HTTP_POOL_TIMEOUT", DEFAULT_POOL_TIMEOUT)),
+        "max_connections": int(os.getenv("PM_AGENTS_HTTP_MAX_CONNECTIONS", DEFAULT_MAX_CONNECTIONS)),
+        "max_keepalive": int(os.getenv("PM_AGENTS_HTTP_MAX_KEEPALIVE", DEFAULT_MAX_KEEPALIVE)),
+        "keepalive_expiry": float(os.getenv("PM_AGENTS_HTTP_KEEPALIVE_EXPIRY", DEFAULT_KEEPALIVE_EXPIRY)),
+        "http2": os.getenv("PM_AGENTS_HTTP2", "") in ("1", "true", "yes"),
+    }
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _client_kwargs(settings: dict) -> dict:
+    """Translate settings into httpx client arguments."""
+    import httpx
+
+    http2 = settings["http2"]
+    if http2 and not _http2_available():
+        logger.warning("PM_AGENTS_HTTP2 is set but the h2 package is not installed; using HTTP/1.1")
+        http2 = False
+
+    kwargs = {
+        "base_url": os.getenv("ANTHROPIC_BASE_URL") or "https://api.anthropic.com",
+        "timeout": build_timeout(settings),
+        "limits": httpx.Limits(
+            max_connections=settings["max_connections"],
+            max_keepalive_connections=settings["max_keepalive"],
+            keepalive_expiry=settings["keepalive_expiry"],
+        ),
+        "http2": http2,
+    }
+    proxy = os.getenv("ANTHROPIC_PROXY")
+    if proxy:
+        kwargs["proxy"] = proxy  # The same proxy ChatAnthropic reads by default
+    return kwargs
+
+
+def build_timeout(settings: dict = None):
+    """Return an httpx.Timeout with separate connect/read/write/pool limits."""
+    import httpx
+
+    settings = settings or transport_settings()
+    return httpx.Timeout(
+        connect=settings["connect_timeout"],
+        read=settings["read_timeout"],
+        write=settings["write_timeout"],
+        pool=settings["pool_timeout"],
+    )
+
+
+def get_http_client():
+    """Return the process-wide pooled httpx.Client, building it on first use."""
+    global _http_client
+    if _http_client is None:
+        with _lock:
+            if _http_client is None:
+                import anthropic
+
+                # The SDK's client subclass keeps its TCP keep-alive socket options
+                _http_client = anthropic.DefaultHttpxClient(**_client_kwargs(transport_settings()))
+    return _http_client
+
+
+def get_async_http_client():
+    """Return the process-wide pooled httpx.AsyncClient, building it on first use."""
+    global _async_http_client
+    if _async_http_client is None:
+        with _lock:
+            if _async_http_client is None:
+                import anthropic
+
+                _async_http_client = anthropic.DefaultAsyncHttpxClient(**_client_kwargs(transport_settings()))
+    return _async_http_client
+
+
+def _sdk_client_params(chat) -> dict:
+    """Build anthropic.Client arguments from a ChatAnthropic's public fields."""
+    timeout = chat.default_request_timeout
+    return {
+        "api_key": chat.anthropic_api_key.get_secret_value(),
+        "base_url": chat.anthropic_api_url,
+        "max_retries": chat.max_retries,
+        "default_headers": chat.default_headers or None,
+        "timeout": timeout if timeout is not None and timeout > 0 else build_timeout(),
+    }
+
+
+def _uses_shared_proxy(chat) -> bool:
+    """True if the shared pool routes through the proxy this model asks for."""
+    return (chat.anthropic_proxy or None) == (os.getenv("ANTHROPIC_PROXY") or None)
+
+
+@lru_cache(maxsize=None)
+def _pooled_chat_class():
+    """Define the ChatAnthropic subclass on first use (keeps langchain_anthropic lazy)."""
+    import anthropic
+    from langchain_anthropic import ChatAnthropic
+
+    class PooledChatAnthropic(ChatAnthropic):
+        """ChatAnthropic whose SDK clients send requests over the shared pooled transport."""
+
+        @cached_property
+        def _client(self) -> anthropic.Client:
+            if not _uses_shared_proxy(self):
+                return super()._client
+            return anthropic.Client(**_sdk_client_params(self), http_client=get_http_client())
+
+        @cached_property
+        def _async_client(self) -> anthropic.AsyncClient:
+            if not _uses_shared_proxy(self):
+                return super()._async_client
+            return anthropic.AsyncClient(**_sdk_client_params(self), http_client=get_async_http_client())
+
+    return PooledChatAnthropic
+
+
+def build_chat_anthropic(**kwargs):
+    """
+    Construct a ChatAnthropic on the shared pooled transport.
+
+    ChatAnthropic has no http_client argument, so this returns a subclass
+    whose SDK clients are built from the model's public fields (api key,
+    base URL, retries, headers, timeout) on the shared httpx pool. An explicit
+    timeout on the model (timeout=...) still takes precedence. A model with
+    its own anthropic_proxy, different from ANTHROPIC_PROXY, keeps
+    langchain_anthropic's per-proxy client instead.
+
+    Args:
+        **kwargs: ChatAnthropic arguments (model, max_tokens, streaming, ...)
+
+    Returns:
+        A ChatAnthropic instance
+    """
+    return _pooled_chat_class()(**kwargs)
+
+
+def close_http_clients():
+    """Close the shared sync client and forget both (the next use rebuilds them)."""
+    global _http_client, _async_http_client
+    with _lock:
+        if _http_client is not None:
+            _http_client.close()
+        # The async client is closed by its own event loop; just drop it here
+        _http_client = None
+        _async_http_client = None
+
+
+async def aclose_http_clients():
+    """Close both shared clients from inside the event loop that used them."""
+    global _http_client, _async_http_client
+    with _lock:
+        sync_client, async_client = _http_client, _async_http_client
+        _http_client = None
+        _async_http_client = None
+    if sync_client is not None:
+        sync_client.close()
+    if async_client is not None:
+        await async_client.aclose()
@@ -0,0 +1,236 @@
+"""
+Output-quality checks for specialist answers.
+
+validate_agent_output() in workflow.py checks a finished answer. The
+StreamingValidator here runs the same checks on the token stream as it
+arrives, so a violation (e.g. vague language) is reported the moment it is
+generated and the caller can stop paying for the rest of the answer.
+
+All patterns are matched in one pass with an Aho-Corasick automaton whose
+state carries over between tokens, so matches spanning token boundaries are
+found and the work per token is proportional to the token's length,
+independent of how much output came before or how many patterns there are.
+"""
+
+from collections import deque
+
+# Sections every specialist answer must contain (case-sensitive)
+REQUIRED_SECTIONS = (
+    "Questions for Your Next Stakeholder Meeting",
+    "Must Validate",
+)
+
+# Vague recommendation language (case-insensitive)
+VAGUE_PHRASES = (
+    "proceed with caution",
+    "it depends",
+    "may or may not",
+    "consider carefully",
+    "could be viable",
+)
+
+SOFT_GUESS_MARKER = "⚠️"
+
+
+# --------------------
+# MULTI-PATTERN MATCHER
+# --------------------
+
+class AhoCorasick:
+    """
+    Aho-Corasick automaton for streaming multi-pattern search.
+
+    The goto/failure functions are resolved into one transition table, so
+    each input character costs a single dict lookup.
+
+    Example:
+        matcher = AhoCorasick(["it depends", "proceed"])
+        state = 0
+        state, matches = matcher.scan("it dep", state)
+        state, matches = matcher.scan("ends", state)  # [(3, 0)]: "it depends" ends at index 3
+    """
+
+    def __init__(self, patterns):
+        self.patterns = list(patterns)
+
+        goto = [{}]
+        outputs = [[]]
+        for pattern_id, pattern in enumerate(self.patterns):
+            state = 0
+            for ch in pattern:
+                next_state = goto[state].get(ch)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][ch] = next_state
+                    goto.append({})
+                    outputs.append([])
+                state = next_state
+            outputs[state].append(pattern_id)
+
+        # Breadth-first: a state's failure target is shallower, so its
+        # transitions and outputs are complete before they are inherited
+        alphabet = {ch for pattern in self.patterns for ch in pattern}
+        fail = [0] * len(goto)
+        delta = [dict() for _ in goto]
+        queue = deque()
+        for ch, child in goto[0].items():
+            delta[0][ch] = child
+            queue.append(child)
+        while queue:
+            state = queue.popleft()
+            outputs[state] = outputs[state] + outputs[fail[state]]
+            for ch in alphabet:
+                child = goto[state].get(ch)
+                if child is not None:
+                    fail[child] = delta[fail[state]].get(ch, 0)
+                    delta[state][ch] = child
+                    queue.append(child)
+                else:
+                    target = delta[fail[state]].get(ch, 0)
+                    if target:
+                        delta[state][ch] = target
+
+        self._delta = delta
+        self._outputs = [tuple(ids) if ids else None for ids in outputs]
+
+    def scan(self, text: str, state: int = 0) -> tuple:
+        """
+        Advance the automaton over text.
+
+        Args:
+            text: Next piece of input
+            state: State returned by the previous scan (0 to start)
+
+        Returns:
+            (state, matches) where matches is a list of (end_index_in_text, pattern_id)
+        """
+        delta = self._delta
+        outputs = self._outputs
+        matches = []
+        for index, ch in enumerate(text):
+            state = delta[state].get(ch, 0)
+            found = outputs[state]
+            if found is not None:
+                for pattern_id in found:
+                    matches.append((index, pattern_id))
+        return state, matches
+
+
+# --------------------
+# STREAMING VALIDATOR
+# --------------------
+
+_VAGUE = "vague"
+_SECTION = "section"
+_MARKER = "marker"
+
+
+class StreamingValidator:
+    """
+    Incremental version of validate_agent_output().
+
+    feed() returns ("quality_warning", {...}) events as violations appear;
+    finish() reports the end-of-answer checks (missing sections, soft guesses
+    without a "Must Validate" section).
+
+    Attributes:
+        violations: Warning payloads reported so far
+        soft_guess_count: ⚠️ markers seen so far
+    """
+
+    def __init__(self, vague_phrases=VAGUE_PHRASES, required_sections=REQUIRED_SECTIONS):
+        self._kinds = []
+        patterns = []
+        for phrase in vague_phrases:
+            self._kinds.append((_VAGUE, phrase.lower()))
+            patterns.append(phrase.lower())
+        for section in required_sections:
+            self._kinds.append((_SECTION, section))
+            patterns.append(section.lower())
+        self._kinds.append((_MARKER, SOFT_GUESS_MARKER))
+        patterns.append(SOFT_GUESS_MARKER)
+
+        # The automaton runs on lower-cased text; case-sensitive patterns are
+        # confirmed against the original text, which needs at most the last
+        # (longest pattern) characters
+        self._matcher = AhoCorasick(patterns)
+        self._state = 0
+        self._tail = ""
+        self._tail_length = max(len(p) for p in patterns)
+        self._position = 0
+        self._required_sections = tuple(required_sections)
+        self._vague_phrases = tuple(phrase.lower() for phrase in vague_phrases)
+
+        self.sections_seen = set()
+        self.vague_found = []
+        self.soft_guess_count = 0
+        self.violations = []
+
+    def feed(self, token: str) -> list:
+        """
+        Consume one streamed token.
+
+        Returns:
+            ("quality_warning", dict) events for violations completed by this token
+        """
+        events = []
+        lowered = token.lower()
+        if len(lowered) == len(token):
+            self._consume(lowered, token, events)
+        else:
+            # Rare: lower-casing changed the length; keep indexes aligned per character
+            for ch in token:
+                self._consume(ch.lower(), ch, events)
+        return events
+
+    def _consume(self, lowered: str, original: str, events: list):
+        self._state, matches = self._matcher.scan(lowered, self._state)
+        for end, pattern_id in matches:
+            end = min(end, len(original) - 1)
+            kind, pattern = self._kinds[pattern_id]
+            if kind == _VAGUE:
+                if pattern not in self.vague_found:
+                    self.vague_found.append(pattern)
+                    self._warn(events, "vague_language", phrase=pattern, position=self._position + end)
+            elif (self._tail + original[:end + 1]).endswith(pattern):
+                if kind == _SECTION:
+                    self.sections_seen.add(pattern)
+                else:
+                    self.soft_guess_count += 1
+        self._tail = (self._tail + original)[-self._tail_length:]
+        self._position += len(original)
+
+    def _warn(self, events: list, check: str, **details):
+        warning = {"check": check, **details}
+        self.violations.append(warning)
+        events.append(("quality_warning", warning))
+
+    def finish(self) -> list:
+        """
+        Run the end-of-answer checks.
+
+        Returns:
+            ("quality_warning", dict) events for missing sections and
+            soft guesses without a "Must Validate" section
+        """
+        events = []
+        missing = [s for s in self._required_sections if s not in self.sections_seen]
+        if missing:
+            self._warn(events, "missing_sections", sections=missing)
+        if self.soft_guess_count > 0 and "Must Validate" not in self.sections_seen:
+            self._warn(events, "unvalidated_soft_guesses", count=self.soft_guess_count)
+        return events
+
+    @property
+    def issues(self) -> list:
+        """Human-readable issues, worded like validate_agent_output()'s warnings."""
+        issues = []
+        for warning in self.violations:
+            if warning["check"] == "missing_sections":
+                issues.append(f"Missing required sections: {warning['sections']}")
+            elif warning["check"] == "unvalidated_soft_guesses":
+                issues.append(f"Found {warning['count']} soft guesses but no 'Must Validate' section")
+        if self.vague_found:
+            found = [phrase for phrase in self._vague_phrases if phrase in self.vague_found]
+            issues.append(f"Used vague language: {found}")
+        return issues
@@ -12,42 +12,88 @@ Currently supports 5 specialist agents:
 Future expansion planned to ~10 agents (Lens + Workflow types).
 """
 
-from dotenv import load_dotenv
-load_dotenv()
-
-from langgraph.graph import StateGraph, END
-from langchain_anthropic import ChatAnthropic
-
+import asyncio
+import contextvars
+import queue
+import threading
+from functools import partial
+from collections import OrderedDict
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+
+from .llm import get_llm, get_streaming_llm
+from .logs import get_logger
+from .abort import QualityAbortPolicy
+from .budget import concise_instruction, concise_mode_default, get_output_budget
+from .cancellation import tokens_saved
+from .metrics import StageTimer
+from .section_parser import SectionParser
+from .validation import REQUIRED_SECTIONS, SOFT_GUESS_MARKER, VAGUE_PHRASES, StreamingValidator
 from .state import State
+from .streaming import StreamAccumulator
 from .coordinator import (
     run_coordinator,
     run_refinement,
     extract_soft_guesses,
+    arun_coordinator,
+    arun_refinement,
+    aextract_soft_guesses,
+    run_combined,
+    arun_combined,
     PROMPT as COORDINATOR_PROMPT,
 )
 from .agents import (
     # Prioritization
     run_prioritization,
     stream_prioritization,
+    astream_prioritization,
     # Problem Space (new)
     run_problem_space,
     stream_problem_space,
+    astream_problem_space,
     # Context Mapping (new)
     run_context_mapping,
     stream_context_mapping,
+    astream_context_mapping,
     # Constraints (new)
     run_constraints,
     stream_constraints,
+    astream_constraints,
     # Solution Validation (new)
     run_solution_validation,
     stream_solution_validation,
+    astream_solution_validation,
 )
 
-# Initialize LLMs
-# max_tokens=8192 ensures complete output for complex multi-section responses
-# (agents can produce 4,000-7,000 tokens; default 1024 causes truncation)
-llm = ChatAnthropic(model="claude-sonnet-4-20250514", max_tokens=8192)
-llm_streaming = ChatAnthropic(model="claude-sonnet-4-20250514", streaming=True, max_tokens=8192)
+# LLM clients are built lazily on first use (see llm.py); `llm` and
+# `llm_streaming` remain readable as module attributes via __getattr__ below.
+
+
+def __getattr__(name):
+    """Lazily resolve the legacy module-level `llm` / `llm_streaming` clients."""
+    if name == "llm":
+        return get_llm()
+    if name == "llm_streaming":
+        return get_streaming_llm()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# Map classification to stream function (sync and async variants)
+STREAM_FUNCTIONS = {
+    "prioritization": stream_prioritization,
+    "problem_space": stream_problem_space,
+    "context_mapping": stream_context_mapping,
+    "constraints": stream_constraints,
+    "solution_validation": stream_solution_validation,
+}
+
+logger = get_logger(__name__)
+
+ASYNC_STREAM_FUNCTIONS = {
+    "prioritization": astream_prioritization,
+    "problem_space": astream_problem_space,
+    "context_mapping": astream_context_mapping,
+    "constraints": astream_constraints,
+    "solution_validation": astream_solution_validation,
+}
 
 
 # --------------------
@@ -59,6 +105,7 @@ def validate_agent_output(output: str) -> bool:
     Check that agent output meets minimum quality requirements.
 
     Logs warnings but does not block - this is for monitoring output quality.
+    For checks while the answer streams, see validation.StreamingValidator.
 
     Returns:
         True if output passes all checks, False if any issues found.
@@ -66,53 +113,49 @@ def validate_agent_output(output: str) -> bool:
     issues = []
 
     # Check for required sections
-    required_sections = [
-        "Questions for Your Next Stakeholder Meeting",
-        "Must Validate",
-    ]
-
-    missing = [section for section in required_sections if section not in output]
+    missing = [section for section in REQUIRED_SECTIONS if section not in output]
     if missing:
         issues.append(f"Missing required sections: {missing}")
 
     # Check for vague language
-    vague_phrases = [
-        "proceed with caution",
-        "it depends",
-        "may or may not",
-        "consider carefully",
-        "could be viable",
-    ]
-
     output_lower = output.lower()
-    found_vague = [phrase for phrase in vague_phrases if phrase in output_lower]
+    found_vague = [phrase for phrase in VAGUE_PHRASES if phrase in output_lower]
     if found_vague:
         issues.append(f"Used vague language: {found_vague}")
 
     # Check for soft guesses without validation questions
-    soft_guess_count = output.count("⚠️")
+    soft_guess_count = output.count(SOFT_GUESS_MARKER)
     if soft_guess_count > 0 and "Must Validate" not in output:
         issues.append(f"Found {soft_guess_count} soft guesses but no 'Must Validate' section")
 
     # Log warnings
     if issues:
-        print("\n" + "!"*50)
-        print("OUTPUT QUALITY WARNINGS:")
         for issue in issues:
-            print(f"  ⚠️ {issue}")
-        print("!"*50 + "\n")
+            logger.warning("Output quality: %s", issue)
         return False
 
     return True
 
 
+def _log_quality_issues(validator: StreamingValidator) -> bool:
+    """Log a streaming validator's issues the way validate_agent_output does."""
+    for issue in validator.issues:
+        logger.warning("Output quality: %s", issue)
+    return not validator.issues
+
+
 # --------------------
 # GRAPH NODES
 # --------------------
 
-def coordinator_node(state: State) -> State:
+def _node_llm(override):
+    """Return the injected LLM for a graph node, or the module default."""
+    return override if override is not None else get_llm()
+
+
+def coordinator_node(state: State, llm=None) -> State:
     """Classify the problem and explain why."""
-    classification, reasoning, alternatives = run_coordinator(state["user_input"], llm)
+    classification, reasoning, alternatives = run_coordinator(state["user_input"], _node_llm(llm))
     return {
         **state,
         "classification": classification,
@@ -121,40 +164,40 @@ def coordinator_node(state: State) -> State:
     }
 
 
-def prioritization_agent_node(state: State) -> State:
+def prioritization_agent_node(state: State, llm=None) -> State:
     """Help user with prioritization using structured frameworks."""
-    output = run_prioritization(state["user_input"], llm)
+    output = run_prioritization(state["user_input"], _node_llm(llm))
     return {**state, "agent_output": output}
 
 
-def problem_space_agent_node(state: State) -> State:
+def problem_space_agent_node(state: State, llm=None) -> State:
     """Help user validate if a problem exists and matters."""
-    output = run_problem_space(state["user_input"], llm)
+    output = run_problem_space(state["user_input"], _node_llm(llm))
     return {**state, "agent_output": output}
 
 
-def context_mapping_agent_node(state: State) -> State:
+def context_mapping_agent_node(state: State, llm=None) -> State:
     """Help user map unfamiliar domains and stakeholders."""
-    output = run_context_mapping(state["user_input"], llm)
+    output = run_context_mapping(state["user_input"], _node_llm(llm))
     return {**state, "agent_output": output}
 
 
-def constraints_agent_node(state: State) -> State:
+def constraints_agent_node(state: State, llm=None) -> State:
     """Help user surface hidden limitations and blockers."""
-    output = run_constraints(state["user_input"], llm)
+    output = run_constraints(state["user_input"], _node_llm(llm))
     return {**state, "agent_output": output}
 
 
-def solution_validation_agent_node(state: State) -> State:
+def solution_validation_agent_node(state: State, llm=None) -> State:
     """Help user validate a solution against 4 risks."""
-    output = run_solution_validation(state["user_input"], llm)
+    output = run_solution_validation(state["user_input"], _node_llm(llm))
     return {**state, "agent_output": output}
 
 
 def route_to_specialist(state: State) -> str:
     """Route to the appropriate specialist based on classification."""
     classification = state["classification"]
-    print(f"\n--> Routing to: {classification}_agent")
+    logger.info("Routing to specialist", extra={"agent": classification})
     return classification + "_agent"
 
 
@@ -162,17 +205,26 @@ def route_to_specialist(state: State) -> str:
 # BUILD GRAPH
 # --------------------
 
-def build_graph():
-    """Build the LangGraph workflow."""
+def build_graph(llm=None):
+    """
+    Build and compile the LangGraph workflow.
+
+    Args:
+        llm: Optional LLM to inject into every node (defaults to the module LLM).
+            Lets tests and benchmarks compile a graph against a different client.
+    """
+    # Imported here so the staged workflow never pays for LangGraph's import
+    from langgraph.graph import StateGraph, END
+
     graph = StateGraph(State)
 
     # Add nodes
-    graph.add_node("coordinator", coordinator_node)
-    graph.add_node("prioritization_agent", prioritization_agent_node)
-    graph.add_node("problem_space_agent", problem_space_agent_node)
-    graph.add_node("context_mapping_agent", context_mapping_agent_node)
-    graph.add_node("constraints_agent", constraints_agent_node)
-    graph.add_node("solution_validation_agent", solution_validation_agent_node)
+    graph.add_node("coordinator", partial(coordinator_node, llm=llm))
+    graph.add_node("prioritization_agent", partial(prioritization_agent_node, llm=llm))
+    graph.add_node("problem_space_agent", partial(problem_space_agent_node, llm=llm))
+    graph.add_node("context_mapping_agent", partial(context_mapping_agent_node, llm=llm))
+    graph.add_node("constraints_agent", partial(constraints_agent_node, llm=llm))
+    graph.add_node("solution_validation_agent", partial(solution_validation_agent_node, llm=llm))
 
     # Set entry point
     graph.set_entry_point("coordinator")
@@ -200,18 +252,66 @@ def build_graph():
     return graph.compile()
 
 
+# Compiled graphs are immutable, so one instance is shared across calls and
+# threads. The default graph is kept for the process lifetime; graphs for
+# injected LLMs are kept in a small LRU keyed by the LLM's identity, with the
+# LLM stored alongside so its id cannot be reused while cached. The bound
+# keeps callers that build a new LLM per request from growing the cache.
+MAX_INJECTED_GRAPHS = 8
+
+_default_graph = None
+_compiled_graphs = OrderedDict()  # id(llm) -> (llm, compiled graph)
+_graph_lock = threading.Lock()
+
+
+def get_graph(llm=None):
+    """
+    Return the compiled workflow graph, compiling it only on first use.
+
+    Args:
+        llm: Optional LLM to inject (see build_graph). The graphs of the
+            MAX_INJECTED_GRAPHS most recently used LLM instances are memoized.
+    """
+    global _default_graph
+    with _graph_lock:
+        if llm is None:
+            if _default_graph is None:
+                _default_graph = build_graph()
+            return _default_graph
+
+        key = id(llm)
+        entry = _compiled_graphs.get(key)
+        if entry is None or entry[0] is not llm:
+            entry = (llm, build_graph(llm))
+            _compiled_graphs[key] = entry
+            while len(_compiled_graphs) > MAX_INJECTED_GRAPHS:
+                _compiled_graphs.popitem(last=False)
+        _compiled_graphs.move_to_end(key)
+        return entry[1]
+
+
+def invalidate_graph_cache():
+    """
+    Drop all memoized graphs so the next get_graph() recompiles.
+
+    Call this after changing the node set or routing (e.g. registering a new
+    specialist agent).
+    """
+    global _default_graph
+    with _graph_lock:
+        _default_graph = None
+        _compiled_graphs.clear()
+
+
 # --------------------
 # RUN FUNCTIONS
 # --------------------
 
 def run(user_input: str) -> State:
     """Run the PM brainstorming system with a user input."""
-    print("\n" + "#"*60)
-    print("PM BRAINSTORMING SYSTEM")
-    print("#"*60)
-    print(f"\nUser input: {user_input}")
+    logger.info("Run started: %s...", user_input[:100], extra={"stage": "run"})
 
-    workflow = build_graph()
+    workflow = get_graph()
 
     initial_state = {
         "user_input": user_input,
@@ -249,42 +349,244 @@ def run_streaming(user_input: str):
     - ("token", str)
     - ("done", full_output_str)
     """
-    print("\n" + "#"*60)
-    print("PM BRAINSTORMING SYSTEM (STREAMING)")
-    print("#"*60)
-    print(f"\nUser input: {user_input}")
+    logger.info("Streaming run started: %s...", user_input[:100], extra={"stage": "run_streaming"})
 
     # Run coordinator
-    classification, reasoning, alternatives = run_coordinator(user_input, llm)
+    classification, reasoning, alternatives = run_coordinator(user_input, get_llm())
     yield ("coordinator", {"classification": classification, "reasoning": reasoning, "alternatives": alternatives})
 
     # Stream specialist agent based on classification
-    full_output = ""
-
-    # Map classification to stream function
-    stream_functions = {
-        "prioritization": stream_prioritization,
-        "problem_space": stream_problem_space,
-        "context_mapping": stream_context_mapping,
-        "constraints": stream_constraints,
-        "solution_validation": stream_solution_validation,
-    }
+    full_output = StreamAccumulator()
 
     # Get the appropriate stream function (default to problem_space)
-    stream_fn = stream_functions.get(classification, stream_problem_space)
+    stream_fn = STREAM_FUNCTIONS.get(classification, stream_problem_space)
 
-    for token in stream_fn(user_input, llm_streaming):
-        full_output += token
+    for token in stream_fn(user_input, get_streaming_llm()):
+        full_output.append(token)
         yield ("token", token)
 
     # Validate output quality (logs warnings but doesn't block)
-    validate_agent_output(full_output)
+    validate_agent_output(full_output.text)
 
-    print("\n" + "="*50)
-    print("STREAMING COMPLETE")
-    print("="*50)
+    logger.info("Streaming run complete", extra={"stage": "run_streaming", "chars": len(full_output)})
+
+    yield ("done", full_output.text)
+
+
+# --------------------
+# SPECULATIVE PRE-EXECUTION
+# --------------------
+# While the user reviews the refined statement at checkpoint 1, classification
+# and soft-guess extraction for the *unedited* statement can already run in the
+# background. Speculations are keyed by the exact statement text, so an edited
+# statement simply misses and Stages 2/3 fall back to live calls.
+#
+# The fast path (one combined coordinator call) registers its precomputed
+# Stage 2/3 results through the same mechanism.
+#
+# Background calls report their token usage to a _SpeculativeUsage. The stage
+# that looks the speculation up claims it into its own metrics; usage of a
+# speculation nobody consumed is exported as a "speculation" record when it is
+# discarded, so per-stage token accounting stays complete.
+
+MAX_SPECULATIONS = 64  # Oldest speculations are dropped beyond this
+
+_speculation_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="pm-speculation")
+_speculations = OrderedDict()  # refined_statement -> {"classification": Future, "soft_guesses": Future, "usage": {...}}
+_speculation_lock = threading.Lock()
+
+
+class _SpeculativeUsage:
+    """Token usage of one speculative call, until a stage claims or discards it."""
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        self._usage = []
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def __call__(self, usage: dict):
+        # on_usage callback of the background call
+        with self._lock:
+            if not self._closed:
+                self._usage.append(usage)
+                return
+        self._export([usage])  # Arrived after the speculation was claimed or discarded
+
+    def _take(self) -> list:
+        with self._lock:
+            usage, self._usage, self._closed = self._usage, [], True
+        return usage
+
+    def claim(self, timer: StageTimer):
+        """Add the usage to the timer of the stage that consumed the speculation."""
+        for usage in self._take():
+            timer.add_usage(usage)
+
+    def discard(self):
+        """Export unclaimed usage as a "speculation" metrics record."""
+        self._export(self._take())
+
+    def _export(self, usages: list):
+        if not usages:
+            return
+        timer = StageTimer("speculation")
+        for usage in usages:
+            timer.add_usage(usage)
+        timer.finish(discarded=True, speculated_stage=self.stage)
+
+
+def _speculative_soft_guesses(refined_statement: str, classification_future, on_usage) -> dict:
+    """Extract soft guesses once the speculative classification is known."""
+    classification = classification_future.result()[0]
+    guesses = extract_soft_guesses(refined_statement, classification, get_llm(), on_usage=on_usage)
+    return {"classification": classification, "guesses": guesses}
+
+
+def _close_speculation(entry: dict):
+    """Cancel a dropped speculation's futures and export its unclaimed usage."""
+    for key in ("classification", "soft_guesses"):
+        entry[key].cancel()
+    for usage in entry.get("usage", {}).values():
+        usage.discard()
+
+
+def start_speculation(refined_statement: str):
+    """
+    Start background classification and soft-guess extraction for a statement.
+
+    Safe to call repeatedly; an existing speculation for the same text is reused.
+
+    Args:
+        refined_statement: The refined statement shown to the user at checkpoint 1
+    """
+    if not refined_statement:
+        return
+
+    with _speculation_lock:
+        if refined_statement in _speculations:
+            _speculations.move_to_end(refined_statement)
+            return
+
+        usage = {
+            "classification": _SpeculativeUsage("classification"),
+            "soft_guesses": _SpeculativeUsage("soft_guesses"),
+        }
+        # Run in a copy of the caller's context so log fields (session id) carry over
+        classification_future = _speculation_executor.submit(
+            contextvars.copy_context().run,
+            partial(run_coordinator, on_usage=usage["classification"]), refined_statement, get_llm(),
+        )
+        guesses_future = _speculation_executor.submit(
+            contextvars.copy_context().run,
+            _speculative_soft_guesses, refined_statement, classification_future, usage["soft_guesses"],
+        )
+        _speculations[refined_statement] = {
+            "classification": classification_future,
+            "soft_guesses": guesses_future,
+            "usage": usage,
+        }
+
+        stale = []
+        while len(_speculations) > MAX_SPECULATIONS:
+            stale.append(_speculations.popitem(last=False)[1])
+
+    for entry in stale:
+        _close_speculation(entry)
 
-    yield ("done", full_output)
+    logger.info("Speculation started: %s...", refined_statement[:100], extra={"stage": "speculation"})
+
+
+def _register_precomputed(result: dict):
+    """Register fast-path Stage 2/3 results as already-completed speculations."""
+    refined_statement = result["refined_statement"]
+    if not refined_statement:
+        return
+
+    classification_future = Future()
+    classification_future.set_result(
+        (result["classification"], result["reasoning"], result["alternatives"])
+    )
+    guesses_future = Future()
+    guesses_future.set_result(
+        {"classification": result["classification"], "guesses": result["assumptions"]}
+    )
+
+    with _speculation_lock:
+        _speculations[refined_statement] = {
+            "classification": classification_future,
+            "soft_guesses": guesses_future,
+        }
+        _speculations.move_to_end(refined_statement)
+        stale = []
+        while len(_speculations) > MAX_SPECULATIONS:
+            stale.append(_speculations.popitem(last=False)[1])
+
+    for entry in stale:
+        _close_speculation(entry)
+
+
+def _refinement_view(result: dict) -> dict:
+    """Reduce a combined fast-path result to the Stage 1 refinement payload."""
+    return {
+        "refined_statement": result["refined_statement"],
+        "improvements": result["improvements"],
+        "soft_guesses": result["soft_guesses"],
+    }
+
+
+def discard_speculation(refined_statement: str):
+    """
+    Invalidate the speculation for a statement (e.g. after the user edits it).
+
+    Args:
+        refined_statement: The statement the speculation was started for
+    """
+    with _speculation_lock:
+        entry = _speculations.pop(refined_statement, None)
+
+    if entry:
+        _close_speculation(entry)
+        logger.info("Speculation discarded: %s...", refined_statement[:100], extra={"stage": "speculation"})
+
+
+def _get_speculation(refined_statement: str, key: str):
+    """Return the speculative future for a statement, or None."""
+    with _speculation_lock:
+        entry = _speculations.get(refined_statement)
+        return entry[key] if entry else None
+
+
+def _claim_speculative_usage(refined_statement: str, key: str, timer: StageTimer):
+    """Count a looked-up speculation's background usage in the stage's metrics."""
+    with _speculation_lock:
+        entry = _speculations.get(refined_statement)
+        usage = entry.get("usage", {}).get(key) if entry else None
+    if usage is not None:
+        usage.claim(timer)
+
+
+def _speculation_result(future):
+    """Return a finished speculative result, or None if it was cancelled or failed."""
+    try:
+        return future.result()
+    except (CancelledError, Exception) as e:
+        logger.warning("Speculation failed, falling back to live call: %r", e, extra={"stage": "speculation"})
+        return None
+
+
+async def _aspeculation_result(future):
+    """Async version of _speculation_result that waits without blocking the loop."""
+    await asyncio.wait([asyncio.wrap_future(future)])
+    return _speculation_result(future)
+
+
+def _speculative_guesses_for(refined_statement: str, classification: str, result) -> list:
+    """Consume a speculative soft-guess result, returning guesses if it still applies."""
+    discard_speculation(refined_statement)
+    if result and result["classification"] == classification:
+        return result["guesses"]
+    return None
 
 
 # --------------------
@@ -293,25 +595,98 @@ def run_streaming(user_input: str):
 # These functions support the human-in-the-loop checkpoint flow.
 # Each stage is a generator that yields results for the UI to display.
 
-def run_stage1_refinement(user_input: str):
+def build_specialist_context(refined_input: str, confirmed_guesses: list = None) -> str:
+    """
+    Build the specialist input from the refined problem and confirmed guesses.
+
+    Args:
+        refined_input: The refined problem statement
+        confirmed_guesses: List of user-confirmed assumptions to inject
+
+    Returns:
+        The context string passed to the specialist agent
+    """
+    if not confirmed_guesses:
+        return refined_input
+
+    guesses_text = "\n".join([
+        f"- {g['topic']}: {g['assumption']} (Confirmed)"
+        for g in confirmed_guesses
+    ])
+    return f"""{refined_input}
+
+## Confirmed Assumptions
+The following have been validated with the user:
+{guesses_text}"""
+
+
+def _budgeted_context(agent: str, context: str, concise: bool = None) -> tuple:
+    """
+    Apply the agent's output budget to a specialist run.
+
+    Returns:
+        (context, max_tokens, concise) - in concise mode the context asks
+        for a shorter answer
+    """
+    if concise is None:
+        concise = concise_mode_default()
+    max_tokens = get_output_budget().limit(agent, concise)
+    if concise:
+        context = f"{context}\n\n{concise_instruction(max_tokens)}"
+    return context, max_tokens, concise
+
+
+def _cancelled_metrics(timer: StageTimer, agent: str, reason: str, **extra) -> dict:
+    """Finish the timer of a cancelled specialist run, estimating the output tokens it saved."""
+    produced = timer.usage["output_tokens"] or timer.chunks
+    saved = tokens_saved(agent, produced, extra.get("concise"))
+    logger.info(
+        "Stage 4 cancelled: %s", reason,
+        extra={"stage": timer.stage, "agent": agent, "tokens_saved": saved},
+    )
+    return timer.finish(cancelled=True, cancel_reason=reason, tokens_saved=saved, **extra)
+
+
+def run_stage1_refinement(user_input: str, speculative: bool = False, fast_path: bool = False):
     """
     Stage 1: Refine the problem statement.
 
     Makes vague inputs more specific and surfaces initial assumptions.
 
+    Args:
+        user_input: The user's original problem statement
+        speculative: If True, start Stage 2/3 in the background for the
+            unedited refined statement while the user reviews it
+        fast_path: If True, refine, classify and extract soft guesses in one
+            combined call; Stages 2/3 are then served from that result as
+            long as the refined statement is not edited
+
     Yields:
         ("refinement", {
             "refined_statement": str,
             "improvements": list[str],
             "soft_guesses": list[str]
         })
+        ("metrics", dict) - stage timing and token usage (see metrics.py)
     """
-    print("\n" + "#"*60)
-    print("STAGE 1: REFINEMENT")
-    print("#"*60)
-
-    result = run_refinement(user_input, llm)
+    logger.info("Stage 1 started", extra={"stage": "refinement"})
+
+    timer = StageTimer("refinement")
+
+    if fast_path:
+        combined = run_combined(user_input, get_llm(), on_usage=timer.add_usage)
+        _register_precomputed(combined)
+        metrics = timer.finish(fast_path=True)
+        yield ("refinement", _refinement_view(combined))
+        yield ("metrics", metrics)
+        return
+
+    result = run_refinement(user_input, get_llm(), on_usage=timer.add_usage)
+    if speculative:
+        start_speculation(result["refined_statement"])
+    metrics = timer.finish()
     yield ("refinement", result)
+    yield ("metrics", metrics)
 
 
 def run_stage2_classification(refined_input: str):
@@ -326,17 +701,29 @@ def run_stage2_classification(refined_input: str):
             "reasoning": str,
             "alternatives": list[str]
         })
+        ("metrics", dict) - stage timing and token usage
     """
-    print("\n" + "#"*60)
-    print("STAGE 2: CLASSIFICATION")
-    print("#"*60)
-
-    classification, reasoning, alternatives = run_coordinator(refined_input, llm)
+    logger.info("Stage 2 started", extra={"stage": "classification"})
+
+    timer = StageTimer("classification")
+    future = _get_speculation(refined_input, "classification")
+    speculated = _speculation_result(future) if future else None
+    if future:
+        _claim_speculative_usage(refined_input, "classification", timer)
+    if speculated:
+        logger.info("Using speculative classification", extra={"stage": "classification"})
+        classification, reasoning, alternatives = speculated
+    else:
+        classification, reasoning, alternatives = run_coordinator(
+            refined_input, get_llm(), on_usage=timer.add_usage
+        )
+    metrics = timer.finish(speculative=bool(speculated))
     yield ("classification", {
         "classification": classification,
         "reasoning": reasoning,
         "alternatives": alternatives
     })
+    yield ("metrics", metrics)
 
 
 def run_stage3_soft_guesses(refined_input: str, classification: str):
@@ -352,16 +739,81 @@ def run_stage3_soft_guesses(refined_input: str, classification: str):
             "confidence": str,
             "reason": str
         }])
+        ("metrics", dict) - stage timing and token usage
     """
-    print("\n" + "#"*60)
-    print("STAGE 3: SOFT GUESSES")
-    print("#"*60)
-
-    guesses = extract_soft_guesses(refined_input, classification, llm)
+    logger.info("Stage 3 started", extra={"stage": "soft_guesses"})
+
+    timer = StageTimer("soft_guesses")
+    guesses = None
+    future = _get_speculation(refined_input, "soft_guesses")
+    if future:
+        result = _speculation_result(future)
+        _claim_speculative_usage(refined_input, "soft_guesses", timer)
+        guesses = _speculative_guesses_for(refined_input, classification, result)
+    speculative = guesses is not None
+    if speculative:
+        logger.info("Using speculative soft guesses", extra={"stage": "soft_guesses"})
+    else:
+        guesses = extract_soft_guesses(refined_input, classification, get_llm(), on_usage=timer.add_usage)
+    metrics = timer.finish(speculative=speculative)
     yield ("soft_guesses", guesses)
+    yield ("metrics", metrics)
+
 
+class _SpecialistChecks:
+    """
+    Per-attempt consumers of a specialist stream: output accumulation, the
+    optional section parser, streaming validator and abort policy.
+    """
 
-def run_stage4_specialist(refined_input: str, classification: str, confirmed_guesses: list = None):
+    def __init__(self, structured: bool, validate: bool, policy=None):
+        self.output = StreamAccumulator()
+        self.parser = SectionParser() if structured else None
+        needs_validation = validate or (policy is not None and policy.needs_validation)
+        self.validator = StreamingValidator() if needs_validation else None
+        self.policy = policy
+        if policy is not None:
+            policy.reset()
+        self.abort_reason = None
+
+    def feed(self, token: str) -> list:
+        """Consume a token; return its events and set abort_reason if the policy fires."""
+        self.output.append(token)
+        events = []
+        if self.parser is not None:
+            events += self.parser.feed(token)
+        if self.validator is not None:
+            events += self.validator.feed(token)
+        if self.policy is not None:
+            self.abort_reason = self.policy.on_token(token, self.output, events)
+        return events
+
+    def close(self) -> list:
+        """Flush the parser and run end-of-answer quality checks (skipped if aborted)."""
+        events = self.parser.close() if self.parser is not None else []
+        if self.abort_reason is not None:
+            return events
+        if self.validator is not None:
+            events += self.validator.finish()
+            _log_quality_issues(self.validator)
+        else:
+            # Validate output quality
+            validate_agent_output(self.output.text)
+        return events
+
+
+def run_stage4_specialist(
+    refined_input: str,
+    classification: str,
+    confirmed_guesses: list = None,
+    structured: bool = False,
+    validate: bool = False,
+    abort_on_violation: bool = False,
+    abort_policy=None,
+    max_retries: int = 0,
+    concise: bool = None,
+    cancel_token=None,
+):
     """
     Stage 4: Run specialist agent with streaming.
 
@@ -371,51 +823,545 @@ def run_stage4_specialist(refined_input: str, classification: str, confirmed_gue
         refined_input: The refined problem statement
         classification: Which specialist to use
         confirmed_guesses: List of user-confirmed assumptions to inject
+        structured: If True, also parse the stream incrementally and yield
+            section events as each line completes (see section_parser.py)
+        validate: If True, run the output-quality checks on the stream and
+            yield violations as they occur instead of checking at the end
+        abort_on_violation: If True (implies validate), stop generating at
+            the first quality violation (shorthand for QualityAbortPolicy())
+        abort_policy: AbortPolicy that can stop the stream mid-flight (see abort.py)
+        max_retries: Regenerations allowed after an abort, each with the
+            policy's corrective note appended to the context
+        concise: Ask for a shorter answer with half the token budget
+            (default: PM_AGENTS_CONCISE; see budget.py)
+        cancel_token: Optional CancelToken; cancelling it stops generation at
+            the next chunk (see cancellation.py). Closing the generator early
+            stops it too.
 
     Yields:
         ("token", str) - streaming tokens
-        ("done", str) - full output when complete
+        ("section_started" | "soft_guess" | "question" | "table_row", dict) -
+            structured events, only if structured=True
+        ("quality_warning", dict) - quality violations, only if validate=True
+        ("aborted", str) - reason generation was stopped early
+        ("retry", {"attempt": int, "reason": str}) - regeneration started;
+            tokens that follow replace the aborted output
+        ("done", str) - full output when complete (partial if aborted)
+        ("cancelled", str) - partial output, instead of "done", if cancel_token was cancelled
+        ("metrics", dict) - wall time, time-to-first-token, tokens/sec, token usage
+            (with cancelled and tokens_saved if cancelled)
     """
-    print("\n" + "#"*60)
-    print("STAGE 4: SPECIALIST")
-    print("#"*60)
+    logger.info("Stage 4 started", extra={"stage": "specialist", "agent": classification})
 
-    # Build context with confirmed guesses
-    context = refined_input
-    if confirmed_guesses:
-        guesses_text = "\n".join([
-            f"- {g['topic']}: {g['assumption']} (Confirmed)"
-            for g in confirmed_guesses
-        ])
-        context = f"""{refined_input}
+    context, max_tokens, concise = _budgeted_context(
+        classification, build_specialist_context(refined_input, confirmed_guesses), concise
+    )
 
-## Confirmed Assumptions
-The following have been validated with the user:
-{guesses_text}"""
+    logger.debug("Context with guesses:\n%s...", context[:200], extra={"stage": "specialist"})
+
+    stream_fn = STREAM_FUNCTIONS.get(classification, stream_problem_space)
+
+    timer = StageTimer("specialist", agent=classification)
+    policy = abort_policy or (QualityAbortPolicy() if abort_on_violation else None)
+    attempt_context = context
+
+    try:
+        for attempt in range(max_retries + 1):
+            checks = _SpecialistChecks(structured, validate, policy)
+            stream = stream_fn(
+                attempt_context, get_streaming_llm(), on_usage=timer.add_usage, max_tokens=max_tokens,
+                cancel_token=cancel_token,
+            )
+            try:
+                for token in stream:
+                    timer.on_token()
+                    yield ("token", token)
+                    yield from checks.feed(token)
+                    if checks.abort_reason is not None:
+                        break
+            finally:
+                stream.close()  # Closes the upstream HTTP stream if we stopped early
+
+            if cancel_token is not None and cancel_token.cancelled:
+                break
+            yield from checks.close()
+            if checks.abort_reason is None:
+                break
+            logger.warning(
+                "Stage 4 aborted: %s", checks.abort_reason,
+                extra={"stage": "specialist", "agent": classification, "attempt": attempt},
+            )
+            yield ("aborted", checks.abort_reason)
+            if attempt < max_retries:
+                attempt_context = f"{context}\n\n{policy.correction(checks.abort_reason)}"
+                yield ("retry", {"attempt": attempt + 1, "reason": checks.abort_reason})
+    except GeneratorExit:
+        # The consumer stopped iterating; the upstream stream is already closed
+        _cancelled_metrics(timer, classification, "closed", max_tokens=max_tokens, concise=concise)
+        raise
+
+    if cancel_token is not None and cancel_token.cancelled:
+        metrics = _cancelled_metrics(
+            timer, classification, cancel_token.reason, attempts=attempt + 1, max_tokens=max_tokens, concise=concise
+        )
+        yield ("cancelled", checks.output.text)
+        yield ("metrics", metrics)
+        return
+
+    full_output = checks.output
+    metrics = timer.finish(
+        aborted=checks.abort_reason is not None, attempts=attempt + 1, max_tokens=max_tokens, concise=concise
+    )
+    logger.info(
+        "Stage 4 complete",
+        extra={"stage": "specialist", "agent": classification, "chars": len(full_output)},
+    )
 
-    print(f"Context with guesses:\n{context[:200]}...")
+    yield ("done", full_output.text)
+    yield ("metrics", metrics)
 
-    # Map classification to stream function
-    stream_functions = {
-        "prioritization": stream_prioritization,
-        "problem_space": stream_problem_space,
-        "context_mapping": stream_context_mapping,
-        "constraints": stream_constraints,
-        "solution_validation": stream_solution_validation,
-    }
 
-    stream_fn = stream_functions.get(classification, stream_problem_space)
+# --------------------
+# PARALLEL SPECIALIST FAN-OUT
+# --------------------
+# Runs the primary specialist and its top classification alternatives at the
+# same time, each on its own event channel, instead of "run, read, go back,
+# rerun another agent". Callers cancel losers by adding the agent name to the
+# `cancelled` set they pass in; the agent stops at its next token and its
+# upstream stream is closed.
 
-    full_output = ""
-    for token in stream_fn(context, llm_streaming):
-        full_output += token
-        yield ("token", token)
+def select_fanout_agents(classification: str, alternatives: list = None, top_n: int = 2) -> list:
+    """
+    Pick the specialists to run in parallel.
 
-    # Validate output quality
-    validate_agent_output(full_output)
+    Args:
+        classification: The primary classification
+        alternatives: Ranked alternatives from the coordinator
+        top_n: How many alternatives to run alongside the primary
 
-    print("\n" + "="*50)
-    print("SPECIALIST STREAMING COMPLETE")
-    print("="*50)
+    Returns:
+        List of classification names, primary first, without duplicates
+    """
+    agents = [classification]
+    for alt in alternatives or []:
+        if len(agents) > top_n:
+            break
+        if alt in STREAM_FUNCTIONS and alt not in agents:
+            agents.append(alt)
+    return agents
+
+
+def _fanout_worker(
+    agent: str, context: str, events: queue.Queue, cancelled: set, concise: bool = None, cancel_token=None
+):
+    """Stream one specialist into the shared event queue until done or cancelled."""
+    timer = StageTimer("specialist_fanout", agent=agent)
+    context, max_tokens, concise = _budgeted_context(agent, context, concise)
+    stream_fn = STREAM_FUNCTIONS.get(agent, stream_problem_space)
+    stream = stream_fn(context, get_streaming_llm(), on_usage=timer.add_usage, max_tokens=max_tokens)
+    full_output = StreamAccumulator()
+    try:
+        for token in stream:
+            if agent in cancelled or (cancel_token is not None and cancel_token.cancelled):
+                stream.close()  # Settles usage before the metrics record is built
+                reason = cancel_token.reason if cancel_token is not None and cancel_token.cancelled else "superseded"
+                metrics = _cancelled_metrics(timer, agent, reason, max_tokens=max_tokens, concise=concise)
+                events.put(("cancelled", agent, full_output.text))
+                events.put(("metrics", agent, metrics))
+                return
+            timer.on_token()
+            full_output.append(token)
+            events.put(("token", agent, token))
+        validate_agent_output(full_output.text)
+        events.put(("done", agent, full_output.text))
+        events.put(("metrics", agent, timer.finish(max_tokens=max_tokens, concise=concise)))
+    except Exception as e:
+        events.put(("error", agent, repr(e)))
+    finally:
+        stream.close()  # Closes the upstream HTTP stream if we stopped early
+        events.put(None)  # Worker finished
+
+
+def run_stage4_fanout(
+    refined_input: str,
+    classification: str,
+    alternatives: list = None,
+    confirmed_guesses: list = None,
+    top_n: int = 2,
+    cancelled: set = None,
+    concise: bool = None,
+    cancel_token=None,
+):
+    """
+    Stage 4 (fan-out): Stream the primary and top-N alternative specialists concurrently.
+
+    Args:
+        refined_input: The refined problem statement
+        classification: The primary specialist
+        alternatives: Ranked alternative classifications
+        confirmed_guesses: List of user-confirmed assumptions to inject
+        top_n: Number of alternatives to run alongside the primary
+        cancelled: Set of agent names to stop early; callers may add to it
+            while iterating
+        concise: Ask every agent for a shorter answer (default: PM_AGENTS_CONCISE)
+        cancel_token: Optional CancelToken stopping every agent at its next token
+
+    Yields:
+        ("agents", None, list[str]) - the specialists being run, primary first
+        ("token", agent, str) - streaming tokens per agent
+        ("done", agent, str) - full output of an agent that finished
+        ("cancelled", agent, str) - partial output of an agent stopped early
+        ("error", agent, str) - an agent that failed
+        ("metrics", agent, dict) - per-agent timing and token usage
+    """
+    logger.info("Stage 4 fan-out started", extra={"stage": "specialist_fanout", "agent": classification})
+
+    if cancelled is None:
+        cancelled = set()
+
+    agents = select_fanout_agents(classification, alternatives, top_n)
+    context = build_specialist_context(refined_input, confirmed_guesses)
+    logger.info("Running specialists in parallel: %s", agents, extra={"stage": "specialist_fanout"})
+
+    yield ("agents", None, agents)
+
+    events = queue.Queue()
+    workers = [
+        threading.Thread(
+            target=contextvars.copy_context().run,
+            args=(_fanout_worker, agent, context, events, cancelled, concise, cancel_token),
+            name=f"pm-fanout-{agent}",
+            daemon=True,
+        )
+        for agent in agents
+    ]
+    for worker in workers:
+        worker.start()
+
+    remaining = len(workers)
+    try:
+        while remaining:
+            event = events.get()
+            if event is None:
+                remaining -= 1
+                continue
+            yield event
+    finally:
+        # Consumer stopped iterating: stop every agent still streaming
+        cancelled.update(agents)
+
+    logger.info("Stage 4 fan-out complete", extra={"stage": "specialist_fanout"})
+
+
+# --------------------
+# ASYNC STAGED WORKFLOW FUNCTIONS
+# --------------------
+# Async generator counterparts of the staged functions above. They use
+# ainvoke/astream so a single event loop can serve many concurrent sessions
+# without dedicating a thread to each in-flight LLM call.
+
+async def arun_stage1_refinement(user_input: str, speculative: bool = False, fast_path: bool = False):
+    """
+    Async Stage 1: Refine the problem statement.
+
+    Args:
+        user_input: The user's original problem statement
+        speculative: If True, start Stage 2/3 in the background for the
+            unedited refined statement (see start_speculation)
+        fast_path: If True, use one combined call (see run_stage1_refinement)
+
+    Yields:
+        ("refinement", {
+            "refined_statement": str,
+            "improvements": list[str],
+            "soft_guesses": list[str]
+        })
+        ("metrics", dict) - stage timing and token usage (see metrics.py)
+    """
+    logger.info("Stage 1 started (async)", extra={"stage": "refinement"})
+
+    timer = StageTimer("refinement")
+
+    if fast_path:
+        combined = await arun_combined(user_input, get_llm(), on_usage=timer.add_usage)
+        _register_precomputed(combined)
+        metrics = timer.finish(fast_path=True)
+        yield ("refinement", _refinement_view(combined))
+        yield ("metrics", metrics)
+        return
+
+    result = await arun_refinement(user_input, get_llm(), on_usage=timer.add_usage)
+    if speculative:
+        start_speculation(result["refined_statement"])
+    metrics = timer.finish()
+    yield ("refinement", result)
+    yield ("metrics", metrics)
+
+
+async def arun_stage2_classification(refined_input: str):
+    """
+    Async Stage 2: Classify the problem.
+
+    Yields:
+        ("classification", {
+            "classification": str,
+            "reasoning": str,
+            "alternatives": list[str]
+        })
+        ("metrics", dict) - stage timing and token usage
+    """
+    logger.info("Stage 2 started (async)", extra={"stage": "classification"})
+
+    timer = StageTimer("classification")
+    future = _get_speculation(refined_input, "classification")
+    speculated = await _aspeculation_result(future) if future else None
+    if future:
+        _claim_speculative_usage(refined_input, "classification", timer)
+    if speculated:
+        logger.info("Using speculative classification", extra={"stage": "classification"})
+        classification, reasoning, alternatives = speculated
+    else:
+        classification, reasoning, alternatives = await arun_coordinator(
+            refined_input, get_llm(), on_usage=timer.add_usage
+        )
+    metrics = timer.finish(speculative=bool(speculated))
+    yield ("classification", {
+        "classification": classification,
+        "reasoning": reasoning,
+        "alternatives": alternatives
+    })
+    yield ("metrics", metrics)
+
+
+async def arun_stage3_soft_guesses(refined_input: str, classification: str):
+    """
+    Async Stage 3: Extract soft guesses (assumptions).
+
+    Yields:
+        ("soft_guesses", list[{
+            "topic": str,
+            "assumption": str,
+            "confidence": str,
+            "reason": str
+        }])
+        ("metrics", dict) - stage timing and token usage
+    """
+    logger.info("Stage 3 started (async)", extra={"stage": "soft_guesses"})
+
+    timer = StageTimer("soft_guesses")
+    guesses = None
+    future = _get_speculation(refined_input, "soft_guesses")
+    if future:
+        result = await _aspeculation_result(future)
+        _claim_speculative_usage(refined_input, "soft_guesses", timer)
+        guesses = _speculative_guesses_for(refined_input, classification, result)
+    speculative = guesses is not None
+    if speculative:
+        logger.info("Using speculative soft guesses", extra={"stage": "soft_guesses"})
+    else:
+        guesses = await aextract_soft_guesses(refined_input, classification, get_llm(), on_usage=timer.add_usage)
+    metrics = timer.finish(speculative=speculative)
+    yield ("soft_guesses", guesses)
+    yield ("metrics", metrics)
+
+
+async def arun_stage4_specialist(
+    refined_input: str,
+    classification: str,
+    confirmed_guesses: list = None,
+    structured: bool = False,
+    validate: bool = False,
+    abort_on_violation: bool = False,
+    abort_policy=None,
+    max_retries: int = 0,
+    concise: bool = None,
+    cancel_token=None,
+):
+    """
+    Async Stage 4: Run specialist agent with streaming.
+
+    Args:
+        refined_input: The refined problem statement
+        classification: Which specialist to use
+        confirmed_guesses: List of user-confirmed assumptions to inject
+        structured: If True, also parse the stream incrementally and yield
+            section events as each line completes (see section_parser.py)
+        validate: If True, run the output-quality checks on the stream and
+            yield violations as they occur instead of checking at the end
+        abort_on_violation: If True (implies validate), stop generating at
+            the first quality violation (shorthand for QualityAbortPolicy())
+        abort_policy: AbortPolicy that can stop the stream mid-flight (see abort.py)
+        max_retries: Regenerations allowed after an abort, each with the
+            policy's corrective note appended to the context
+        concise: Ask for a shorter answer with half the token budget
+            (default: PM_AGENTS_CONCISE; see budget.py)
+        cancel_token: Optional CancelToken; cancelling it stops generation at
+            the next chunk (see cancellation.py). Closing the generator early
+            stops it too.
+
+    Yields:
+        ("token", str) - streaming tokens
+        ("section_started" | "soft_guess" | "question" | "table_row", dict) -
+            structured events, only if structured=True
+        ("quality_warning", dict) - quality violations, only if validate=True
+        ("aborted", str) - reason generation was stopped early
+        ("retry", {"attempt": int, "reason": str}) - regeneration started;
+            tokens that follow replace the aborted output
+        ("done", str) - full output when complete (partial if aborted)
+        ("cancelled", str) - partial output, instead of "done", if cancel_token was cancelled
+        ("metrics", dict) - wall time, time-to-first-token, tokens/sec, token usage
+            (with cancelled and tokens_saved if cancelled)
+    """
+    logger.info("Stage 4 started (async)", extra={"stage": "specialist", "agent": classification})
+
+    context, max_tokens, concise = _budgeted_context(
+        classification, build_specialist_context(refined_input, confirmed_guesses), concise
+    )
+
+    logger.debug("Context with guesses:\n%s...", context[:200], extra={"stage": "specialist"})
+
+    stream_fn = ASYNC_STREAM_FUNCTIONS.get(classification, astream_problem_space)
+
+    timer = StageTimer("specialist", agent=classification)
+    policy = abort_policy or (QualityAbortPolicy() if abort_on_violation else None)
+    attempt_context = context
+
+    try:
+        for attempt in range(max_retries + 1):
+            checks = _SpecialistChecks(structured, validate, policy)
+            stream = stream_fn(
+                attempt_context, get_streaming_llm(), on_usage=timer.add_usage, max_tokens=max_tokens,
+                cancel_token=cancel_token,
+            )
+            try:
+                async for token in stream:
+                    timer.on_token()
+                    yield ("token", token)
+                    for event in checks.feed(token):
+                        yield event
+                    if checks.abort_reason is not None:
+                        break
+            finally:
+                await stream.aclose()  # Closes the upstream HTTP stream if we stopped early
+
+            if cancel_token is not None and cancel_token.cancelled:
+                break
+            for event in checks.close():
+                yield event
+            if checks.abort_reason is None:
+                break
+            logger.warning(
+                "Stage 4 aborted: %s", checks.abort_reason,
+                extra={"stage": "specialist", "agent": classification, "attempt": attempt},
+            )
+            yield ("aborted", checks.abort_reason)
+            if attempt < max_retries:
+                attempt_context = f"{context}\n\n{policy.correction(checks.abort_reason)}"
+                yield ("retry", {"attempt": attempt + 1, "reason": checks.abort_reason})
+    except (GeneratorExit, asyncio.CancelledError):
+        # The consumer stopped iterating; the upstream stream is already closed
+        _cancelled_metrics(timer, classification, "closed", max_tokens=max_tokens, concise=concise)
+        raise
+
+    if cancel_token is not None and cancel_token.cancelled:
+        metrics = _cancelled_metrics(
+            timer, classification, cancel_token.reason, attempts=attempt + 1, max_tokens=max_tokens, concise=concise
+        )
+        yield ("cancelled", checks.output.text)
+        yield ("metrics", metrics)
+        return
+
+    full_output = checks.output
+    metrics = timer.finish(
+        aborted=checks.abort_reason is not None, attempts=attempt + 1, max_tokens=max_tokens, concise=concise
+    )
+    logger.info(
+        "Stage 4 complete",
+        extra={"stage": "specialist", "agent": classification, "chars": len(full_output)},
+    )
+
+    yield ("done", full_output.text)
+    yield ("metrics", metrics)
+
+
+async def _afanout_worker(
+    agent: str, context: str, events: asyncio.Queue, cancelled: set, concise: bool = None, cancel_token=None
+):
+    """Async version of _fanout_worker."""
+    timer = StageTimer("specialist_fanout", agent=agent)
+    context, max_tokens, concise = _budgeted_context(agent, context, concise)
+    stream_fn = ASYNC_STREAM_FUNCTIONS.get(agent, astream_problem_space)
+    stream = stream_fn(context, get_streaming_llm(), on_usage=timer.add_usage, max_tokens=max_tokens)
+    full_output = StreamAccumulator()
+    try:
+        async for token in stream:
+            if agent in cancelled or (cancel_token is not None and cancel_token.cancelled):
+                await stream.aclose()  # Settles usage before the metrics record is built
+                reason = cancel_token.reason if cancel_token is not None and cancel_token.cancelled else "superseded"
+                metrics = _cancelled_metrics(timer, agent, reason, max_tokens=max_tokens, concise=concise)
+                await events.put(("cancelled", agent, full_output.text))
+                await events.put(("metrics", agent, metrics))
+                return
+            timer.on_token()
+            full_output.append(token)
+            await events.put(("token", agent, token))
+        validate_agent_output(full_output.text)
+        await events.put(("done", agent, full_output.text))
+        await events.put(("metrics", agent, timer.finish(max_tokens=max_tokens, concise=concise)))
+    except asyncio.CancelledError:
+        await stream.aclose()
+        _cancelled_metrics(timer, agent, "closed", max_tokens=max_tokens, concise=concise)
+        raise
+    except Exception as e:
+        await events.put(("error", agent, repr(e)))
+    finally:
+        await stream.aclose()
+        events.put_nowait(None)
+
+
+async def arun_stage4_fanout(
+    refined_input: str,
+    classification: str,
+    alternatives: list = None,
+    confirmed_guesses: list = None,
+    top_n: int = 2,
+    cancelled: set = None,
+    concise: bool = None,
+    cancel_token=None,
+):
+    """
+    Async Stage 4 (fan-out). Same arguments and events as run_stage4_fanout.
+    """
+    logger.info("Stage 4 fan-out started (async)", extra={"stage": "specialist_fanout", "agent": classification})
+
+    if cancelled is None:
+        cancelled = set()
+
+    agents = select_fanout_agents(classification, alternatives, top_n)
+    context = build_specialist_context(refined_input, confirmed_guesses)
+    logger.info("Running specialists in parallel: %s", agents, extra={"stage": "specialist_fanout"})
+
+    yield ("agents", None, agents)
+
+    events = asyncio.Queue()
+    tasks = [
+        asyncio.ensure_future(_afanout_worker(agent, context, events, cancelled, concise, cancel_token))
+        for agent in agents
+    ]
 
-    yield ("done", full_output)
+    remaining = len(tasks)
+    try:
+        while remaining:
+            event = await events.get()
+            if event is None:
+                remaining -= 1
+                continue
+            yield event
+    finally:
+        cancelled.update(agents)
+        for task in tasks:
+            task.cancel()
+        # Wait for the workers to close their streams and settle their permits
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    logger.info("Stage 4 fan-out complete", extra={"stage": "specialist_fanout"})
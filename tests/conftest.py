@@ -0,0 +1,54 @@
+"""
+Shared fixtures: every test runs offline against SyntheticLLM, with the
+response cache, rate limiter, retries and adaptive output budgets off unless
+the test sets them.
+"""
+
+import pytest
+
+from pm_agents.budget import OutputBudget, set_output_budget
+from pm_agents.cache import set_response_cache
+from pm_agents.llm import reset_llms, set_llms
+from pm_agents.providers import SyntheticLLM
+from pm_agents.ratelimit import set_rate_limiter
+from pm_agents.resilience import ResiliencePolicy, set_resilience_policy
+
+_ENV = (
+    "PM_AGENTS_CACHE",
+    "PM_AGENTS_CLASSIFIER_LOG",
+    "PM_AGENTS_LOCAL_CLASSIFIER",
+    "PM_AGENTS_LOCAL_CLASSIFIER_THRESHOLD",
+    "PM_AGENTS_CONCISE",
+    "PM_AGENTS_METRICS_FILE",
+    "PM_AGENTS_RETRY_ATTEMPTS",
+    "PM_AGENTS_HEDGE",
+    "PM_AGENTS_DEADLINE",
+)
+
+
+@pytest.fixture(autouse=True)
+def offline(monkeypatch):
+    for name in _ENV:
+        monkeypatch.delenv(name, raising=False)
+    set_llms(SyntheticLLM(output_tokens=300), SyntheticLLM(output_tokens=300))
+    set_response_cache(None)
+    set_rate_limiter(None)
+    set_resilience_policy(ResiliencePolicy())
+    set_output_budget(OutputBudget(adaptive=False))
+    yield
+    reset_llms()
+    set_response_cache(None)
+    set_rate_limiter(None)
+    set_resilience_policy(None)
+    set_output_budget(None)
+
+
+@pytest.fixture
+def metrics_records():
+    """Metrics records exported while the test runs."""
+    from pm_agents.metrics import add_metrics_exporter, remove_metrics_exporter
+
+    records = []
+    add_metrics_exporter(records.append)
+    yield records
+    remove_metrics_exporter(records.append)
@@ -0,0 +1,127 @@
+import asyncio
+import logging
+
+import pytest
+
+from pm_agents.agents import (
+    PRIORITIZATION_PROMPT,
+    PROBLEM_SPACE_PROMPT,
+    constraints,
+    context_mapping,
+    prioritization,
+    problem_space,
+    solution_validation,
+)
+from pm_agents.agents.common import CACHE_CONTROL, build_messages, is_cacheable, summarize_usage
+from pm_agents.cancellation import CancelToken
+from pm_agents.providers import SyntheticLLM
+
+AGENT_MODULES = [constraints, context_mapping, prioritization, problem_space, solution_validation]
+
+
+class ClosingLLM:
+    """Streaming client that records the request and whether its stream was closed."""
+
+    def __init__(self):
+        self.llm = SyntheticLLM(output_tokens=300)
+        self.requests = []
+        self.closed = []
+
+    def invoke(self, messages, **kwargs):
+        self.requests.append((messages, kwargs))
+        return self.llm.invoke(messages, **kwargs)
+
+    def stream(self, messages, **kwargs):
+        self.requests.append((messages, kwargs))
+        try:
+            yield from self.llm.stream(messages, **kwargs)
+        finally:
+            self.closed.append(True)
+
+    async def astream(self, messages, **kwargs):
+        self.requests.append((messages, kwargs))
+        try:
+            async for chunk in self.llm.astream(messages, **kwargs):
+                yield chunk
+        finally:
+            self.closed.append(True)
+
+
+# --------------------
+# PROMPT CACHING
+# --------------------
+
+def test_long_prompts_are_cache_breakpoints():
+    system, user = build_messages(PROBLEM_SPACE_PROMPT, "Users churn")
+    (block,) = system["content"]
+    assert block == {"type": "text", "text": PROBLEM_SPACE_PROMPT, "cache_control": CACHE_CONTROL}
+    assert user == {"role": "user", "content": "Users churn"}
+
+
+def test_prompts_below_the_minimum_are_not_marked():
+    assert not is_cacheable(PRIORITIZATION_PROMPT)
+    (block,) = build_messages(PRIORITIZATION_PROMPT, "Which first?")[0]["content"]
+    assert "cache_control" not in block
+
+
+@pytest.mark.parametrize("metadata, expected", [
+    (None, {"input_tokens": 0, "output_tokens": 0, "cache_read_tokens": 0, "cache_write_tokens": 0}),
+    (
+        {"input_tokens": 1500, "output_tokens": 40, "input_token_details": {"cache_read": 1200, "cache_creation": 0}},
+        {"input_tokens": 1500, "output_tokens": 40, "cache_read_tokens": 1200, "cache_write_tokens": 0},
+    ),
+])
+def test_summarize_usage(metadata, expected):
+    assert summarize_usage(metadata) == expected
+
+
+# --------------------
+# AGENT CALLS
+# --------------------
+
+@pytest.mark.parametrize("agent", AGENT_MODULES, ids=lambda module: module.AGENT)
+def test_agents_send_their_prompt_and_budget(agent, caplog):
+    caplog.set_level(logging.INFO, logger="pm_agents")
+    llm, usage = ClosingLLM(), []
+    answer = agent.run_agent("Users churn", llm, on_usage=usage.append)
+    streamed = "".join(agent.stream_agent("Users churn", llm))
+
+    assert answer == streamed
+    for messages, kwargs in llm.requests:
+        assert messages == build_messages(agent.PROMPT, "Users churn")
+        assert kwargs["max_tokens"] == agent.TOKEN_BUDGET
+    assert usage[0]["output_tokens"] > 0
+    assert {(r.name, r.fields["agent"]) for r in caplog.records} == {(agent.__name__, agent.AGENT)}
+
+
+def test_closing_a_stream_closes_the_upstream_request():
+    llm, usage = ClosingLLM(), []
+    stream = constraints.stream_agent("Users churn", llm, on_usage=usage.append)
+    for _ in range(3):
+        next(stream)
+    stream.close()
+    assert llm.closed == [True]
+    assert usage == [{**summarize_usage(None), "output_tokens": 3, "cancelled": True}]
+
+
+def test_cancelled_token_stops_the_async_stream():
+    llm, usage, token = ClosingLLM(), [], CancelToken()
+
+    async def collect():
+        tokens = []
+        async for chunk in constraints.astream_agent("Users churn", llm, on_usage=usage.append, cancel_token=token):
+            tokens.append(chunk)
+            if len(tokens) == 2:
+                token.cancel()
+        return tokens
+
+    assert len(asyncio.run(collect())) == 2
+    assert llm.closed == [True]
+    assert usage[0]["cancelled"] is True
+
+
+def test_already_cancelled_token_skips_the_request():
+    llm, token = ClosingLLM(), CancelToken()
+    token.cancel()
+    assert list(constraints.stream_agent("Users churn", llm, cancel_token=token)) == []
+    assert llm.requests == []
@@ -0,0 +1,93 @@
+from pm_agents.agents import TOKEN_BUDGETS
+from pm_agents.budget import (
+    CONCISE_FACTOR,
+    EXPECTED_FRACTION,
+    HEADROOM,
+    MIN_LIMIT,
+    MIN_SAMPLES,
+    TRUNCATION_GROWTH,
+    OutputBudget,
+    set_output_budget,
+)
+from pm_agents.llm import MAX_TOKENS, set_llms
+from pm_agents.providers import SyntheticLLM
+from pm_agents.workflow import run_stage4_specialist
+
+
+# --------------------
+# OUTPUT BUDGET
+# --------------------
+
+def test_static_budget_until_enough_samples():
+    budget = OutputBudget()
+    for _ in range(MIN_SAMPLES - 1):
+        budget.observe("prioritization", 1500)
+    assert budget.limit("prioritization") == TOKEN_BUDGETS["prioritization"] == MAX_TOKENS
+    assert budget.expected("prioritization") == int(MAX_TOKENS * EXPECTED_FRACTION)
+
+    budget.observe("prioritization", 1500)
+    assert budget.limit("prioritization") == int(1500 * HEADROOM)
+    assert budget.expected("prioritization") == 1500
+
+
+def test_limit_is_p95_with_headroom_and_clamped():
+    budget = OutputBudget(min_samples=1)
+    for tokens in range(1000, 3000, 100):
+        budget.observe("constraints", tokens)
+    assert budget.limit("constraints") == int(2900 * HEADROOM)
+
+    budget.observe("problem_space", 10)
+    assert budget.limit("problem_space") == MIN_LIMIT
+    budget.observe("context_mapping", MAX_TOKENS * 2)
+    assert budget.limit("context_mapping") == MAX_TOKENS
+
+
+def test_truncated_runs_grow_the_limit():
+    budget = OutputBudget(min_samples=1)
+    budget.observe("constraints", 2000, limit=2000)
+    assert budget.expected("constraints") == int(2000 * TRUNCATION_GROWTH)
+
+
+def test_concise_mode_is_separate():
+    budget = OutputBudget(min_samples=1)
+    assert budget.limit("constraints", concise=True) == int(MAX_TOKENS * CONCISE_FACTOR)
+    budget.observe("constraints", 3000)
+    assert budget.limit("constraints", concise=True) == int(MAX_TOKENS * CONCISE_FACTOR)
+    budget.observe("constraints", 1200, concise=True)
+    assert budget.limit("constraints", concise=True) == int(1200 * HEADROOM)
+
+
+def test_observe_record_ignores_partial_runs():
+    budget = OutputBudget(min_samples=1)
+    base = {"stage": "specialist", "agent": "constraints", "output_tokens": 2000, "max_tokens": MAX_TOKENS}
+    budget({**base, "cancelled": True})
+    budget({**base, "aborted": True})
+    budget({**base, "stage": "classification"})
+    assert budget.snapshot()["constraints"]["samples"] == 0
+    budget(base)
+    assert budget.snapshot()["constraints"]["samples"] == 1
+
+
+def test_non_adaptive_uses_static_budgets():
+    budget = OutputBudget(adaptive=False, min_samples=1)
+    budget.observe("constraints", 1000)
+    assert budget.limit("constraints") == TOKEN_BUDGETS["constraints"]
+
+
+# --------------------
+# SPECIALIST RUNS
+# --------------------
+
+def test_specialist_runs_use_the_adaptive_limit():
+    set_llms(llm_streaming=SyntheticLLM(output_tokens=4500))
+    budget = OutputBudget(min_samples=1)
+    budget.observe("constraints", 800)
+    set_output_budget(budget)
+    limit = budget.limit("constraints")
+
+    metrics = list(run_stage4_specialist("Users churn after onboarding", "constraints"))[-1][1]
+    assert metrics["max_tokens"] == limit < MAX_TOKENS
+    assert metrics["output_tokens"] == limit  # The answer was cut at the limit
+    # The finished run is observed, and a truncated run grows the next limit
+    assert budget.snapshot()["constraints"]["samples"] == 2
+    assert budget.limit("constraints") > limit
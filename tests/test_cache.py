@@ -0,0 +1,106 @@
+import pytest
+
+from pm_agents import cache as cache_module
+from pm_agents.cache import (
+    InMemoryCache,
+    SQLiteCache,
+    cache_from_env,
+    make_cache_key,
+    set_response_cache,
+)
+from pm_agents.coordinator import run_refinement
+from pm_agents.llm import get_llm
+
+MESSAGES = [{"role": "system", "content": "Refine"}, {"role": "user", "content": "Users churn"}]
+
+
+class FakeTime:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeTime()
+    monkeypatch.setattr(cache_module, "time", fake)
+    return fake
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_cache(request, tmp_path):
+    def make(**kwargs):
+        if request.param == "memory":
+            return InMemoryCache(**kwargs)
+        return SQLiteCache(str(tmp_path / "cache.sqlite3"), **kwargs)
+
+    return make
+
+
+def test_cache_key_is_content_addressed():
+    key = make_cache_key(MESSAGES, model="m", max_tokens=100, temperature=None)
+    assert key == make_cache_key([dict(m) for m in MESSAGES], model="m", max_tokens=100, temperature=None)
+    assert key != make_cache_key(MESSAGES, model="m", max_tokens=200, temperature=None)
+    assert key != make_cache_key(MESSAGES[:1], model="m", max_tokens=100, temperature=None)
+
+
+def test_hit_and_miss(make_cache):
+    cache = make_cache()
+    assert cache.get("k") is None
+    cache.set("k", "answer")
+    assert cache.get("k") == "answer"
+    assert cache.stats() == {"hits": 1, "misses": 1, "hit_rate": 0.5, "size": 1}
+    cache.clear()
+    assert cache.get("k") is None
+
+
+def test_entries_expire(make_cache, clock):
+    cache = make_cache(ttl_seconds=60)
+    cache.set("k", "answer")
+    clock.now += 59
+    assert cache.get("k") == "answer"
+    clock.now += 2
+    assert cache.get("k") is None
+
+
+def test_least_recently_used_is_evicted(make_cache, clock):
+    cache = make_cache(max_entries=2)
+    cache.set("a", "1")
+    clock.now += 1
+    cache.set("b", "2")
+    clock.now += 1
+    assert cache.get("a") == "1"  # "b" is now the least recently used
+    clock.now += 1
+    cache.set("c", "3")
+    assert [cache.get(k) for k in ("a", "b", "c")] == ["1", None, "3"]
+
+
+def test_sqlite_cache_is_shared_across_instances(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    SQLiteCache(path).set("k", "answer")
+    assert SQLiteCache(path).get("k") == "answer"
+
+
+def test_cache_is_off_by_default(monkeypatch, tmp_path):
+    assert cache_from_env() is None
+    monkeypatch.setenv("PM_AGENTS_CACHE", "memory")
+    assert isinstance(cache_from_env(), InMemoryCache)
+    monkeypatch.setenv("PM_AGENTS_CACHE", "sqlite")
+    monkeypatch.setenv("PM_AGENTS_CACHE_PATH", str(tmp_path / "cache.sqlite3"))
+    assert isinstance(cache_from_env(), SQLiteCache)
+    monkeypatch.setenv("PM_AGENTS_CACHE", "off")
+    assert cache_from_env() is None
+
+
+def test_coordinator_calls_are_served_from_the_cache():
+    set_response_cache(InMemoryCache())
+    llm = get_llm()
+    usage = []
+    first = run_refinement("Users churn after onboarding", llm, on_usage=usage.append)
+    second = run_refinement("Users churn after onboarding", llm, on_usage=usage.append)
+    assert first == second
+    assert llm.calls == 1
+    assert usage[1]["response_cache_hit"] is True
+    assert usage[1]["output_tokens"] == 0
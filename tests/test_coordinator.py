@@ -0,0 +1,131 @@
+import asyncio
+
+from langchain_core.messages import AIMessage
+
+from benchmarks.parsers import GOLDEN, check_equivalence, synthetic_corpus
+from pm_agents.cache import InMemoryCache, set_response_cache
+from pm_agents.coordinator import (
+    VALID_CLASSIFICATIONS,
+    arun_combined,
+    arun_coordinator,
+    parse_combined_response,
+    parse_response,
+    run_combined,
+    run_coordinator,
+)
+from pm_agents.llm import get_llm
+from pm_agents.local_classifier import load_decisions
+from pm_agents.workflow import discard_speculation, run_stage1_refinement, run_stage2_classification, run_stage3_soft_guesses
+
+STATEMENT = "Users say onboarding is painful, but is it a real problem?"
+
+COMBINED = """REFINED_STATEMENT: New admins abandon setup before inviting their team.
+This may drive first-month churn.
+
+IMPROVEMENTS_MADE:
+- Named who struggles - new workspace admins
+- Tied the pain to churn
+
+CLASSIFICATION: problem_space
+REASONING: The PM is unsure the problem exists.
+ALTERNATIVES: context_mapping
+
+SOFT_GUESSES:
+- Who: New workspace admins — Confidence: High — they run setup
+- Impact: Churn in month one — Confidence: Low — no cohort data yet
+"""
+
+
+# --------------------
+# FAST PATH
+# --------------------
+
+def test_parse_combined_response():
+    result = parse_combined_response(COMBINED)
+    assert result["refined_statement"] == (
+        "New admins abandon setup before inviting their team. This may drive first-month churn."
+    )
+    assert result["improvements"] == ["Named who struggles - new workspace admins", "Tied the pain to churn"]
+    assert (result["classification"], result["alternatives"]) == ("problem_space", ["context_mapping"])
+    # Only SOFT_GUESSES bullets are structured assumptions, not IMPROVEMENTS_MADE ones
+    assert result["assumptions"] == [
+        {"topic": "Who", "assumption": "New workspace admins", "confidence": "High", "reason": "they run setup"},
+        {"topic": "Impact", "assumption": "Churn in month one", "confidence": "Low", "reason": "no cohort data yet"},
+    ]
+
+
+def test_run_combined_is_one_call():
+    llm = get_llm()
+    result = run_combined(STATEMENT, llm)
+    assert llm.calls == 1
+    assert result["refined_statement"]
+    assert result["classification"] in VALID_CLASSIFICATIONS
+    assert result["assumptions"]
+    assert asyncio.run(arun_combined(STATEMENT, llm)) == result
+
+
+def test_fast_path_serves_stages_2_and_3():
+    llm = get_llm()
+    stage1 = list(run_stage1_refinement(STATEMENT, fast_path=True))
+    refined = stage1[0][1]["refined_statement"]
+    assert stage1[-1][1]["fast_path"] is True
+    try:
+        stage2 = list(run_stage2_classification(refined))
+        stage3 = list(run_stage3_soft_guesses(refined, stage2[0][1]["classification"]))
+    finally:
+        discard_speculation(refined)
+    assert llm.calls == 1
+    assert stage2[-1][1]["speculative"] and stage3[-1][1]["speculative"]
+    assert stage3[0][1] == run_combined(STATEMENT, llm)["assumptions"]
+
+
+# --------------------
+# PARSERS
+# --------------------
+
+def test_parse_response():
+    text = "CLASSIFICATION: Constraints\nREASONING: Budget is fixed\nALTERNATIVES: constraints, prioritization"
+    assert parse_response(text) == ("constraints", "Budget is fixed", ["prioritization"])
+    assert parse_response("CLASSIFICATION: unknown")[0] == "problem_space"
+
+
+def test_parsers_match_the_reference_implementations():
+    # The single-pass parsers must agree with the original line-by-line ones
+    assert check_equivalence(GOLDEN) == []
+    assert check_equivalence(synthetic_corpus(200)) == []
+
+
+# --------------------
+# DECISION LOG
+# --------------------
+
+class FixedLLM:
+    """Answers every call with the same text."""
+
+    def __init__(self, text: str):
+        self.text = text
+
+    def invoke(self, messages, **kwargs):
+        return AIMessage(content=self.text)
+
+
+def test_records_only_fresh_parsed_decisions(tmp_path, monkeypatch):
+    log = tmp_path / "decisions.jsonl"
+    monkeypatch.setenv("PM_AGENTS_CLASSIFIER_LOG", str(log))
+    set_response_cache(InMemoryCache())
+    llm = get_llm()
+
+    classification = run_coordinator(STATEMENT, llm)[0]
+    assert load_decisions(str(log)) == [(STATEMENT, classification)]
+
+    # Response-cache hits, sync or async, are not new decisions
+    run_coordinator(STATEMENT, llm)
+    asyncio.run(arun_coordinator(STATEMENT, llm))
+    assert len(load_decisions(str(log))) == 1
+
+    # Neither is the fallback for an answer that could not be parsed
+    assert run_coordinator("Something else entirely", FixedLLM("I'm not sure."))[0] == "problem_space"
+    assert len(load_decisions(str(log))) == 1
+
+    result = run_combined(STATEMENT, llm)
+    assert load_decisions(str(log))[-1] == (result["refined_statement"], result["classification"])
@@ -0,0 +1,99 @@
+import json
+import random
+
+from pm_agents.local_classifier import (
+    MIN_CALIBRATION_EXAMPLES,
+    SEED_EXAMPLES,
+    LocalClassifier,
+    build_classifier,
+    classify_locally,
+    set_local_classifier,
+)
+
+SEED = [(text, label) for label, texts in SEED_EXAMPLES.items() for text in texts]
+
+
+def _trained(examples=SEED) -> LocalClassifier:
+    classifier = LocalClassifier()
+    classifier.add_examples(examples)
+    return classifier
+
+
+# --------------------
+# CLASSIFIER
+# --------------------
+
+def test_classifies_seed_style_input():
+    label, confidence, probabilities, evidence = _trained().classify("How do I prioritize these features?")
+    assert label == "prioritization"
+    assert confidence == max(probabilities.values())
+    assert abs(sum(probabilities.values()) - 1.0) < 1e-9
+    # Evidence is made of the input's terms (words and word pairs)
+    assert evidence and all(set(term.split()) <= {"how", "prioritize", "features"} for term in evidence)
+
+
+def test_calibration_leaves_counts_unchanged():
+    classifier = _trained()
+    before = classifier.predict_proba("Who are the key stakeholders in this domain?")
+    temperature = classifier.calibrate(SEED)
+    classifier.temperature = 2.0
+    assert classifier.predict_proba("Who are the key stakeholders in this domain?") == before
+    assert temperature != 2.0
+
+
+def test_calibration_softens_noisy_labels():
+    rng = random.Random(0)
+    noisy = [(text, rng.choice(list(SEED_EXAMPLES))) for text, _ in SEED]
+    clean_temperature = _trained().calibrate(SEED)
+    noisy_temperature = _trained(noisy).calibrate(noisy)
+    # Labels the words can't predict should give flatter, less confident probabilities
+    assert noisy_temperature > clean_temperature
+
+
+class GuardedVocabulary(dict):
+    """Vocabulary that fails lookups made without the classifier's lock."""
+
+    def __init__(self, classifier):
+        super().__init__(classifier._vocabulary)
+        self.lock = classifier._lock
+
+    def __contains__(self, term):
+        assert self.lock.locked(), "vocabulary read outside the lock"
+        return super().__contains__(term)
+
+
+def test_vocabulary_is_read_under_the_lock():
+    # record_decision trains the shared classifier while sessions classify
+    classifier = _trained()
+    classifier._vocabulary = GuardedVocabulary(classifier)
+    text = "How do I prioritize these features?"
+    assert classifier.classify(text)[2] == classifier.predict_proba(text)
+
+
+# --------------------
+# DECISION LOG
+# --------------------
+
+def test_build_classifier_calibrates_from_log(tmp_path):
+    log = tmp_path / "decisions.jsonl"
+    decisions = SEED[:MIN_CALIBRATION_EXAMPLES]
+    log.write_text(
+        "".join(json.dumps({"text": text, "classification": label}) + "\n" for text, label in decisions)
+        + "not json\n",
+        encoding="utf-8",
+    )
+    assert build_classifier(str(log)).temperature != LocalClassifier().temperature
+    assert build_classifier(str(tmp_path / "missing.jsonl")).temperature == LocalClassifier().temperature
+
+
+def test_classify_locally_needs_flag_and_confidence(monkeypatch):
+    set_local_classifier(_trained())
+    try:
+        assert classify_locally("How do I prioritize these features?") is None
+        monkeypatch.setenv("PM_AGENTS_LOCAL_CLASSIFIER", "1")
+        classification, reasoning, alternatives = classify_locally("How do I prioritize these features?", threshold=0.5)
+        assert classification == "prioritization"
+        assert "prioritization" not in alternatives
+        assert classify_locally("How do I prioritize these features?", threshold=0.999) is None
+    finally:
+        set_local_classifier(None)
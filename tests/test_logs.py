@@ -0,0 +1,52 @@
+import json
+import logging
+
+import pytest
+
+from pm_agents.logs import StructuredFormatter, current_context, get_logger, log_context
+from pm_agents.workflow import run_stage4_fanout
+
+
+@pytest.fixture
+def caplog(caplog):
+    caplog.set_level(logging.INFO, logger="pm_agents")
+    return caplog
+
+
+# --------------------
+# CONTEXT
+# --------------------
+
+def test_fields_are_merged_in_order(caplog):
+    logger = get_logger("pm_agents.tests", stage="bound", agent="constraints")
+    with log_context(session_id="s1", stage="context"):
+        logger.bind(agent="prioritization").info("hello", extra={"attempt": 2})
+    assert caplog.records[-1].fields == {"session_id": "s1", "stage": "bound", "agent": "prioritization", "attempt": 2}
+
+
+def test_contexts_nest_and_reset():
+    with log_context(session_id="s1"):
+        with log_context(stage="classification"):
+            assert current_context() == {"session_id": "s1", "stage": "classification"}
+        assert current_context() == {"session_id": "s1"}
+    assert current_context() == {}
+
+
+def test_context_reaches_fanout_workers(caplog):
+    with log_context(session_id="s1"):
+        list(run_stage4_fanout("Users churn", "constraints", ["prioritization"]))
+    worker_records = [r for r in caplog.records if r.threadName.startswith("pm-fanout-")]
+    assert worker_records
+    assert all(r.fields["session_id"] == "s1" for r in worker_records)
+
+
+# --------------------
+# FORMATTING
+# --------------------
+
+def test_structured_formatter(caplog):
+    get_logger("pm_agents.tests", stage="bound").info("Stage %s done", 2)
+    record = caplog.records[-1]
+    assert StructuredFormatter().format(record).endswith("pm_agents.tests: Stage 2 done stage=bound")
+    payload = json.loads(StructuredFormatter(json_lines=True).format(record))
+    assert (payload["message"], payload["stage"], payload["level"]) == ("Stage 2 done", "bound", "INFO")
@@ -0,0 +1,111 @@
+import json
+
+import pytest
+
+from pm_agents.metrics import (
+    JsonlExporter,
+    StageTimer,
+    add_metrics_exporter,
+    configure_metrics,
+    export_metrics,
+    remove_metrics_exporter,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 10.0
+
+    def __call__(self):
+        return self.now
+
+
+# --------------------
+# TIMERS
+# --------------------
+
+def test_stage_timer_record(metrics_records):
+    clock = FakeClock()
+    timer = StageTimer("specialist", agent="constraints", clock=clock)
+    clock.now += 0.5
+    timer.on_token()
+    clock.now += 1.5
+    for _ in range(3):
+        timer.on_token()
+    timer.add_usage({"input_tokens": 1200, "output_tokens": 300, "cache_read_tokens": 1000})
+    record = timer.finish(concise=True)
+
+    assert record == {
+        "stage": "specialist",
+        "agent": "constraints",
+        "wall_time_s": 2.0,
+        "ttft_s": 0.5,
+        "tokens_per_sec": 200.0,  # Output tokens over the time after the first token
+        "chunks": 4,
+        "input_tokens": 1200,
+        "output_tokens": 300,
+        "cache_read_tokens": 1000,
+        "cache_write_tokens": 0,
+        "concise": True,
+    }
+    assert metrics_records == [record]
+
+
+def test_usage_accumulates_across_calls():
+    timer = StageTimer("classification", clock=FakeClock())
+    timer.add_usage({"input_tokens": 100, "output_tokens": 10})
+    timer.add_usage({"input_tokens": 50, "output_tokens": None})
+    record = timer.finish(export=False)
+    assert (record["input_tokens"], record["output_tokens"]) == (150, 10)
+    assert record["tokens_per_sec"] == 0.0  # No time elapsed on the fake clock
+
+
+def test_timer_without_usage_counts_chunks():
+    timer = StageTimer("specialist", clock=FakeClock())
+    timer.on_token()
+    timer.on_token()
+    record = timer.finish(export=False)
+    assert (record["chunks"], record["output_tokens"]) == (2, 0)
+
+
+# --------------------
+# EXPORTERS
+# --------------------
+
+def test_failing_exporter_does_not_break_others(metrics_records):
+    def broken(record):
+        raise RuntimeError("disk full")
+
+    add_metrics_exporter(broken)
+    try:
+        export_metrics({"stage": "refinement"})
+    finally:
+        remove_metrics_exporter(broken)
+    assert metrics_records == [{"stage": "refinement"}]
+
+
+def test_jsonl_exporter(tmp_path):
+    path = tmp_path / "metrics.jsonl"
+    exporter = JsonlExporter(str(path))
+    exporter({"stage": "refinement", "wall_time_s": 1.5})
+    exporter({"stage": "classification"})
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [line["stage"] for line in lines] == ["refinement", "classification"]
+    assert lines[0]["wall_time_s"] == 1.5 and "timestamp" in lines[0]
+
+
+@pytest.fixture
+def env_exporters(monkeypatch):
+    yield monkeypatch
+    monkeypatch.delenv("PM_AGENTS_METRICS_FILE", raising=False)
+    monkeypatch.delenv("PM_AGENTS_METRICS_LOG", raising=False)
+    configure_metrics()
+
+
+def test_configure_metrics_replaces_env_exporters(env_exporters, tmp_path):
+    path = tmp_path / "metrics.jsonl"
+    env_exporters.setenv("PM_AGENTS_METRICS_FILE", str(path))
+    configure_metrics()
+    configure_metrics()  # e.g. a Streamlit rerun
+    export_metrics({"stage": "refinement"})
+    assert len(path.read_text().splitlines()) == 1
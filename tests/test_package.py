@@ -0,0 +1,45 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import pm_agents
+
+SRC = str(Path(__file__).resolve().parents[1] / "src")
+HEAVY_MODULES = ("langchain_core", "langchain_anthropic", "langgraph", "anthropic")
+
+
+def imported_modules(code: str) -> set:
+    """Run code in a fresh interpreter and return the heavy modules it imported."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [SRC, os.environ.get("PYTHONPATH")])))
+    check = f"{code}\nimport sys\nprint(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", check], env=env, capture_output=True, text=True, check=True)
+    return set(result.stdout.split())
+
+
+# --------------------
+# LAZY IMPORTS
+# --------------------
+
+def test_importing_the_package_is_light():
+    assert imported_modules("import pm_agents") == set()
+
+
+def test_cancel_token_does_not_pull_in_the_workflow():
+    assert imported_modules("from pm_agents import CancelToken") == set()
+
+
+def test_langgraph_is_imported_when_a_graph_is_built():
+    assert imported_modules("import pm_agents; pm_agents.run_stage1_refinement") == set()
+    assert "langgraph" in imported_modules("import pm_agents; pm_agents.build_graph()")
+
+
+def test_public_names():
+    from pm_agents import workflow
+
+    assert pm_agents.get_graph is workflow.get_graph
+    assert set(pm_agents.__all__) <= set(dir(pm_agents))
+    with pytest.raises(AttributeError):
+        pm_agents.not_a_name
@@ -0,0 +1,120 @@
+import asyncio
+
+import pytest
+
+from pm_agents.agents import CONSTRAINTS_PROMPT
+from pm_agents.agents.common import build_messages
+from pm_agents.providers import (
+    RecordingLLM,
+    ReplayLLM,
+    ReplayMissError,
+    SyntheticLLM,
+    provider_from_env,
+    split_tokens,
+)
+
+MESSAGES = build_messages(CONSTRAINTS_PROMPT, "Users churn after onboarding")
+OTHER_MESSAGES = build_messages(CONSTRAINTS_PROMPT, "Admins cannot find the invite button")
+
+
+def streamed(llm, messages=MESSAGES) -> str:
+    return "".join(chunk.content for chunk in llm.stream(messages))
+
+
+# --------------------
+# SYNTHETIC BACKEND
+# --------------------
+
+def test_synthetic_responses_are_deterministic():
+    llm = SyntheticLLM(output_tokens=400)
+    response = llm.invoke(MESSAGES)
+    assert response.content == SyntheticLLM(output_tokens=400).invoke(MESSAGES).content
+    assert response.content != llm.invoke(OTHER_MESSAGES).content
+    assert streamed(llm) == response.content
+    assert llm.calls == 3
+
+
+def test_synthetic_specialist_answer_is_sized_and_sectioned():
+    response = SyntheticLLM(output_tokens=4500).invoke(MESSAGES)
+    assert "### 1." in response.content
+    assert response.usage_metadata["output_tokens"] == len(split_tokens(response.content))
+    assert 3500 < response.usage_metadata["output_tokens"] < 5500
+
+
+def test_synthetic_stream_reports_usage_on_the_last_chunk():
+    chunks = list(SyntheticLLM(output_tokens=300).stream(MESSAGES))
+    assert len(chunks) > 1
+    assert chunks[-1].usage_metadata["output_tokens"] > 0
+    assert all(chunk.usage_metadata is None for chunk in chunks[:-1])
+
+
+def test_async_matches_sync():
+    llm = SyntheticLLM(output_tokens=300)
+
+    async def collect():
+        text = "".join([chunk.content async for chunk in llm.astream(MESSAGES)])
+        return text, (await llm.ainvoke(MESSAGES)).content
+
+    assert asyncio.run(collect()) == (streamed(llm), llm.invoke(MESSAGES).content)
+
+
+# --------------------
+# RECORD AND REPLAY
+# --------------------
+
+def test_recorded_responses_replay(tmp_path):
+    path = str(tmp_path / "recordings.jsonl")
+    upstream = SyntheticLLM(output_tokens=300)
+    recorder = RecordingLLM(upstream, path)
+    text = streamed(recorder)
+    invoked = recorder.invoke(OTHER_MESSAGES).content
+    assert recorder.model == "synthetic"  # Attributes come from the wrapped client
+
+    replay = ReplayLLM(path, speed=0)
+    assert len(replay) == 2
+    assert streamed(replay) == replay.invoke(MESSAGES).content == text
+    assert replay.invoke(OTHER_MESSAGES).content == invoked
+    assert replay.invoke(MESSAGES).usage_metadata == upstream.invoke(MESSAGES).usage_metadata
+
+
+def test_partial_streams_are_not_recorded(tmp_path):
+    path = tmp_path / "recordings.jsonl"
+    stream = RecordingLLM(SyntheticLLM(output_tokens=300), str(path)).stream(MESSAGES)
+    next(stream)
+    stream.close()
+    assert not path.exists()
+
+
+def test_replay_miss(tmp_path):
+    path = str(tmp_path / "recordings.jsonl")
+    RecordingLLM(SyntheticLLM(), path).invoke(MESSAGES)
+    with pytest.raises(ReplayMissError):
+        ReplayLLM(path).invoke(OTHER_MESSAGES)
+    fallback = SyntheticLLM()
+    assert ReplayLLM(path, fallback=fallback).invoke(OTHER_MESSAGES).content == fallback.invoke(OTHER_MESSAGES).content
+
+
+# --------------------
+# SELECTION
+# --------------------
+
+def test_provider_from_env(monkeypatch, tmp_path):
+    def build_anthropic():
+        return "anthropic"
+
+    assert provider_from_env(False, build_anthropic) == "anthropic"
+    monkeypatch.setenv("PM_AGENTS_LLM_PROVIDER", "synthetic")
+    monkeypatch.setenv("PM_AGENTS_FAKE_TOKENS_PER_SEC", "50")
+    llm = provider_from_env(True, build_anthropic)
+    assert isinstance(llm, SyntheticLLM) and llm.tokens_per_sec == 50.0
+
+    path = tmp_path / "recordings.jsonl"
+    path.write_text("")
+    monkeypatch.setenv("PM_AGENTS_RECORDINGS_PATH", str(path))
+    monkeypatch.setenv("PM_AGENTS_LLM_PROVIDER", "replay")
+    assert isinstance(provider_from_env(False, build_anthropic), ReplayLLM)
+    monkeypatch.setenv("PM_AGENTS_LLM_PROVIDER", "record")
+    assert provider_from_env(False, build_anthropic).llm == "anthropic"
+    monkeypatch.setenv("PM_AGENTS_LLM_PROVIDER", "openai")
+    with pytest.raises(ValueError):
+        provider_from_env(False, build_anthropic)
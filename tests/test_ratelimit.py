@@ -0,0 +1,147 @@
+import asyncio
+import threading
+
+import pytest
+
+from pm_agents.ratelimit import POLL_INTERVAL, Permit, RateLimiter, SQLiteRateLimiter, billed_tokens
+
+MESSAGES = [{"role": "user", "content": "hi"}]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+# --------------------
+# BUCKETS
+# --------------------
+
+def test_requests_per_minute_bucket(clock):
+    limiter = RateLimiter(requests_per_minute=60, clock=clock)
+    for _ in range(60):
+        assert limiter._try_acquire(0) == 0.0
+        limiter.release(0)
+    assert limiter._try_acquire(0) == pytest.approx(1.0)
+    clock.now += 1.0
+    assert limiter._try_acquire(0) == 0.0
+
+
+def test_tokens_per_minute_bucket(clock):
+    limiter = RateLimiter(tokens_per_minute=600, clock=clock)
+    assert limiter._try_acquire(600) == 0.0
+    assert limiter._try_acquire(100) == pytest.approx(10.0)
+    clock.now += 5.0
+    assert limiter._try_acquire(100) == pytest.approx(5.0)
+    clock.now += 5.0
+    assert limiter._try_acquire(100) == 0.0
+
+
+def test_settled_usage_refunds_the_estimate(clock):
+    limiter = RateLimiter(tokens_per_minute=600, clock=clock)
+    assert limiter._try_acquire(600) == 0.0
+    limiter.release(600, actual_tokens=200)
+    assert limiter._try_acquire(400) == 0.0
+    assert limiter._try_acquire(1) > 0
+
+
+def test_oversized_request_admitted_when_bucket_is_full(clock):
+    limiter = RateLimiter(tokens_per_minute=600, clock=clock)
+    assert limiter._try_acquire(5000) == 0.0
+    # The bucket is now in debt; the next request waits for it to refill
+    assert limiter._try_acquire(10) == pytest.approx((5000 - 600 + 10) / 10.0)
+
+
+def test_concurrency_cap(clock):
+    limiter = RateLimiter(max_concurrency=1, clock=clock)
+    assert limiter._try_acquire(0) == 0.0
+    assert limiter._try_acquire(0) == POLL_INTERVAL
+    limiter.release(0)
+    assert limiter._try_acquire(0) == 0.0
+    assert limiter.stats()["in_flight"] == 1
+
+
+# --------------------
+# PERMITS
+# --------------------
+
+def test_permit_settles_billed_tokens():
+    limiter = RateLimiter()
+    usage = {"input_tokens": 1000, "output_tokens": 200, "cache_read_tokens": 800}
+    with limiter.limit(MESSAGES) as permit:
+        settled = permit.settle(usage)
+    assert permit.actual_tokens == billed_tokens(usage) == 400
+    assert settled == {**usage, "queue_wait_s": 0.0}
+    assert limiter.stats()["in_flight"] == 0
+    assert Permit().settle(usage) is usage
+
+
+# --------------------
+# SHARED LIMITER
+# --------------------
+
+def test_sqlite_buckets_are_shared(tmp_path):
+    path = str(tmp_path / "ratelimit.sqlite3")
+    first = SQLiteRateLimiter(path, requests_per_minute=2)
+    second = SQLiteRateLimiter(path, requests_per_minute=2)
+    assert first._try_acquire(0) == 0.0
+    assert second._try_acquire(0) == 0.0
+    assert first._try_acquire(0) > 0
+
+
+def test_sqlite_reservations_run_off_the_event_loop(tmp_path):
+    limiter = SQLiteRateLimiter(str(tmp_path / "ratelimit.sqlite3"), requests_per_minute=60)
+    reserve, threads = limiter._reserve, []
+
+    def recording_reserve(tokens):
+        threads.append(threading.current_thread())
+        return reserve(tokens)
+
+    limiter._reserve = recording_reserve
+
+    async def call():
+        async with limiter.alimit(MESSAGES):
+            return threading.current_thread()
+
+    loop_thread = asyncio.run(call())
+    assert threads and loop_thread not in threads
+    assert limiter.stats()["in_flight"] == 0
+
+
+def test_cancelled_reservation_gives_back_its_slot(tmp_path):
+    limiter = SQLiteRateLimiter(str(tmp_path / "ratelimit.sqlite3"), max_concurrency=1)
+    try_acquire = limiter._try_acquire
+    started, unblock, finished = threading.Event(), threading.Event(), threading.Event()
+
+    def blocked_try_acquire(tokens):
+        started.set()
+        unblock.wait(5)  # e.g. another process holds the database lock
+        try:
+            return try_acquire(tokens)
+        finally:
+            finished.set()
+
+    limiter._try_acquire = blocked_try_acquire
+
+    async def cancel_while_reserving():
+        loop = asyncio.get_running_loop()
+        task = asyncio.ensure_future(limiter.aacquire(100))
+        await loop.run_in_executor(None, started.wait, 5)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        unblock.set()
+        await loop.run_in_executor(None, finished.wait, 5)
+        while limiter.stats()["in_flight"]:
+            await asyncio.sleep(0.01)
+
+    asyncio.run(asyncio.wait_for(cancel_while_reserving(), 5))
+    assert limiter.stats()["admitted"] == 0
@@ -0,0 +1,183 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from pm_agents.resilience import DeadlineExceeded, ResiliencePolicy, is_transient
+
+
+class StatusError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+def _flaky(failures: list):
+    """fn raising each exception in failures once, then returning "ok"."""
+    calls = []
+
+    def fn():
+        calls.append(None)
+        if failures:
+            raise failures.pop(0)
+        return "ok"
+
+    return fn, calls
+
+
+def _hedging_policy(**kwargs) -> ResiliencePolicy:
+    policy = ResiliencePolicy(hedge=True, hedge_min_samples=1, hedge_min_delay=0.05, **kwargs)
+    policy.latencies.record("classification", 0.01)
+    return policy
+
+
+# --------------------
+# RETRIES AND DEADLINES
+# --------------------
+
+def test_is_transient():
+    assert is_transient(StatusError(429))
+    assert is_transient(StatusError(529))
+    assert not is_transient(StatusError(400))
+    assert is_transient(ConnectionError())
+    assert not is_transient(DeadlineExceeded())
+    assert not is_transient(ValueError())
+
+
+def test_single_attempt_by_default():
+    fn, calls = _flaky([StatusError(503)])
+    with pytest.raises(StatusError):
+        ResiliencePolicy().call(fn)
+    assert len(calls) == 1
+
+
+def test_retries_transient_errors():
+    fn, calls = _flaky([StatusError(503), ConnectionError()])
+    result, info = ResiliencePolicy(max_attempts=3, base_delay=0).call(fn)
+    assert (result, info) == ("ok", {"attempts": 3, "hedged": False})
+
+
+def test_does_not_retry_client_errors():
+    fn, calls = _flaky([StatusError(400)])
+    with pytest.raises(StatusError):
+        ResiliencePolicy(max_attempts=3, base_delay=0).call(fn)
+    assert len(calls) == 1
+
+
+def test_deadline():
+    policy = ResiliencePolicy(stage_deadlines={"classification": 0.05})
+    with pytest.raises(DeadlineExceeded):
+        policy.call(lambda: time.sleep(0.5), stage="classification")
+
+
+# --------------------
+# HEDGING
+# --------------------
+
+def test_sync_hedge_reports_the_loser():
+    release_first = threading.Event()
+    calls = []
+
+    def fn():
+        calls.append(None)
+        if len(calls) == 1:
+            release_first.wait(5)
+            return "slow"
+        return "fast"
+
+    discarded = []
+    reported = threading.Event()
+    result, info = _hedging_policy().call(
+        fn, stage="classification", on_discarded=lambda r: (discarded.append(r), reported.set())
+    )
+    assert (result, info) == ("fast", {"attempts": 1, "hedged": True})
+    assert discarded == []
+    release_first.set()
+    assert reported.wait(5)
+    assert discarded == ["slow"]
+
+
+def test_async_hedge_cancels_the_loser():
+    cancelled = []
+
+    async def main():
+        calls = []
+
+        async def afn():
+            calls.append(None)
+            if len(calls) == 1:
+                try:
+                    await asyncio.sleep(5)
+                except asyncio.CancelledError:
+                    cancelled.append(True)
+                    raise
+                return "slow"
+            return "fast"
+
+        result = await _hedging_policy().acall(afn, stage="classification")
+        await asyncio.sleep(0)
+        return result
+
+    assert asyncio.run(main()) == ("fast", {"attempts": 1, "hedged": True})
+    assert cancelled == [True]
+
+
+def test_async_retries():
+    async def main():
+        failures = [StatusError(500)]
+
+        async def afn():
+            if failures:
+                raise failures.pop(0)
+            return "ok"
+
+        return await ResiliencePolicy(max_attempts=2, base_delay=0).acall(afn)
+
+    assert asyncio.run(main()) == ("ok", {"attempts": 2, "hedged": False})
+
+
+# --------------------
+# INTEGRATION
+# --------------------
+
+class FailOnceLLM:
+    """Client whose first invoke fails with a transient error."""
+
+    def __init__(self, llm):
+        self.llm = llm
+        self.failed = False
+
+    def __getattr__(self, name):
+        return getattr(self.llm, name)
+
+    def invoke(self, messages, **kwargs):
+        if not self.failed:
+            self.failed = True
+            raise StatusError(529)
+        return self.llm.invoke(messages, **kwargs)
+
+
+def test_coordinator_retries_are_reported_in_metrics():
+    from pm_agents.llm import get_llm, set_llms
+    from pm_agents.resilience import set_resilience_policy
+    from pm_agents.workflow import run_stage2_classification
+
+    set_llms(FailOnceLLM(get_llm()))
+    set_resilience_policy(ResiliencePolicy(max_attempts=2, base_delay=0))
+    event_type, metrics = list(run_stage2_classification("Users churn after onboarding"))[-1]
+    assert event_type == "metrics"
+    assert metrics["retries"] == 1
+
+
+def test_sdk_retries_off_when_policy_retries(monkeypatch):
+    pytest.importorskip("langchain_anthropic")
+    from pm_agents.llm import _build_anthropic_client
+    from pm_agents.resilience import set_resilience_policy
+
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+    assert _build_anthropic_client(streaming=False).max_retries == 2
+    set_resilience_policy(ResiliencePolicy(max_attempts=3))
+    client = _build_anthropic_client(streaming=False)
+    assert client.max_retries == 0
+    assert client._client.max_retries == 0
@@ -0,0 +1,92 @@
+from pm_agents.section_parser import SectionParser, parse_stream
+
+ANSWER = """### 1. Problem Statement Reframe
+Teams may not finish onboarding.
+
+### 2. Soft Guesses
+- ⚠️ **Who**: New workspace admins
+⚠️ **Frequency**: Weekly
+
+### Risk Summary Matrix
+| Risk | Level |
+|------|-------|
+| Value | High |
+| Usability | Low |
+
+```
+- not a question, inside a fence
+```
+
+## Questions for Your Next Stakeholder Meeting
+
+### Must Validate (High Risk)
+1. How many admins finish setup?
+   - WHY: below 50% means onboarding is the problem
+2. Who owns activation?
+
+### Validation Experiments to Run
+- Run a five-day concierge onboarding test
+"""
+
+
+def _feed_all(tokens) -> list:
+    parser = SectionParser()
+    events = []
+    for token in tokens:
+        events.extend(parser.feed(token))
+    return events + parser.close()
+
+
+# --------------------
+# SECTION EVENTS
+# --------------------
+
+def test_events():
+    events = list(parse_stream([ANSWER]))
+    by_type = {}
+    for event_type, data in events:
+        by_type.setdefault(event_type, []).append(data)
+
+    assert [s["title"] for s in by_type["section_started"]] == [
+        "1. Problem Statement Reframe",
+        "2. Soft Guesses",
+        "Risk Summary Matrix",
+        "Questions for Your Next Stakeholder Meeting",
+        "Must Validate (High Risk)",
+        "Validation Experiments to Run",
+    ]
+    assert by_type["soft_guess"] == [
+        {"text": "**Who**: New workspace admins", "section": "2. Soft Guesses"},
+        {"text": "**Frequency**: Weekly", "section": "2. Soft Guesses"},
+    ]
+    assert by_type["table_row"] == [
+        {"section": "Risk Summary Matrix", "headers": ["Risk", "Level"], "cells": ["Value", "High"]},
+        {"section": "Risk Summary Matrix", "headers": ["Risk", "Level"], "cells": ["Usability", "Low"]},
+    ]
+    # Indented notes, fenced blocks and experiments are not questions
+    assert by_type["question"] == [
+        {"text": "How many admins finish setup?", "section": "Must Validate (High Risk)"},
+        {"text": "Who owns activation?", "section": "Must Validate (High Risk)"},
+    ]
+
+
+def test_token_boundaries_do_not_matter():
+    whole = _feed_all([ANSWER])
+    assert _feed_all(list(ANSWER)) == whole
+    assert _feed_all([ANSWER[i:i + 7] for i in range(0, len(ANSWER), 7)]) == whole
+
+
+def test_events_emitted_when_line_completes():
+    parser = SectionParser()
+    assert parser.feed("### 1. Title") == []
+    assert parser.feed("\n⚠️ guess") == [("section_started", {"title": "1. Title", "level": 3})]
+    assert parser.close() == [("soft_guess", {"text": "guess", "section": "1. Title"})]
+    assert parser.soft_guesses == ["guess"]
+    assert parser.sections == ["1. Title"]
+
+
+def test_nested_heading_levels():
+    parser = SectionParser()
+    parser.feed("## Questions for Your Next Stakeholder Meeting\n### Must Validate\n## Appendix\n- not a question\n")
+    assert parser.section == "Appendix"
+    assert parser.questions == []
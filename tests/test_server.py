@@ -0,0 +1,158 @@
+import asyncio
+import json
+
+import pytest
+
+from pm_agents.llm import set_llms
+from pm_agents.providers import SyntheticLLM
+from pm_agents.server import Admission, HTTPError, create_app
+
+REFINED = "Which of three roadmap features should the team build first this quarter?"
+
+
+async def request(app, method: str, path: str, body=None, disconnect_after: int = None) -> tuple:
+    """
+    Drive one ASGI request.
+
+    Args:
+        disconnect_after: Disconnect once this many body messages were sent
+
+    Returns:
+        (status, body bytes, sent messages)
+    """
+    sent = []
+    disconnected = asyncio.Event()
+    body_read = False
+
+    async def receive():
+        nonlocal body_read
+        if not body_read:
+            body_read = True
+            payload = json.dumps(body).encode() if body is not None else b""
+            return {"type": "http.request", "body": payload, "more_body": False}
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+        bodies = sum(1 for m in sent if m["type"] == "http.response.body")
+        if disconnect_after is not None and bodies >= disconnect_after:
+            disconnected.set()
+
+    await app({"type": "http", "method": method, "path": path, "headers": []}, receive, send)
+    status = sent[0]["status"] if sent else None
+    data = b"".join(m.get("body", b"") for m in sent if m["type"] == "http.response.body")
+    return status, data, sent
+
+
+def _sse_events(data: bytes) -> list:
+    events = []
+    for block in data.decode("utf-8").split("\n\n"):
+        if block:
+            event_line, data_line = block.split("\n", 1)
+            events.append((event_line[len("event: "):], json.loads(data_line[len("data: "):])))
+    return events
+
+
+# --------------------
+# ADMISSION
+# --------------------
+
+def test_admission_rejects_after_queue_timeout():
+    async def main():
+        admission = Admission(max_requests=1, queue_timeout=0.05)
+        await admission.acquire(0)
+        with pytest.raises(HTTPError) as error:
+            await admission.acquire(0)
+        assert error.value.status == 503
+        assert error.value.headers == [(b"retry-after", b"1")]
+        await admission.release(0)
+        await admission.acquire(0)
+        return admission.stats()
+
+    assert asyncio.run(main())["rejected"] == 1
+
+
+def test_admission_by_expected_tokens():
+    async def main():
+        admission = Admission(max_requests=10, max_tokens=100, queue_timeout=0.05)
+        await admission.acquire(80)
+        with pytest.raises(HTTPError):
+            await admission.acquire(50)
+        await admission.acquire(20)
+        await admission.release(80)
+        await admission.release(20)
+        # Larger than the whole capacity: admitted once nothing else is in flight
+        await admission.acquire(500)
+        return admission.stats()
+
+    assert asyncio.run(main())["tokens_in_flight"] == 500
+
+
+# --------------------
+# ENDPOINTS
+# --------------------
+
+def test_stage_endpoints():
+    async def main():
+        app = create_app(Admission())
+        status, data, _ = await request(app, "GET", "/healthz")
+        assert status == 200 and json.loads(data)["status"] == "ok"
+
+        status, data, _ = await request(app, "POST", "/v1/refinement", {"input": "How do I prioritize features?"})
+        assert status == 200
+        assert json.loads(data)["result"]["refined_statement"]
+
+        status, data, _ = await request(app, "POST", "/v1/classification", {"refined_input": REFINED})
+        assert status == 200
+        assert json.loads(data)["result"]["classification"]
+
+    asyncio.run(main())
+
+
+@pytest.mark.parametrize("method, path, body, status", [
+    ("POST", "/nope", {}, 404),
+    ("GET", "/v1/specialist", None, 405),
+    ("POST", "/v1/specialist", {"refined_input": REFINED, "classification": "bogus"}, 400),
+    ("POST", "/v1/classification", {}, 400),
+    ("POST", "/v1/classification", [1, 2], 400),
+])
+def test_errors(method, path, body, status):
+    got, data, _ = asyncio.run(request(create_app(Admission()), method, path, body))
+    assert got == status
+    assert "error" in json.loads(data)
+
+
+def test_specialist_stream():
+    body = {"refined_input": REFINED, "classification": "prioritization"}
+    status, data, sent = asyncio.run(request(create_app(Admission()), "POST", "/v1/specialist/stream", body))
+    assert status == 200
+    assert (b"content-type", b"text/event-stream") in sent[0]["headers"]
+    events = _sse_events(data)
+    types = [event_type for event_type, _ in events]
+    assert types[0] == "token" and "done" in types and types[-1] == "metrics"
+    tokens = "".join(data for event_type, data in events if event_type == "token")
+    assert tokens == dict(events)["done"]
+
+
+def test_disconnect_cancels_stream(metrics_records):
+    set_llms(llm_streaming=SyntheticLLM(output_tokens=2000, tokens_per_sec=2000))
+    app = create_app(Admission())
+    body = {"refined_input": REFINED, "classification": "prioritization"}
+    status, data, _ = asyncio.run(request(app, "POST", "/v1/specialist/stream", body, disconnect_after=5))
+    assert status == 200
+    assert "done" not in [event_type for event_type, _ in _sse_events(data)]
+    assert app.admission.stats()["in_flight"] == 0
+    (record,) = [r for r in metrics_records if r["stage"] == "specialist"]
+    assert record["cancelled"] and record["tokens_saved"] > 0
+
+
+def test_overload_answers_503():
+    set_llms(llm_streaming=SyntheticLLM(output_tokens=300, latency=0.3))
+    app = create_app(Admission(max_requests=1, queue_timeout=0.05))
+    body = {"refined_input": REFINED, "classification": "prioritization"}
+
+    async def main():
+        return await asyncio.gather(*(request(app, "POST", "/v1/specialist", body) for _ in range(2)))
+
+    assert sorted(status for status, _, _ in asyncio.run(main())) == [200, 503]
@@ -0,0 +1,61 @@
+from pm_agents.streaming import FrameThrottle, StreamAccumulator
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+# --------------------
+# ACCUMULATION
+# --------------------
+
+def test_accumulator_joins_tokens_in_order():
+    acc = StreamAccumulator()
+    for token in ["## Problem", "", " space", "\n"]:
+        acc.append(token)
+    assert acc.text == str(acc) == "## Problem space\n"
+    assert len(acc) == len(acc.text)
+    assert acc.token_count == 3  # Empty tokens are skipped
+
+
+def test_snapshots_between_appends():
+    acc = StreamAccumulator()
+    acc.append("a")
+    assert acc.text == "a"
+    assert acc.text == "a"
+    acc.append("b")
+    acc.append("c")
+    assert acc.text == "abc"
+    assert StreamAccumulator().text == ""
+
+
+# --------------------
+# RENDER FRAMES
+# --------------------
+
+def test_frames_are_rate_limited():
+    clock = FakeClock()
+    throttle = FrameThrottle(fps=10, clock=clock)
+    assert throttle.should_render("first")  # The first token renders immediately
+    clock.now = 0.05
+    assert not throttle.should_render("word")
+    clock.now = 0.1
+    assert throttle.should_render("word")
+    assert throttle.frames == 2
+
+
+def test_headings_and_pending_tokens_force_a_frame():
+    throttle = FrameThrottle(fps=1, max_tokens=3, clock=FakeClock())
+    throttle.should_render("start")
+    assert throttle.should_render("## Risks")
+    assert throttle.should_render("end.\n### 2. Next")
+    assert [throttle.should_render("w") for _ in range(3)] == [False, False, True]
+
+
+def test_zero_fps_renders_every_token():
+    throttle = FrameThrottle(fps=0, clock=FakeClock())
+    assert all(throttle.should_render("w") for _ in range(5))
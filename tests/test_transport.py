@@ -0,0 +1,59 @@
+import pytest
+
+from pm_agents.llm import _build_anthropic_client
+from pm_agents.transport import (
+    _client_kwargs,
+    build_chat_anthropic,
+    close_http_clients,
+    get_async_http_client,
+    get_http_client,
+    transport_settings,
+)
+
+MODEL = "claude-sonnet-4-20250514"
+
+
+@pytest.fixture(autouse=True)
+def fresh_transport(monkeypatch):
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+    monkeypatch.delenv("ANTHROPIC_PROXY", raising=False)
+    close_http_clients()
+    yield
+    close_http_clients()
+
+
+# --------------------
+# SHARED TRANSPORT
+# --------------------
+
+def test_clients_share_one_pool():
+    streaming, invoking = _build_anthropic_client(streaming=True), _build_anthropic_client(streaming=False)
+    for chat in (streaming, invoking):
+        assert chat._client._client is get_http_client()
+        assert chat._async_client._client is get_async_http_client()
+
+
+def test_public_fields_reach_the_sdk_client():
+    chat = build_chat_anthropic(
+        model=MODEL, api_key="other-key", base_url="https://gateway.example", max_retries=5,
+        default_headers={"X-Team": "pm"}, timeout=7,
+    )
+    client = chat._client
+    assert (client.api_key, str(client.base_url).rstrip("/"), client.max_retries) == (
+        "other-key", "https://gateway.example", 5,
+    )
+    assert client.timeout == 7  # An explicit model timeout wins over the transport's
+    assert client.default_headers["X-Team"] == "pm"
+    assert build_chat_anthropic(model=MODEL)._client.timeout.read == get_http_client().timeout.read
+
+
+def test_environment_proxy_is_kept(monkeypatch):
+    monkeypatch.setenv("ANTHROPIC_PROXY", "http://proxy.internal:3128")
+    chat = build_chat_anthropic(model=MODEL)
+    assert chat._client._client is get_http_client()
+    assert _client_kwargs(transport_settings())["proxy"] == "http://proxy.internal:3128"
+
+
+def test_model_specific_proxy_keeps_its_own_client():
+    chat = build_chat_anthropic(model=MODEL, anthropic_proxy="http://proxy.internal:3128")
+    assert chat._client._client is not get_http_client()
@@ -0,0 +1,108 @@
+import random
+
+from pm_agents.validation import AhoCorasick, StreamingValidator
+from pm_agents.workflow import validate_agent_output
+
+
+def _naive_matches(patterns, text):
+    return sorted(
+        (end, pattern_id)
+        for pattern_id, pattern in enumerate(patterns)
+        for end in range(len(pattern) - 1, len(text))
+        if text[end - len(pattern) + 1:end + 1] == pattern
+    )
+
+
+def _tokens(text, rng):
+    """Split text into random 1-4 character tokens."""
+    tokens, index = [], 0
+    while index < len(text):
+        size = rng.randint(1, 4)
+        tokens.append(text[index:index + size])
+        index += size
+    return tokens
+
+
+ANSWER = """### 1. Problem Statement Reframe
+The team assumes onboarding causes churn.
+
+⚠️ **Who**: New admins — *Confidence: Low*
+⚠️ **Frequency**: Weekly — *Confidence: Medium*
+
+Whether to invest: it Depends on the data.
+
+## Questions for Your Next Stakeholder Meeting
+
+### Must Validate (High Risk)
+- How many admins finish setup?
+"""
+
+
+# --------------------
+# AHO-CORASICK
+# --------------------
+
+def test_finds_overlapping_patterns():
+    matcher = AhoCorasick(["he", "she", "his", "hers"])
+    _, matches = matcher.scan("ushers")
+    assert sorted(matches) == [(3, 0), (3, 1), (5, 3)]
+
+
+def test_state_carries_across_scans():
+    matcher = AhoCorasick(["it depends", "proceed"])
+    state, matches = matcher.scan("it dep")
+    assert matches == []
+    state, matches = matcher.scan("ends", state)
+    assert matches == [(3, 0)]
+
+
+def test_matches_naive_search():
+    rng = random.Random(7)
+    for _ in range(200):
+        patterns = list({"".join(rng.choice("ab") for _ in range(rng.randint(1, 4))) for _ in range(4)})
+        text = "".join(rng.choice("abc") for _ in range(30))
+        _, matches = AhoCorasick(patterns).scan(text)
+        assert sorted(matches) == _naive_matches(patterns, text)
+
+
+# --------------------
+# STREAMING VALIDATOR
+# --------------------
+
+def test_vague_phrase_split_across_tokens_reported_once():
+    validator = StreamingValidator()
+    tokens = ["We should proceed with cau", "tion here. Proceed ", "with caution."]
+    events = []
+    for token in tokens:
+        events.extend(validator.feed(token))
+    end = "".join(tokens).index("caution") + len("caution") - 1
+    assert events == [("quality_warning", {"check": "vague_language", "phrase": "proceed with caution", "position": end})]
+
+
+def test_sections_are_case_sensitive():
+    validator = StreamingValidator()
+    validator.feed("## questions for your next stakeholder meeting\n### must validate\n")
+    (event,) = validator.finish()
+    assert event[1]["check"] == "missing_sections"
+    assert event[1]["sections"] == ["Questions for Your Next Stakeholder Meeting", "Must Validate"]
+
+
+def test_soft_guesses_without_must_validate():
+    validator = StreamingValidator()
+    for token in ["⚠️ guess one\n", "⚠", "️ guess two\n"]:
+        validator.feed(token)
+    checks = [data["check"] for _, data in validator.finish()]
+    assert validator.soft_guess_count == 2
+    assert checks == ["missing_sections", "unvalidated_soft_guesses"]
+
+
+def test_agrees_with_validate_agent_output():
+    rng = random.Random(3)
+    clean = ANSWER.replace("it Depends on the data", "only if activation is under 40%")
+    for answer in (ANSWER, clean, clean.replace("### Must Validate (High Risk)\n", "")):
+        validator = StreamingValidator()
+        for token in _tokens(answer, rng):
+            validator.feed(token)
+        validator.finish()
+        assert (not validator.issues) == validate_agent_output(answer)
+    assert validator.issues == ["Missing required sections: ['Must Validate']", "Found 2 soft guesses but no 'Must Validate' section"]
@@ -0,0 +1,382 @@
+import asyncio
+
+import pytest
+
+from pm_agents import workflow
+from pm_agents.abort import AbortPolicy
+from pm_agents.cancellation import CancelToken, tokens_saved
+from pm_agents.llm import get_llm, set_llms
+from pm_agents.providers import SyntheticLLM
+from pm_agents.workflow import (
+    MAX_INJECTED_GRAPHS,
+    _get_speculation,
+    arun_stage1_refinement,
+    arun_stage2_classification,
+    arun_stage3_soft_guesses,
+    arun_stage4_fanout,
+    arun_stage4_specialist,
+    discard_speculation,
+    get_graph,
+    invalidate_graph_cache,
+    run_stage1_refinement,
+    run_stage2_classification,
+    run_stage3_soft_guesses,
+    run_stage4_fanout,
+    run_stage4_specialist,
+    select_fanout_agents,
+    start_speculation,
+)
+
+STATEMENT = "I think users struggle with onboarding, but is it a real problem?"
+REFINED = "New workspace admins abandon setup before inviting their team, which may drive first-month churn."
+
+
+def events(stage) -> list:
+    """Run a stage generator, dropping the (timing-dependent) metrics events."""
+    return [event for event in stage if event[0] != "metrics"]
+
+
+def aevents(stage) -> list:
+    """Async version of events."""
+    async def collect():
+        return [event async for event in stage if event[0] != "metrics"]
+
+    return asyncio.run(collect())
+
+
+# --------------------
+# ASYNC STAGES
+# --------------------
+
+@pytest.mark.parametrize("sync_stage, async_stage, args", [
+    (run_stage1_refinement, arun_stage1_refinement, (STATEMENT,)),
+    (run_stage2_classification, arun_stage2_classification, (REFINED,)),
+    (run_stage3_soft_guesses, arun_stage3_soft_guesses, (REFINED, "problem_space")),
+    (run_stage4_specialist, arun_stage4_specialist, (REFINED, "problem_space", [])),
+])
+def test_async_stages_match_sync(sync_stage, async_stage, args):
+    assert aevents(async_stage(*args)) == events(sync_stage(*args))
+
+
+def test_stage4_streams_tokens_then_done():
+    streamed = events(run_stage4_specialist(REFINED, "constraints"))
+    tokens = [data for event_type, data in streamed if event_type == "token"]
+    assert len(tokens) > 1
+    assert streamed[-1] == ("done", "".join(tokens))
+
+
+def test_stages_yield_metrics_last():
+    for stage in (run_stage2_classification(REFINED), run_stage4_specialist(REFINED, "constraints")):
+        event_type, metrics = list(stage)[-1]
+        assert event_type == "metrics"
+        assert metrics["wall_time_s"] >= 0
+
+
+# --------------------
+# SPECULATION
+# --------------------
+
+def _speculate(statement: str) -> dict:
+    """Start a speculation and wait for both background calls."""
+    start_speculation(statement)
+    _get_speculation(statement, "soft_guesses").result(timeout=5)
+    return {key: _get_speculation(statement, key) for key in ("classification", "soft_guesses")}
+
+
+def test_speculation_is_reused_by_stages_2_and_3():
+    llm = get_llm()
+    futures = _speculate(REFINED)
+    start_speculation(REFINED)
+    assert _get_speculation(REFINED, "classification") is futures["classification"]
+    calls = llm.calls
+
+    stage2 = list(run_stage2_classification(REFINED))
+    classification = stage2[0][1]["classification"]
+    stage3 = list(run_stage3_soft_guesses(REFINED, classification))
+
+    assert llm.calls == calls
+    for stage in (stage2, stage3):
+        metrics = stage[-1][1]
+        assert metrics["speculative"] is True
+        # The background call's tokens are counted in the stage that used it
+        assert metrics["output_tokens"] > 0
+    assert _get_speculation(REFINED, "soft_guesses") is None
+
+
+def test_speculation_for_another_classification_falls_back():
+    _speculate(REFINED)
+    classification = _get_speculation(REFINED, "classification").result()[0]
+    other = next(c for c in ("prioritization", "constraints") if c != classification)
+    calls = get_llm().calls
+    stage3 = list(run_stage3_soft_guesses(REFINED, other))
+    assert stage3[-1][1]["speculative"] is False
+    assert get_llm().calls == calls + 1
+
+
+def test_discarded_speculation_is_not_used(metrics_records):
+    _speculate(REFINED)
+    discard_speculation(REFINED)
+    assert _get_speculation(REFINED, "classification") is None
+
+    discarded = [r for r in metrics_records if r["stage"] == "speculation"]
+    assert {r["speculated_stage"] for r in discarded} == {"classification", "soft_guesses"}
+    assert all(r["discarded"] and r["output_tokens"] > 0 for r in discarded)
+
+    stage2 = list(run_stage2_classification(REFINED))
+    assert stage2[-1][1]["speculative"] is False
+
+
+def test_stage1_starts_speculation_for_the_refined_statement():
+    refinement = events(run_stage1_refinement(STATEMENT, speculative=True))[0][1]
+    try:
+        assert _get_speculation(refinement["refined_statement"], "classification") is not None
+    finally:
+        discard_speculation(refinement["refined_statement"])
+
+
+# --------------------
+# FAN-OUT
+# --------------------
+
+FANOUT_ARGS = (REFINED, "problem_space", ["constraints", "problem_space", "prioritization", "context_mapping"])
+
+
+def fanout_events(mode: str, stop: str = None) -> list:
+    """Run the thread or asyncio fan-out, stopping agent `stop` at its first token."""
+    cancelled = set()
+    collected = []
+
+    def on_event(event):
+        collected.append(event)
+        if event[0] == "token" and event[1] == stop:
+            cancelled.add(stop)
+
+    if mode == "thread":
+        for event in run_stage4_fanout(*FANOUT_ARGS, cancelled=cancelled):
+            on_event(event)
+    else:
+        async def collect():
+            async for event in arun_stage4_fanout(*FANOUT_ARGS, cancelled=cancelled):
+                on_event(event)
+
+        asyncio.run(collect())
+    return collected
+
+
+def test_select_fanout_agents():
+    assert select_fanout_agents(*FANOUT_ARGS[1:]) == ["problem_space", "constraints", "prioritization"]
+    assert select_fanout_agents("constraints", ["not_an_agent", "constraints"], top_n=1) == ["constraints"]
+    assert select_fanout_agents("constraints", None) == ["constraints"]
+
+
+@pytest.mark.parametrize("mode", ["thread", "asyncio"])
+def test_fanout_streams_every_agent(mode):
+    streamed = fanout_events(mode)
+    assert streamed[0] == ("agents", None, ["problem_space", "constraints", "prioritization"])
+    for agent in streamed[0][2]:
+        own = [(event_type, data) for event_type, name, data in streamed[1:] if name == agent]
+        tokens = [data for event_type, data in own if event_type == "token"]
+        assert own[-2] == ("done", "".join(tokens))
+        assert own[-1][0] == "metrics" and not own[-1][1].get("cancelled")
+    # Interleaving with other agents does not change an agent's answer
+    assert next(data for event_type, name, data in streamed if event_type == "done" and name == "constraints") == (
+        events(run_stage4_specialist(REFINED, "constraints"))[-1][1]
+    )
+
+
+@pytest.mark.parametrize("mode", ["thread", "asyncio"])
+def test_fanout_agents_can_be_cancelled(mode):
+    set_llms(llm_streaming=SyntheticLLM(tokens_per_sec=2000, output_tokens=300))
+    streamed = fanout_events(mode, stop="constraints")
+    finished = {(event_type, name) for event_type, name, _ in streamed if event_type in ("done", "cancelled")}
+    assert finished == {("done", "problem_space"), ("cancelled", "constraints"), ("done", "prioritization")}
+    metrics = next(data for event_type, name, data in streamed if event_type == "metrics" and name == "constraints")
+    assert metrics["cancelled"] is True and metrics["cancel_reason"] == "superseded"
+    assert metrics["tokens_saved"] > 0
+
+
+def test_closing_the_async_fanout_stops_every_agent(metrics_records):
+    set_llms(llm_streaming=SyntheticLLM(tokens_per_sec=2000, output_tokens=300))
+
+    async def first_token_then_close():
+        stream = arun_stage4_fanout(*FANOUT_ARGS)
+        async for event in stream:
+            if event[0] == "token":
+                break
+        await stream.aclose()
+        return asyncio.all_tasks() - {asyncio.current_task()}
+
+    assert asyncio.run(first_token_then_close()) == set()
+    closed = [r for r in metrics_records if r["stage"] == "specialist_fanout"]
+    assert len(closed) == 3
+    assert all(r["cancelled"] and r["cancel_reason"] == "closed" for r in closed)
+
+
+# --------------------
+# GRAPH CACHE
+# --------------------
+
+@pytest.fixture
+def graph_cache():
+    invalidate_graph_cache()
+    yield
+    invalidate_graph_cache()
+
+
+def test_graphs_are_compiled_once(graph_cache):
+    llm = SyntheticLLM()
+    assert get_graph() is get_graph()
+    assert get_graph(llm) is get_graph(llm)
+    assert get_graph(llm) is not get_graph()
+
+
+def test_least_recently_used_injected_graph_is_evicted(graph_cache):
+    first = SyntheticLLM()
+    graph = get_graph(first)
+    others = [SyntheticLLM() for _ in range(MAX_INJECTED_GRAPHS)]
+    for llm in others[:-1]:
+        get_graph(llm)
+    assert get_graph(first) is graph  # others[0] is now the least recently used
+    get_graph(others[-1])
+    cached = [llm for llm, _ in workflow._compiled_graphs.values()]
+    assert len(cached) == MAX_INJECTED_GRAPHS
+    assert first in cached and others[0] not in cached
+
+
+def test_invalidate_graph_cache_recompiles(graph_cache):
+    llm = SyntheticLLM()
+    default, injected = get_graph(), get_graph(llm)
+    invalidate_graph_cache()
+    assert get_graph() is not default
+    assert get_graph(llm) is not injected
+
+
+# --------------------
+# EARLY ABORT
+# --------------------
+
+class AbortFirstAttempt(AbortPolicy):
+    """Abort the first attempt after a few tokens; let regenerations finish."""
+
+    def __init__(self):
+        self.attempts = 0
+
+    def reset(self):
+        self.attempts += 1
+
+    def on_token(self, token, output, events):
+        if self.attempts == 1 and output.token_count >= 5:
+            return "Off track"
+        return None
+
+    def correction(self, reason):
+        return f"CORRECTION: {reason}"
+
+
+class SpyLLM:
+    """Streaming client that records the messages of every request."""
+
+    def __init__(self, llm):
+        self.llm = llm
+        self.requests = []
+
+    def stream(self, messages, **kwargs):
+        self.requests.append(messages)
+        return self.llm.stream(messages, **kwargs)
+
+    def astream(self, messages, **kwargs):
+        self.requests.append(messages)
+        return self.llm.astream(messages, **kwargs)
+
+
+def test_aborted_stream_is_regenerated_with_a_correction():
+    spy = SpyLLM(SyntheticLLM(output_tokens=300))
+    set_llms(llm_streaming=spy)
+    streamed = list(run_stage4_specialist(REFINED, "constraints", abort_policy=AbortFirstAttempt(), max_retries=1))
+
+    assert [event for event in streamed if event[0] not in ("token", "metrics")][:2] == [
+        ("aborted", "Off track"),
+        ("retry", {"attempt": 1, "reason": "Off track"}),
+    ]
+    retry_at = streamed.index(("retry", {"attempt": 1, "reason": "Off track"}))
+    assert len([event for event in streamed[:retry_at] if event[0] == "token"]) == 5
+    tokens = [data for event_type, data in streamed[retry_at:] if event_type == "token"]
+    assert streamed[-2] == ("done", "".join(tokens))
+    assert streamed[-1][1]["attempts"] == 2 and streamed[-1][1]["aborted"] is False
+
+    first, second = (messages[-1]["content"] for messages in spy.requests)
+    assert second == first + "\n\nCORRECTION: Off track"
+
+
+def test_abort_without_retries_returns_the_partial_output():
+    streamed = list(run_stage4_specialist(REFINED, "constraints", abort_policy=AbortFirstAttempt()))
+    tokens = [data for event_type, data in streamed if event_type == "token"]
+    assert [event[0] for event in streamed[-3:]] == ["aborted", "done", "metrics"]
+    assert streamed[-2] == ("done", "".join(tokens))
+    assert streamed[-1][1]["aborted"] is True
+
+
+def test_async_abort_matches_sync():
+    sync_events = events(run_stage4_specialist(REFINED, "constraints", abort_policy=AbortFirstAttempt(), max_retries=1))
+    async_events = aevents(
+        arun_stage4_specialist(REFINED, "constraints", abort_policy=AbortFirstAttempt(), max_retries=1)
+    )
+    assert async_events == sync_events
+
+
+# --------------------
+# CANCELLATION
+# --------------------
+
+def test_cancel_token_keeps_the_first_reason():
+    token = CancelToken()
+    assert not token.cancelled
+    token.cancel("new problem")
+    token.cancel("closed")
+    assert token.cancelled and token.reason == "new problem"
+
+
+def _cancel_after(stage, token: CancelToken, tokens: int) -> list:
+    streamed = []
+    for event in stage:
+        streamed.append(event)
+        if len(streamed) == tokens:
+            token.cancel("new problem")
+    return streamed
+
+
+def test_cancel_token_stops_the_specialist():
+    token = CancelToken()
+    streamed = _cancel_after(run_stage4_specialist(REFINED, "constraints", cancel_token=token), token, 3)
+    assert [event_type for event_type, _ in streamed] == ["token"] * 3 + ["cancelled", "metrics"]
+    assert streamed[-2][1] == "".join(data for _, data in streamed[:3])
+
+    metrics = streamed[-1][1]
+    assert (metrics["cancelled"], metrics["cancel_reason"], metrics["output_tokens"]) == (True, "new problem", 3)
+    assert metrics["tokens_saved"] == tokens_saved("constraints", 3) > 0
+
+
+def test_async_cancel_token_matches_sync():
+    async def collect(token):
+        streamed = []
+        async for event in arun_stage4_specialist(REFINED, "constraints", cancel_token=token):
+            streamed.append(event)
+            if len(streamed) == 3:
+                token.cancel("new problem")
+        return streamed
+
+    sync_token, async_token = CancelToken(), CancelToken()
+    sync_events = _cancel_after(run_stage4_specialist(REFINED, "constraints", cancel_token=sync_token), sync_token, 3)
+    async_events = asyncio.run(collect(async_token))
+    assert async_events[:-1] == sync_events[:-1]
+    assert async_events[-1][1]["tokens_saved"] == sync_events[-1][1]["tokens_saved"]
+
+
+def test_closing_the_specialist_records_tokens_saved(metrics_records):
+    stage = run_stage4_specialist(REFINED, "constraints")
+    for _ in range(3):
+        next(stage)
+    stage.close()
+    (record,) = [r for r in metrics_records if r["stage"] == "specialist"]
+    assert (record["cancelled"], record["cancel_reason"]) == (True, "closed")
+    assert record["tokens_saved"] == tokens_saved("constraints", 3)